@@ -1,5 +1,20 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Callable
+import pandas as pd
+import pyarrow as pa
 from pydantic import BaseModel
+from backend.core.config import settings
+from backend.core.resilience import DeadlineExceeded, budget_timeout, remaining_budget
+
+logger = logging.getLogger(__name__)
 
 class AgentResponse(BaseModel):
     agent_name: str
@@ -7,11 +22,176 @@ class AgentResponse(BaseModel):
     metadata: Dict[str, Any] = {}
     confidence_score: float = 1.0
 
+class SharedFrame:
+    """
+    A DataFrame serialized once as an Arrow IPC stream into shared memory.
+    Only the segment name travels to the worker, which maps it back without
+    copying numeric columns.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        mock = pa.MockOutputStream()
+        with pa.ipc.new_stream(mock, table.schema) as writer:
+            writer.write_table(table)
+        self.size = mock.size()
+        self._shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+        self.name = self._shm.name
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(self._shm.buf))
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sink.close()
+
+    def __getstate__(self) -> dict:
+        return {"name": self.name, "size": self.size}
+
+    def __setstate__(self, state: dict):
+        self.name, self.size, self._shm = state["name"], state["size"], None
+
+    def attach(self) -> shared_memory.SharedMemory:
+        return shared_memory.SharedMemory(name=self.name)
+
+    def read(self, shm: shared_memory.SharedMemory) -> pd.DataFrame:
+        return pa.ipc.open_stream(pa.py_buffer(shm.buf[:self.size])).read_pandas()
+
+    def release(self):
+        """Frees the segment; called by the owning process once the task is done."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+def _invoke(func: Callable, args: tuple, kwargs: dict) -> Any:
+    """Worker-side entry point: maps SharedFrame arguments back to DataFrames."""
+    segments = []
+
+    def resolve(value):
+        if isinstance(value, SharedFrame):
+            shm = value.attach()
+            segments.append(shm)
+            return value.read(shm)
+        return value
+
+    try:
+        return func(*[resolve(a) for a in args], **{k: resolve(v) for k, v in kwargs.items()})
+    finally:
+        for shm in segments:
+            try:
+                shm.close()
+            except BufferError:
+                # The result still references the mapping; it is released with the result
+                pass
+
+class AgentExecutor:
+    """
+    Runs CPU-heavy agent bodies in a managed process pool so the event loop stays free.
+    Workers are recycled after `max_tasks_per_worker` tasks each, and the whole pool
+    is replaced when a task exceeds its timeout; tasks that were running on the
+    replaced pool are rerun once on the fresh one.
+    """
+
+    def __init__(self, max_workers: int, max_tasks_per_worker: int = 100, timeout: Optional[float] = None):
+        self.max_workers = max_workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._submitted = 0
+        self._lock = threading.Lock()
+        # Pools terminated because one of their tasks timed out
+        self._killed: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is not None and self._submitted >= self.max_workers * self.max_tasks_per_worker:
+                # Let in-flight tasks finish on the old pool while new tasks go to fresh workers
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._submitted = 0
+            self._submitted += 1
+            return self._pool
+
+    def _drop_pool(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+
+    def _kill_pool(self, pool: ProcessPoolExecutor):
+        self._drop_pool(pool)
+        self._killed.add(pool)
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        # Pending work fails with BrokenProcessPool, which `run` retries on the fresh pool
+        pool.shutdown(wait=False)
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Runs `func(*args, **kwargs)` in a worker process. DataFrame arguments are
+        passed through shared memory. Raises asyncio.TimeoutError on timeout.
+        A task whose pool was terminated by another task's timeout is rerun once
+        within what is left of its own timeout.
+        """
+        frames = []
+
+        def share(value):
+            if isinstance(value, pd.DataFrame):
+                frames.append(SharedFrame(value))
+                return frames[-1]
+            return value
+
+        shared_args = tuple(share(a) for a in args)
+        shared_kwargs = {k: share(v) for k, v in kwargs.items()}
+        loop = asyncio.get_running_loop()
+        limit = timeout or self.timeout
+        deadline = None if limit is None else loop.time() + limit
+        try:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    future = loop.run_in_executor(pool, functools.partial(_invoke, func, shared_args, shared_kwargs))
+                    return await asyncio.wait_for(future, None if deadline is None else max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    logger.warning(f"Agent task {getattr(func, '__name__', func)} timed out; recycling worker pool")
+                    self._kill_pool(pool)
+                    raise
+                except BrokenProcessPool:
+                    # A crashed worker breaks the pool for good; later tasks need a new one
+                    self._drop_pool(pool)
+                    if attempt or pool not in self._killed:
+                        raise
+                    logger.info(f"Agent task {getattr(func, '__name__', func)} lost its worker to another task's timeout; retrying")
+        finally:
+            for frame in frames:
+                frame.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+_executor: Optional[AgentExecutor] = None
+
+def get_agent_executor() -> AgentExecutor:
+    """Returns the process-wide agent executor configured in settings."""
+    global _executor
+    if _executor is None:
+        _executor = AgentExecutor(
+            max_workers=settings.AGENT_POOL_SIZE,
+            max_tasks_per_worker=settings.AGENT_MAX_TASKS_PER_WORKER,
+            timeout=settings.AGENT_TASK_TIMEOUT_SECONDS,
+        )
+    return _executor
+
 class BaseAgent:
     """
     Base class for all intelligence agents in the platform.
     """
-    
+
     def __init__(self, name: str, role: str):
         self.name = name
         self.role = role
@@ -26,3 +206,24 @@ class BaseAgent:
     def get_allowed_tools(self) -> List[str]:
         """Returns a list of tools this agent is allowed to use."""
         return []
+
+    async def run_cpu_bound(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a CPU-heavy, picklable module-level function off the event loop.
+        Work on DataFrames with at least AGENT_OFFLOAD_MIN_ROWS rows goes to the
+        process pool; smaller work runs inline, where a pool round trip would cost more.
+        Raises asyncio.TimeoutError when pool work outlives its task timeout, and
+        DeadlineExceeded when it is the request's deadline that ran out.
+        """
+        rows = max((len(v) for v in list(args) + list(kwargs.values()) if isinstance(v, pd.DataFrame)), default=0)
+        if settings.AGENT_POOL_SIZE <= 0 or rows < settings.AGENT_OFFLOAD_MIN_ROWS:
+            return func(*args, **kwargs)
+        # Pool tasks stop at the request deadline as well as the task timeout
+        timeout = budget_timeout(settings.AGENT_TASK_TIMEOUT_SECONDS)
+        try:
+            return await get_agent_executor().run(func, *args, timeout=timeout, **kwargs)
+        except asyncio.TimeoutError as e:
+            remaining = remaining_budget()
+            if remaining is not None and remaining <= 0 and not isinstance(e, DeadlineExceeded):
+                raise DeadlineExceeded("Request deadline exceeded") from e
+            raise
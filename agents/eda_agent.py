@@ -1,8 +1,74 @@
-from typing import Dict, Any, Optional
+import asyncio
+import logging
+import uuid
+from typing import Dict, Any, Optional, Tuple
 from agents.base import BaseAgent, AgentResponse
+from backend.core.resilience import DeadlineExceeded
+from backend.core.cache import fingerprint_table, get_anomaly_results
+from backend.core.config import settings
+from pipelines.anomalies import DEFAULT_THRESHOLDS, AnomalyResult
+from pipelines.datasets import DatasetNotFound, dataset_any_owner, dataset_owner, dataset_ref, get_dataset_registry
 from pipelines.eda import AutomatedEDA
+from pipelines.duckdb_eda import DuckDBEDA
+from pipelines.profile_store import IncrementalEDA, get_profile_store
+from backend.core.db import get_duckdb_conn, is_user_table
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+def compact_profile(engine, anomaly_method: str = "zscore") -> Tuple[Dict[str, Any], AnomalyResult]:
+    """
+    Runs a full profile whose report carries per-column anomaly counts and peak
+    scores only; the flagged rows come back separately as an AnomalyResult.
+    """
+    result = engine.anomaly_result(anomaly_method)
+    report = {
+        "summary": engine.get_summary_statistics().to_dict(),
+        "missing_values": engine.analyze_missing_values(),
+        "correlation": engine.correlation_report(),
+        "anomalies": result.summary()["columns"],
+    }
+    return report, result
+
+def profile_dataframe(df: pd.DataFrame, anomaly_method: str = "zscore") -> Tuple[Dict[str, Any], AnomalyResult]:
+    """Runs the in-memory profile; module-level so worker processes can import it."""
+    return compact_profile(AutomatedEDA(df), anomaly_method)
+
+def profile_table(conn, table: str, anomaly_method: str = "zscore") -> tuple:
+    # Without an explicit connection, use the calling thread's own catalog cursor.
+    # Catalog tables kept current by the ETL pipeline are profiled from stored statistics.
+    profile, in_catalog, state = None, conn is None, None
+    if in_catalog:
+        conn = get_duckdb_conn()
+        # Clients name the table: only loaded data is theirs to read, not the stores' own tables
+        if not is_user_table(conn, table):
+            raise DatasetNotFound(table)
+        # Taken first, so a write while profiling also marks the row ids as stale
+        state = fingerprint_table(conn, table)
+        profile = get_profile_store().fresh(conn, table)
+    eda_engine = IncrementalEDA(conn, table, profile) if profile is not None else DuckDBEDA(conn, table)
+    report, anomalies = compact_profile(eda_engine, anomaly_method)
+    if in_catalog:
+        anomalies.table_state = state
+    else:
+        # Row ids only resolve to rows through the shared catalog
+        anomalies.table = None
+    return eda_engine.row_count(), report, anomalies
+
+def profile_dataset(
+    ref: str, anomaly_method: str = "zscore", owner: Optional[str] = None, any_owner: bool = False
+) -> tuple:
+    """
+    Profiles one of `owner`'s uploaded datasets (by id or name; any upload by
+    id with `any_owner`) through DuckDB over the shared cached columns; raises
+    DatasetNotFound for unknown datasets.
+    """
+    cursor, view = get_dataset_registry().cursor(ref, owner=owner, any_owner=any_owner)
+    try:
+        return profile_table(cursor, view, anomaly_method)
+    finally:
+        cursor.close()
+
 class EDAAgent(BaseAgent):
     """
     Agent responsible for data profiling, anomaly detection, and insights.
@@ -15,20 +81,68 @@ class EDAAgent(BaseAgent):
         # In a real scenario, this would determine which dataset to load
         # For demo, we use a sample or the one provided in context
         df = context.get("dataframe") if context else None
+        table = context.get("table") if context else None
+        dataset = dataset_ref(context)
         
-        if df is None:
+        if df is None and table is None and dataset is None:
             return AgentResponse(
                 agent_name=self.name,
                 content="No dataset provided for analysis.",
                 confidence_score=0.0
             )
 
-        eda_engine = AutomatedEDA(df)
-        report = eda_engine.run_full_profile()
+        # "zscore" by default; "mad" is robust to the outliers it is looking for
+        anomaly_method = context.get("anomaly_method", "zscore")
+        if not isinstance(anomaly_method, str) or anomaly_method not in DEFAULT_THRESHOLDS:
+            return AgentResponse(
+                agent_name=self.name,
+                content=f"Unsupported anomaly method {anomaly_method!r}; use one of: {', '.join(DEFAULT_THRESHOLDS)}.",
+                confidence_score=0.0
+            )
+        try:
+            if df is not None:
+                record_count = len(df)
+                report, anomalies = await self.run_cpu_bound(profile_dataframe, df, anomaly_method)
+            elif table is None:
+                # Uploaded datasets are only opened now, when a query actually needs them
+                record_count, report, anomalies = await asyncio.to_thread(
+                    profile_dataset, dataset, anomaly_method, dataset_owner(context), dataset_any_owner(context)
+                )
+            else:
+                # Profile the DuckDB table in place; DuckDB does the work off the event loop
+                record_count, report, anomalies = await asyncio.to_thread(
+                    profile_table, context.get("duckdb_conn"), table, anomaly_method
+                )
+        except DeadlineExceeded:
+            # The request's own budget is spent: the API answers 504 rather than a partial result
+            raise
+        except asyncio.TimeoutError:
+            return AgentResponse(
+                agent_name=self.name,
+                content="Analysis timed out before the profile completed.",
+                confidence_score=0.0
+            )
+        except DatasetNotFound:
+            return AgentResponse(
+                agent_name=self.name,
+                content=f"Dataset '{dataset if table is None else table}' was not found.",
+                confidence_score=0.0
+            )
         
+        # Flagged rows are kept server-side and paged through /agents/anomalies/{id}
+        result_id = uuid.uuid4().hex
+        anomalies.owner = dataset_owner(context)
+        try:
+            await asyncio.to_thread(get_anomaly_results().set, result_id, anomalies, settings.ANOMALY_RESULT_TTL_SECONDS)
+            report["anomaly_result_id"] = result_id
+        except Exception as e:
+            # The profile stands on its own; only paging through the rows is lost
+            logger.warning(f"Storing anomaly result failed: {e}")
+        anomalous_rows = int(anomalies.anomalous_rows().size)
+
         summary_text = (
-            f"I have thoroughly analyzed the dataset ({len(df)} records) across all supply chain dimensions. "
-            f"By comparing historical patterns and standard deviations, I identified {len(report['anomalies'])} unusual patterns (anomalies) that deviate from your normal operations. "
+            f"I have thoroughly analyzed the dataset ({record_count} records) across all supply chain dimensions. "
+            f"By comparing historical patterns and standard deviations, I identified {anomalous_rows} unusual records (anomalies) that deviate from your normal operations. "
             "I've also mapped out key correlations, such as how delivery delays impact your current stock levels, to help you prioritize which warehouses need immediate attention."
         )
 
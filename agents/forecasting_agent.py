@@ -1,8 +1,28 @@
+import asyncio
 from typing import Dict, Any, Optional
 from agents.base import BaseAgent, AgentResponse
+from backend.core.resilience import DeadlineExceeded
 from ml.forecasting import DemandForecaster
+from ml.forecast_store import get_forecast_store
+from pipelines.datasets import DatasetNotFound, dataset_any_owner, dataset_owner, dataset_ref, get_dataset_registry
 import pandas as pd
 
+# The only dataset columns forecasting reads; others are never loaded
+FORECAST_COLUMNS = ["product_id", "category", "date", "sales"]
+
+def load_history(ref: str, owner: Optional[str] = None, any_owner: bool = False) -> pd.DataFrame:
+    """Reads the forecasting columns of an uploaded dataset through the shared dataset cache."""
+    registry = get_dataset_registry()
+    info = registry.resolve(ref, owner, any_owner)
+    available = set(info["columns"])
+    return registry.frame(info["dataset_id"], [c for c in FORECAST_COLUMNS if c in available], owner, any_owner)
+
+def forecast_catalog(history: pd.DataFrame, category: Optional[str] = None) -> pd.DataFrame:
+    """Batch-forecasts every SKU, optionally within one category; runs in worker processes."""
+    if category is not None:
+        history = history[history["category"] == category]
+    return DemandForecaster.predict_sales_batch(history)
+
 class ForecastingAgent(BaseAgent):
     """
     Agent responsible for demand planning and sales forecasting.
@@ -13,6 +33,25 @@ class ForecastingAgent(BaseAgent):
 
     async def execute(self, task: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
         history = context.get("history") if context else None
+
+        # Uploaded datasets are read only when a forecast is actually requested
+        dataset = dataset_ref(context)
+        if history is None and dataset:
+            try:
+                history = await asyncio.to_thread(
+                    load_history, dataset, dataset_owner(context), dataset_any_owner(context)
+                )
+            except DatasetNotFound:
+                return AgentResponse(
+                    agent_name=self.name,
+                    content=f"Dataset '{dataset}' was not found.",
+                    confidence_score=0.0
+                )
+
+        # Series tracked incrementally in the forecast store are forecast from their state alone
+        if history is None and context and context.get("forecast_state"):
+            batch = await asyncio.to_thread(get_forecast_store().forecast)
+            return self._catalog_response(batch, None)
         
         if history is None or not isinstance(history, pd.DataFrame):
             return AgentResponse(
@@ -21,7 +60,21 @@ class ForecastingAgent(BaseAgent):
                 confidence_score=0.0
             )
 
-        results = DemandForecaster.predict_sales(history)
+        # Long-format history (one row per product and date) is forecast per SKU in one batch
+        try:
+            if "product_id" in history.columns:
+                return await self._forecast_catalog(task, history)
+
+            results = await self.run_cpu_bound(DemandForecaster.predict_sales, history)
+        except DeadlineExceeded:
+            # The request's own budget is spent: the API answers 504 rather than a partial result
+            raise
+        except asyncio.TimeoutError:
+            return AgentResponse(
+                agent_name=self.name,
+                content="Forecasting failed: the analysis timed out.",
+                confidence_score=0.0
+            )
         
         if "error" in results:
             return AgentResponse(
@@ -43,3 +96,47 @@ class ForecastingAgent(BaseAgent):
             metadata=results,
             confidence_score=0.9
         )
+
+    @staticmethod
+    def _match_category(task: str, history: pd.DataFrame) -> Optional[str]:
+        """Returns the category named in the task, if the history has one."""
+        if "category" not in history.columns:
+            return None
+        q = task.lower()
+        for category in history["category"].dropna().unique():
+            if str(category).lower() in q:
+                return category
+        return None
+
+    async def _forecast_catalog(self, task: str, history: pd.DataFrame) -> AgentResponse:
+        category = self._match_category(task, history)
+        batch = await self.run_cpu_bound(forecast_catalog, history, category)
+        return self._catalog_response(batch, category)
+
+    def _catalog_response(self, batch: pd.DataFrame, category: Optional[str]) -> AgentResponse:
+        if batch.empty:
+            return AgentResponse(
+                agent_name=self.name,
+                content="Forecasting failed: Insufficient data",
+                confidence_score=0.0
+            )
+
+        upward = int((batch["trend"] == "upward").sum())
+        scope = f"the {category} category" if category is not None else "your catalog"
+        summary_text = (
+            f"I have projected future demand for all {len(batch)} products in {scope} in a single pass over their sales history. "
+            f"{upward} products show an upward trend and {len(batch) - upward} are flat or declining. "
+            f"Across these products, the average per-period sales of {batch['historical_mean'].mean():.2f} "
+            f"is expected to move to {batch['predicted_mean'].mean():.2f} over the next period."
+        )
+
+        return AgentResponse(
+            agent_name=self.name,
+            content=summary_text,
+            metadata={
+                "category": category,
+                "product_count": len(batch),
+                "forecasts": batch.reset_index().to_dict(orient="records"),
+            },
+            confidence_score=0.9
+        )
@@ -1,40 +1,76 @@
-from typing import Annotated, TypedDict, Union, List, Optional
+import asyncio
+import contextlib
+import functools
+import logging
+import operator
+import time
+from typing import Annotated, TypedDict, Union, List, Optional, AsyncContextManager, AsyncIterator, Any, Callable, Dict, Sequence, Tuple
+import duckdb
+import pandas as pd
 from langgraph.graph import StateGraph, END
 from backend.core.config import settings
-from agents.base import AgentResponse
+from backend.core.cache import ResultCache, fingerprint_context, get_result_cache
+from backend.core.resilience import CircuitBreaker, CircuitOpenError, current_deadline, with_budget
+from agents.base import AgentResponse, BaseAgent
 from security.guardrails import AIProtectionLayer, OutputVerificationAgent
 from agents.eda_agent import EDAAgent
 from agents.forecasting_agent import ForecastingAgent
+from monitoring.logging import correlation_id, new_correlation_id
+from monitoring.metrics import (
+    AGENT_EXECUTION_COUNT, AGENT_EXECUTION_TIME, CIRCUIT_STATE, DATASET_ROWS, RESULT_CACHE_REQUESTS,
+    track_node_time
+)
+
+logger = logging.getLogger(__name__)
+
+# Raised for bad input in the query context (unknown table or column, malformed
+# values); they fail the request but say nothing about the agent's health
+CLIENT_ERRORS = (ValueError, KeyError, duckdb.CatalogException, duckdb.BinderException)
 
 class AgentState(TypedDict):
     """
     Represents the state of the agentic workflow.
     """
     query: str
-    history: List[AgentResponse]
+    # Agent nodes may run in parallel, so their responses are concatenated
+    history: Annotated[List[AgentResponse], operator.add]
     next_agent: str
+    # Agents the guardrail routed the query to, once it passed
+    routes: List[str]
     final_response: Optional[str]
     is_safe: bool
     context: Optional[dict]
+    request_id: Optional[str]
+    # Absolute deadline (epoch seconds) set by the API; every node and retry works within it
+    deadline: Optional[float]
 
 class WorkflowOrchestrator:
     """
     Orchestrates the multi-agent system using LangGraph-style logic.
     """
     
-    def __init__(self):
+    def __init__(self, result_cache: Optional[ResultCache] = None):
+        self.result_cache = result_cache or get_result_cache()
         self.output_verifier = OutputVerificationAgent()
         self.eda_agent = EDAAgent()
         self.forecasting_agent = ForecastingAgent()
+        # A failing agent is cut off after consecutive errors instead of absorbing every request
+        self.circuit_breakers = {
+            agent.name: CircuitBreaker(
+                settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RECOVERY_SECONDS, excluded=CLIENT_ERRORS
+            )
+            for agent in (self.eda_agent, self.forecasting_agent)
+        }
         self.builder = StateGraph(AgentState)
         self._setup_graph()
 
     def _setup_graph(self):
         # Define nodes
-        self.builder.add_node("guardrail", self.run_guardrail)
-        self.builder.add_node("eda_agent", self.run_eda)
-        self.builder.add_node("forecasting_agent", self.run_forecasting)
-        self.builder.add_node("verifier", self.run_verification)
+        self.builder.add_node("guardrail", self._node("guardrail", self.run_guardrail))
+        self.builder.add_node("eda_agent", self._node("eda_agent", self.run_eda))
+        self.builder.add_node("forecasting_agent", self._node("forecasting_agent", self.run_forecasting))
+        self.builder.add_node("merge", self._node("merge", self.run_merge))
+        self.builder.add_node("verifier", self._node("verifier", self.run_verification))
 
         # Define edges
         self.builder.set_entry_point("guardrail")
@@ -49,52 +85,240 @@ class WorkflowOrchestrator:
             }
         )
         
-        self.builder.add_edge("eda_agent", "verifier")
-        self.builder.add_edge("forecasting_agent", "verifier")
+        # Every routed agent runs in the same step; merge joins them before verification
+        self.builder.add_edge("eda_agent", "merge")
+        self.builder.add_edge("forecasting_agent", "merge")
+        self.builder.add_edge("merge", "verifier")
         self.builder.add_edge("verifier", END)
 
         self.graph = self.builder.compile()
 
+    @staticmethod
+    def _node(name: str, func):
+        """
+        Wraps a node with latency tracking, binds the run's correlation ID for its
+        logs and its deadline for nested calls, and cuts it off when the deadline passes.
+        """
+        @functools.wraps(func)
+        async def run(state: AgentState) -> dict:
+            if state.get("request_id"):
+                correlation_id.set(state["request_id"])
+            current_deadline.set(state.get("deadline"))
+            return await with_budget(func(state))
+        return track_node_time(name)(run)
+
     async def run_guardrail(self, state: AgentState) -> dict:
-        is_safe = not AIProtectionLayer.check_prompt_injection(state["query"])
+        violated_rule = AIProtectionLayer.scan_text(state["query"])
+        is_safe = violated_rule is None
         if not is_safe:
+            logger.warning("Blocked query by guardrail", extra={"rule": violated_rule})
             return {
                 "is_safe": False,
                 "final_response": "[REDACTED: SECURITY VIOLATION]",
             }
-        return {"is_safe": True}
+        # Routed once here; the graph's edges and progress events both read the result
+        routes = self.select_routes(state["query"])
+        logger.info("Routed query", extra={"routes": routes})
+        return {"is_safe": True, "routes": routes}
 
-    def route_after_guardrail(self, state: AgentState) -> str:
+    def route_after_guardrail(self, state: AgentState) -> List[str]:
+        """Dispatches the query to the agents the guardrail routed it to, concurrently."""
         if not state["is_safe"]:
-            return "blocked"
-        
-        q = state["query"].lower()
-        if any(w in q for w in ["profile", "eda", "analyze", "anomalies"]):
-            return "eda"
-        if any(w in q for w in ["forecast", "predict", "sales", "future"]):
-            return "forecast"
-        return "eda"
+            return ["blocked"]
+        return state.get("routes") or self.select_routes(state["query"])
+
+    @staticmethod
+    def select_routes(query: str) -> List[str]:
+        """
+        Returns every agent the query asks for.
+        "sales" alone only selects forecasting when no EDA keyword is present.
+        """
+        q = query.lower()
+        wants_eda = any(w in q for w in ["profile", "eda", "analyze", "anomalies"])
+        wants_forecast = any(w in q for w in ["forecast", "predict", "future"]) or (
+            "sales" in q and not wants_eda
+        )
+        routes = []
+        if wants_eda:
+            routes.append("eda")
+        if wants_forecast:
+            routes.append("forecast")
+        return routes or ["eda"]
+
+    async def _execute_cached(
+        self, intent: str, agent: BaseAgent, state: AgentState, per_user: bool = False
+    ) -> AgentResponse:
+        """
+        Runs an agent through the result cache, keyed on intent, query and a
+        fingerprint of the context dataset (and the user, with `per_user`).
+        Failed runs are not cached.
+        """
+        context = state.get("context")
+        # Fingerprinting queries DuckDB and the backend may be Redis: both stay off the event loop
+        try:
+            key = await asyncio.to_thread(self.result_cache.key, intent, state["query"], context, per_user)
+        except Exception:
+            key = None
+
+        if key is not None:
+            cached = await asyncio.to_thread(self.result_cache.get, key)
+            RESULT_CACHE_REQUESTS.labels(intent=intent, outcome="hit" if cached is not None else "miss").inc()
+            if cached is not None:
+                return cached
+
+        for value in (context or {}).values():
+            if isinstance(value, pd.DataFrame):
+                DATASET_ROWS.labels(agent_name=agent.name).observe(len(value))
+
+        breaker = self.circuit_breakers[agent.name]
+        start_time = time.perf_counter()
+        try:
+            response = await breaker.call(agent.execute, state["query"], context=context)
+        except CircuitOpenError:
+            AGENT_EXECUTION_COUNT.labels(agent_name=agent.name, status="rejected").inc()
+            raise
+        except Exception:
+            AGENT_EXECUTION_COUNT.labels(agent_name=agent.name, status="error").inc()
+            raise
+        finally:
+            AGENT_EXECUTION_TIME.labels(agent_name=agent.name).observe(time.perf_counter() - start_time)
+            CIRCUIT_STATE.labels(agent_name=agent.name).set(int(breaker.state == "OPEN"))
+        status = "success" if response.confidence_score > 0 else "failure"
+        AGENT_EXECUTION_COUNT.labels(agent_name=agent.name, status=status).inc()
+
+        if key is not None and response.confidence_score > 0:
+            await asyncio.to_thread(self.result_cache.set, key, response)
+        return response
 
     async def run_eda(self, state: AgentState) -> dict:
-        response = await self.eda_agent.execute(state["query"], context=state.get("context"))
-        return {"final_response": response.content, "history": state.get("history", []) + [response]}
+        # Its response carries an anomaly result id that only the requesting user may page
+        response = await self._execute_cached("eda", self.eda_agent, state, per_user=True)
+        return {"history": [response]}
 
     async def run_forecasting(self, state: AgentState) -> dict:
-        response = await self.forecasting_agent.execute(state["query"], context=state.get("context"))
-        return {"final_response": response.content, "history": state.get("history", []) + [response]}
+        response = await self._execute_cached("forecast", self.forecasting_agent, state)
+        return {"history": [response]}
+
+    async def run_merge(self, state: AgentState) -> dict:
+        """Joins the responses of all agents that ran, in a stable agent order."""
+        order = [self.eda_agent.name, self.forecasting_agent.name]
+        responses = sorted(
+            state["history"],
+            key=lambda r: order.index(r.agent_name) if r.agent_name in order else len(order)
+        )
+        return {"final_response": "\n\n".join(r.content for r in responses)}
 
     async def run_verification(self, state: AgentState) -> dict:
         verification = self.output_verifier.verify(state["query"], state["final_response"])
         return {"final_response": verification["sanitized_response"]}
 
-    async def process_query(self, query: str, context: Optional[dict] = None) -> str:
-        initial_state = {
+    @staticmethod
+    def _initial_state(query: str, context: Optional[dict], deadline: Optional[float] = None) -> dict:
+        return {
             "query": query,
             "history": [],
             "next_agent": "",
+            "routes": [],
             "final_response": None,
             "is_safe": True,
-            "context": context
+            "context": context,
+            "request_id": correlation_id.get() or new_correlation_id(),
+            "deadline": deadline,
         }
-        result = await self.graph.ainvoke(initial_state)
+
+    @staticmethod
+    def _metadata_preview(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Keeps scalar metadata and reduces containers to their sizes, so progress events stay small."""
+        preview = {}
+        for key, value in metadata.items():
+            if value is None or isinstance(value, (str, int, float, bool)):
+                preview[key] = value
+            elif hasattr(value, "__len__"):
+                preview[key] = {"size": len(value)}
+        return preview
+
+    async def process_query(self, query: str, context: Optional[dict] = None, deadline: Optional[float] = None) -> str:
+        result = await self.graph.ainvoke(self._initial_state(query, context, deadline))
         return result["final_response"]
+
+    async def process_batch(
+        self,
+        queries: Sequence[Tuple[str, Optional[dict]]],
+        concurrency: int = 4,
+        deadline: Optional[float] = None,
+        admit: Optional[Callable[[], AsyncContextManager]] = None,
+    ) -> List[Dict[str, Optional[str]]]:
+        """
+        Runs a batch of (query, context) pairs. Identical pairs run once and share
+        their outcome; distinct ones run concurrently, at most `concurrency` at a
+        time, each inside `admit()` when given (admission control per run).
+        Returns {"response", "error"} per item, in input order.
+        """
+        distinct: Dict[Tuple[str, str], int] = {}
+        unique: List[Tuple[str, Optional[dict]]] = []
+        slots: List[int] = []
+        for query, context in queries:
+            # Fingerprinting queries DuckDB, so it stays off the event loop
+            try:
+                key = (query, await asyncio.to_thread(fingerprint_context, context, True))
+            except Exception as e:
+                # A context that cannot be fingerprinted is never taken for another one
+                logger.warning(f"Could not fingerprint batch context, running it on its own: {e}")
+                key = None
+            if key is None or key not in distinct:
+                if key is not None:
+                    distinct[key] = len(unique)
+                slots.append(len(unique))
+                unique.append((query, context))
+            else:
+                slots.append(distinct[key])
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(query: str, context: Optional[dict]) -> Dict[str, Optional[str]]:
+            async with semaphore:
+                try:
+                    async with admit() if admit is not None else contextlib.nullcontext():
+                        return {"response": await self.process_query(query, context, deadline), "error": None}
+                except Exception as e:
+                    logger.exception("Batch item failed")
+                    return {"response": None, "error": f"Agent processing error: {str(e)}"}
+
+        outcomes = await asyncio.gather(*(run(query, context) for query, context in unique))
+        return [outcomes[slot] for slot in slots]
+
+    async def stream_query(
+        self,
+        query: str,
+        context: Optional[dict] = None,
+        deadline: Optional[float] = None,
+        full_metadata: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Runs the workflow and yields a progress event as each node finishes,
+        ending with a "final" event that carries the sanitized answer.
+        "agent_completed" events carry a metadata preview, or the agent's full
+        metadata with `full_metadata`.
+        """
+        state = self._initial_state(query, context, deadline)
+        async for update in self.graph.astream(state, stream_mode="updates"):
+            for node, delta in update.items():
+                delta = delta or {}
+                if node == "guardrail":
+                    state.update(delta)
+                    yield {"event": "guardrail", "is_safe": state["is_safe"]}
+                    if state["is_safe"]:
+                        for route in state["routes"]:
+                            yield {"event": "agent_started", "route": route}
+                elif node in ("eda_agent", "forecasting_agent"):
+                    for response in delta.get("history", []):
+                        yield {
+                            "event": "agent_completed",
+                            "agent": response.agent_name,
+                            "confidence_score": response.confidence_score,
+                            "metadata": response.metadata if full_metadata else self._metadata_preview(response.metadata),
+                        }
+                elif node == "verifier":
+                    yield {"event": "verified"}
+                if "final_response" in delta:
+                    state["final_response"] = delta["final_response"]
+        yield {"event": "final", "response": state["final_response"]}
@@ -1,25 +1,200 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Any
+import asyncio
+import contextlib
+import json
+import math
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, AsyncIterator, Dict, List, Optional
 from agents.orchestrator import WorkflowOrchestrator
-from backend.schemas.agent import AgentQuery, AgentQueryResponse
+from backend.core.admission import AdmissionController, AdmissionRejected
+from backend.core.cache import fingerprint_table, get_anomaly_results
+from backend.core.config import settings
+from backend.core.db import get_duckdb_conn, is_user_table
+from backend.core.resilience import CircuitOpenError, DeadlineExceeded, remaining_budget
+from pipelines.datasets import with_dataset_owner
+from pipelines.duckdb_eda import quote_identifier
+from backend.schemas.agent import AgentQuery, AgentQueryResponse, BatchAgentQuery, BatchAgentQueryResponse
 from backend.api import deps
 
 router = APIRouter()
 orchestrator = WorkflowOrchestrator()
+admission = AdmissionController.from_settings()
+
+def _scoped(context: Optional[dict], user: Any) -> dict:
+    """The client's context scoped to the caller's uploads; superusers may name any upload by id."""
+    return with_dataset_owner(context, user.email, user.is_superuser)
+
+def _overloaded(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"Too many agent requests ({e.reason}); retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
 
 @router.post("/query", response_model=AgentQueryResponse)
 async def process_agent_query(
     data: AgentQuery,
-    current_user: Any = Depends(deps.get_current_active_user)
+    current_user: Any = Depends(deps.get_current_active_user),
+    deadline: float = Depends(deps.get_request_deadline)
 ) -> Any:
     """
     Process a natural language query through the multi-agent orchestrator.
+    Runs are admission-controlled: excess load is shed with 429 and Retry-After.
+    The whole run, queueing included, is bounded by the request deadline (504).
     """
     try:
-        response = await orchestrator.process_query(data.query, context=data.context)
+        async with admission.admit(current_user.email, remaining_budget(deadline)):
+            response = await orchestrator.process_query(
+                data.query, context=_scoped(data.context, current_user), deadline=deadline
+            )
         return {"response": response}
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Agent temporarily unavailable: {str(e)}",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Agent processing error: {str(e)}"
         )
+
+@router.post("/query/batch", response_model=BatchAgentQueryResponse)
+async def process_agent_query_batch(
+    data: BatchAgentQuery,
+    current_user: Any = Depends(deps.get_current_active_user),
+    deadline: float = Depends(deps.get_request_deadline)
+) -> Any:
+    """
+    Processes several queries in one request. Identical query/context pairs run
+    once; distinct ones run concurrently (AGENT_BATCH_CONCURRENCY at a time).
+    Results come back in request order, each with either a response or an error.
+    Each distinct run is admitted on its own, so a batch counts against the
+    concurrency limits like the same queries sent separately; runs that are
+    shed come back as errors, and a batch shed entirely gets 429.
+    """
+    queries = [(item.query, _scoped(item.context, current_user)) for item in data.queries]
+    rejections: List[AdmissionRejected] = []
+
+    @contextlib.asynccontextmanager
+    async def admit() -> AsyncIterator[None]:
+        try:
+            admitted_at = await admission.acquire(current_user.email, remaining_budget(deadline))
+        except AdmissionRejected as e:
+            rejections.append(e)
+            raise
+        try:
+            yield
+        finally:
+            admission.release(current_user.email, admitted_at)
+
+    results = await orchestrator.process_batch(
+        queries, concurrency=settings.AGENT_BATCH_CONCURRENCY, deadline=deadline, admit=admit
+    )
+    # Duplicate items share their run's result object, so this counts distinct runs
+    if rejections and len(rejections) == len({id(result) for result in results}):
+        raise _overloaded(max(rejections, key=lambda e: e.retry_after))
+    return {"results": results}
+
+@router.post("/query/stream")
+async def stream_agent_query(
+    data: AgentQuery,
+    request: Request,
+    current_user: Any = Depends(deps.get_current_active_user),
+    deadline: float = Depends(deps.get_request_deadline)
+) -> StreamingResponse:
+    """
+    Streams workflow progress as newline-delimited JSON events, ending with
+    a "final" event. Disconnecting stops the workflow early.
+    Admitted like /query (429 when shed); the slot is held until the stream closes.
+    """
+    try:
+        admitted_at = await admission.acquire(current_user.email, remaining_budget(deadline))
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    released = False
+
+    def release() -> None:
+        # Called when the stream closes, and again as a background task in case it never started
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(current_user.email, admitted_at)
+
+    async def events() -> AsyncIterator[str]:
+        context = _scoped(data.context, current_user)
+        stream = orchestrator.stream_query(data.query, context=context, deadline=deadline)
+        try:
+            async for event in stream:
+                if await request.is_disconnected():
+                    break
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "detail": f"Agent processing error: {str(e)}"}) + "\n"
+        finally:
+            await stream.aclose()
+            release()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson", background=BackgroundTask(release))
+
+def _fetch_rows(table: str, state: Optional[str], row_ids: List[int]) -> Optional[Dict[int, dict]]:
+    """
+    Rows by row id; None once the table has changed since `state`, as the ids
+    may point at other rows. Raises PermissionError for tables clients may not read.
+    """
+    conn = get_duckdb_conn()
+    if not is_user_table(conn, table):
+        raise PermissionError(table)
+    try:
+        current = fingerprint_table(conn, table)
+    except duckdb.Error:
+        current = None
+    if state is None or current != state:
+        return None
+    rows = conn.execute(
+        f"SELECT rowid AS __rowid, * FROM {quote_identifier(table)} WHERE rowid IN (SELECT unnest(?))", [row_ids]
+    ).df()
+    records = json.loads(rows.to_json(orient="records", date_format="iso"))
+    return {record.pop("__rowid"): record for record in records}
+
+@router.get("/anomalies/{result_id}")
+async def get_anomaly_page(
+    result_id: str,
+    column: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Pages through the rows flagged by an EDA run (`anomaly_result_id` in its metadata),
+    for one column or across all columns; only the user who ran it (or a superuser) may.
+    Rows of catalog tables include their values, or 410 once the table has changed
+    (403 for tables clients may not read).
+    """
+    result = await asyncio.to_thread(get_anomaly_results().get, result_id)
+    if result is None or (result.owner != current_user.email and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Anomaly result not found or expired")
+    try:
+        page = result.page(column, offset, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No anomaly results for column '{column}'")
+
+    if result.table is not None and page["rows"]:
+        try:
+            values = await asyncio.to_thread(
+                _fetch_rows, result.table, result.table_state, [row["index"] for row in page["rows"]]
+            )
+        except PermissionError:
+            raise HTTPException(status_code=403, detail="Not allowed to read this table")
+        if values is None:
+            raise HTTPException(status_code=410, detail="The table has changed since these rows were flagged")
+        for row in page["rows"]:
+            row["values"] = values.get(row["index"])
+    return {"result_id": result_id, "method": result.method, "threshold": result.threshold, **page}
@@ -1,25 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
 from datetime import timedelta
 from typing import Any
 from backend.core.config import settings
-from backend.core import security
+from backend.core import security, users
+from backend.core.db import get_db
 from backend.schemas.user import Token
 
 auth_router = APIRouter()
 
 @auth_router.post("/login", response_model=Token)
 async def login_access_token(
+    db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, retrieve an access token for future requests
     """
-    # MOCK USER for initial setup; replace with DB check later
-    # password is "password"
-    mock_hashed_password = security.get_password_hash("password")
+    user = await users.authenticate(db, form_data.username, form_data.password)
     
-    if form_data.username != "admin@example.com" or not security.verify_password(form_data.password, mock_hashed_password):
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
@@ -28,7 +29,7 @@ async def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            subject=form_data.username, expires_delta=access_token_expires
+            subject=user.email, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
     }
@@ -0,0 +1,91 @@
+import asyncio
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import Any, Optional
+from backend.core.config import settings
+from backend.core.db import catalog_changed
+from pipelines.datasets import get_dataset_registry
+from backend.api import deps
+
+router = APIRouter()
+
+# Uploads are written to disk in blocks of about this size
+UPLOAD_WRITE_BYTES = 8 * 1024 ** 2
+
+def _public(info: dict) -> dict:
+    """Dataset metadata without its server-side storage path."""
+    return {key: value for key, value in info.items() if key != "path"}
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def upload_dataset(
+    request: Request,
+    name: Optional[str] = None,
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Uploads a dataset as the raw request body: an Arrow IPC stream or file, or
+    a Parquet file (told apart by content, so any Content-Type works). The body
+    is streamed to disk and registered with DuckDB without conversion. Pass the
+    returned `dataset_id` in a query's context to analyze it.
+    """
+    registry = get_dataset_registry()
+    path = registry.new_upload_path()
+    size = 0
+    buffer = bytearray()
+    try:
+        with open(path, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.DATASET_MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Dataset exceeds {settings.DATASET_MAX_UPLOAD_BYTES} bytes",
+                    )
+                buffer += chunk
+                # Disk writes run in a thread, a block of chunks at a time, to keep the event loop free
+                if len(buffer) >= UPLOAD_WRITE_BYTES:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(f.write, bytes(buffer))
+    except BaseException:
+        os.remove(path)
+        raise
+    if size == 0:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Empty upload")
+
+    try:
+        info = await asyncio.to_thread(registry.register, path, name, current_user.email)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    catalog_changed()
+    return _public(info)
+
+@router.get("/{dataset_id}")
+async def get_dataset(
+    dataset_id: str,
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> Any:
+    """Dataset metadata; only its uploader or a superuser may see it."""
+    info = await asyncio.to_thread(get_dataset_registry().info, dataset_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if info["owner"] != current_user.email and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not allowed to access this dataset")
+    return _public(info)
+
+@router.delete("/{dataset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_dataset(
+    dataset_id: str,
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> None:
+    """Deletes a dataset; only its uploader or a superuser may do so."""
+    registry = get_dataset_registry()
+    info = await asyncio.to_thread(registry.info, dataset_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if info["owner"] != current_user.email and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not allowed to delete this dataset")
+    await asyncio.to_thread(registry.delete, dataset_id)
+    catalog_changed()
@@ -1,10 +1,13 @@
+import time
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from pydantic import ValidationError
-from backend.core import security
+from sqlalchemy.orm import Session
+from backend.core import security, users
 from backend.core.config import settings
+from backend.core.db import get_db
 from backend.schemas.user import User, TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -12,12 +15,11 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 def get_current_user(
+    db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> User:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = security.decode_access_token(token)
         token_data = TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
@@ -25,17 +27,10 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
-    # In a real app, you would fetch from DB here
-    # User is mock for initial demo
-    if token_data.sub == "admin@example.com":
-        return User(
-            id=1,
-            email="admin@example.com",
-            full_name="Admin User",
-            is_superuser=True
-        )
-    else:
+    user = users.get_user_by_email(db, token_data.sub) if token_data.sub else None
+    if user is None:
         raise HTTPException(status_code=404, detail="User not found")
+    return User.model_validate(user.model_dump(exclude={"hashed_password"}))
 
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -52,3 +47,13 @@ def get_current_active_superuser(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+def get_request_deadline(x_request_timeout: Optional[float] = Header(None, gt=0)) -> float:
+    """
+    Absolute deadline (epoch seconds) for the request: now plus the client's
+    X-Request-Timeout, capped at AGENT_REQUEST_TIMEOUT_SECONDS (also the default).
+    """
+    timeout = settings.AGENT_REQUEST_TIMEOUT_SECONDS
+    if x_request_timeout is not None:
+        timeout = min(timeout, x_request_timeout)
+    return time.time() + timeout
@@ -0,0 +1,63 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict
+from backend.core.db import publish_duckdb_snapshot
+from backend.core.jobs import FINISHED, get_job_store
+from ml.forecast_store import get_forecast_store
+from pipelines.datasets import get_dataset_registry, with_dataset_owner
+from pipelines.profile_store import get_profile_store
+from backend.schemas.agent import AgentQuery
+from backend.api import deps
+
+router = APIRouter()
+
+PUBLIC_FIELDS = ("job_id", "status", "progress", "stage", "result", "error", "created_at", "started_at", "finished_at")
+
+async def _owned_job(job_id: str, current_user: Any) -> Dict[str, Any]:
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None or (job["user"] != current_user.email and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _publish_catalog() -> str:
+    """Snapshots the catalog for job workers, with every store's table in place so they can open it read-only."""
+    get_dataset_registry()
+    get_profile_store()
+    get_forecast_store()
+    return publish_duckdb_snapshot()
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    data: AgentQuery,
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Queues a query for a job worker and returns its `job_id` immediately.
+    Poll GET /jobs/{job_id} for progress and the result. The job reads the
+    catalog as it stands now, through a read-only snapshot.
+    """
+    catalog = await asyncio.to_thread(_publish_catalog)
+    context = with_dataset_owner(data.context, current_user.email, current_user.is_superuser)
+    job_id = await asyncio.to_thread(get_job_store().submit, current_user.email, data.query, context, catalog)
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> Any:
+    """Status, progress (0..1) and current stage of a job; `result` once it has succeeded."""
+    job = await _owned_job(job_id, current_user)
+    return {field: job.get(field) for field in PUBLIC_FIELDS}
+
+@router.delete("/{job_id}", status_code=status.HTTP_202_ACCEPTED)
+async def cancel_job(
+    job_id: str,
+    current_user: Any = Depends(deps.get_current_active_user)
+) -> Any:
+    """Cancels a queued job; a running one stops at its worker's next heartbeat."""
+    job = await _owned_job(job_id, current_user)
+    if job["status"] in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    await asyncio.to_thread(get_job_store().cancel, job_id)
+    return {"job_id": job_id, "status": "cancelling" if job["status"] == "running" else "cancelled"}
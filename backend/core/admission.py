@@ -0,0 +1,161 @@
+import asyncio
+import contextlib
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional
+from backend.core.config import settings
+from monitoring.metrics import ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; `retry_after` is the suggested wait in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Admission control for orchestrator runs.
+
+    At most `limit` runs execute at once; further requests wait in a bounded
+    FIFO queue for up to `queue_timeout` seconds, and are rejected outright
+    when the queue is full or their user already has `per_user_limit` runs
+    executing or waiting. The limit adapts AIMD-style: it grows by about one
+    per `limit` runs finishing within `target_latency`, and halves (at most
+    once per target_latency) when a run takes longer.
+
+    State is only touched from the event loop, so no lock is needed.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        per_user_limit: int = 4,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        target_latency: float = 5.0,
+        decrease_factor: float = 0.5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.active = 0
+        self.per_user: Dict[str, int] = {}
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency = target_latency / 2
+        self._last_decrease = 0.0
+        ADMISSION_LIMIT.set(self.limit)
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            initial_limit=settings.ADMISSION_INITIAL_CONCURRENCY,
+            min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+            max_limit=settings.ADMISSION_MAX_CONCURRENCY,
+            per_user_limit=settings.ADMISSION_PER_USER_LIMIT,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            target_latency=settings.ADMISSION_TARGET_LATENCY_SECONDS,
+        )
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new request has likely drained."""
+        return max(1, math.ceil(self._latency * (len(self._waiters) + 1) / max(int(self.limit), 1)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+        return AdmissionRejected(reason, self.retry_after())
+
+    async def acquire(self, user: str, timeout: Optional[float] = None) -> float:
+        """
+        Waits for a slot, at most `queue_timeout` or `timeout` seconds (the
+        request's remaining budget); returns the admission time to pass to `release`.
+        """
+        if self.per_user.get(user, 0) >= self.per_user_limit:
+            raise self._reject("user_limit")
+        if self.active < int(self.limit) and not self._waiters:
+            self._start(user)
+            return time.perf_counter()
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.per_user[user] = self.per_user.get(user, 0) + 1
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+        try:
+            wait = self.queue_timeout if timeout is None else max(0.0, min(self.queue_timeout, timeout))
+            await asyncio.wait_for(asyncio.shield(waiter), wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the wait ended: hand it back
+                self.active -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            self._leave(user)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject("queue_timeout")
+        # `_wake` already counted the slot in `active`; the user was counted on entry
+        ADMISSION_IN_FLIGHT.set(self.active)
+        return time.perf_counter()
+
+    def _start(self, user: str) -> None:
+        self.active += 1
+        self.per_user[user] = self.per_user.get(user, 0) + 1
+        ADMISSION_IN_FLIGHT.set(self.active)
+
+    def _leave(self, user: str) -> None:
+        self.per_user[user] -= 1
+        if self.per_user[user] <= 0:
+            del self.per_user[user]
+
+    def release(self, user: str, admitted_at: float) -> None:
+        latency = time.perf_counter() - admitted_at
+        self.active -= 1
+        self._leave(user)
+        self._adapt(latency)
+        ADMISSION_IN_FLIGHT.set(self.active)
+        self._wake()
+
+    def _adapt(self, latency: float) -> None:
+        self._latency = 0.8 * self._latency + 0.2 * latency
+        now = time.monotonic()
+        if latency > self.target_latency:
+            if now - self._last_decrease > self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        ADMISSION_LIMIT.set(self.limit)
+
+    def _wake(self) -> None:
+        """Hands free slots to queued requests in arrival order."""
+        while self._waiters and self.active < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+    @contextlib.asynccontextmanager
+    async def admit(self, user: str, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        admitted_at = await self.acquire(user, timeout)
+        try:
+            yield
+        finally:
+            self.release(user, admitted_at)
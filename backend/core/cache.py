@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import pickle
+from typing import Any, Optional
+
+import duckdb
+import numpy as np
+import pandas as pd
+from backend.core.config import settings
+from backend.core.db import get_duckdb_conn
+from backend.core.lru import CacheBackend, InMemoryCache
+from ml.forecast_store import get_forecast_store
+from pipelines.datasets import DATASET_ANY_OWNER, DATASET_OWNER, dataset_any_owner, dataset_owner, get_dataset_registry
+from pipelines.duckdb_eda import quote_identifier
+from pipelines.profile_store import table_oid, table_version
+
+logger = logging.getLogger(__name__)
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis-backed cache shared by all API workers.
+    TTL is enforced per key; size-based LRU eviction relies on the server's
+    `maxmemory-policy allkeys-lru` (see docker-compose.yml).
+    """
+
+    def __init__(self, url: str, prefix: str = "omnichain:result:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        payload = self.client.get(self.prefix + key)
+        return pickle.loads(payload) if payload is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(self.prefix + key, pickle.dumps(value), px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+# Frames up to this many rows are hashed whole; larger ones by an even sample of this many rows
+FINGERPRINT_SAMPLE_ROWS = 4096
+
+
+def fingerprint_dataframe(df: pd.DataFrame) -> str:
+    """
+    Hash of a DataFrame's schema, shape and rows. Large frames hash only an
+    evenly spaced sample of rows (first and last included), so the cost stays
+    flat with size; an edit confined to unsampled rows of a frame of the same
+    shape is not noticed.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(df.columns), [str(t) for t in df.dtypes], df.shape)).encode())
+    if len(df) > FINGERPRINT_SAMPLE_ROWS:
+        df = df.iloc[np.linspace(0, len(df) - 1, FINGERPRINT_SAMPLE_ROWS).astype(np.int64)]
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_table(conn, table_name: str) -> str:
+    """
+    Metadata fingerprint of a DuckDB table: its oid, row count and load
+    version, none of which reads column data. Writes through the ETL
+    pipeline, or recorded with ProfileStore.mark_changed, change it.
+    """
+    count = conn.execute(f"SELECT count(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+    return f"{table_name}:{table_oid(conn, table_name)}:{count}:{table_version(conn, table_name)}"
+
+
+def fingerprint_context(context: Optional[dict], table_name_fallback: bool = False) -> str:
+    """
+    Cheap, stable fingerprint of an agent context: DataFrames are hashed by
+    (sampled) content, DuckDB tables by metadata, dataset names by the upload they currently refer to,
+    forecast-state requests by the store's version, other JSON-like values by
+    their serialized form. With `table_name_fallback`, a table whose metadata
+    cannot be read (e.g. it does not exist) is keyed by its name instead of raising.
+    """
+    if not context:
+        return "none"
+    parts = {}
+    for key, value in sorted(context.items()):
+        if isinstance(value, pd.DataFrame):
+            parts[key] = fingerprint_dataframe(value)
+        elif isinstance(value, duckdb.DuckDBPyConnection):
+            continue
+        elif key == "table" and isinstance(value, str):
+            try:
+                parts[key] = fingerprint_table(context.get("duckdb_conn") or get_duckdb_conn(), value)
+            except Exception as e:
+                if not table_name_fallback:
+                    raise
+                logger.warning(f"Could not fingerprint table {value!r}, keying it by name: {e}")
+                parts[key] = json.dumps(value)
+        elif key in (DATASET_OWNER, DATASET_ANY_OWNER):
+            # Only scope the dataset reference, which is keyed by the upload it resolves to
+            continue
+        elif key in ("dataset", "dataset_id") and isinstance(value, str):
+            # Names can be re-uploaded; uploads themselves are immutable, so the id suffices.
+            # Resolving also owner-checks ids, so a cached result is never served for another user's upload.
+            parts[key] = get_dataset_registry().resolve(
+                value, dataset_owner(context), dataset_any_owner(context)
+            )["dataset_id"]
+        elif key == "forecast_state" and value:
+            # Forecasts from stored state change with every load that advances it
+            parts[key] = get_forecast_store().version()
+        else:
+            parts[key] = json.dumps(value, sort_keys=True, default=repr)
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Caches agent responses by routed intent, normalized query and dataset fingerprint.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 300.0):
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, intent: str, query: str, context: Optional[dict], per_user: bool = False) -> str:
+        """With `per_user`, entries are shared only between runs for the same dataset owner."""
+        normalized = " ".join(query.lower().split())
+        query_hash = hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+        key = f"{intent}:{query_hash}:{fingerprint_context(context)}"
+        return f"{key}:{dataset_owner(context)}" if per_user else key
+
+    def get(self, key: str) -> Optional[Any]:
+        # A cache outage degrades to a miss rather than failing the request
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Result cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Result cache write failed: {e}")
+
+
+def get_result_cache() -> ResultCache:
+    """Builds the result cache configured in settings."""
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        backend = RedisCache(settings.REDIS_URL)
+    else:
+        backend = InMemoryCache(max_entries=settings.RESULT_CACHE_MAX_ENTRIES, copy_values=True)
+    return ResultCache(backend, ttl=settings.RESULT_CACHE_TTL_SECONDS)
+
+
+_anomaly_results: Optional[CacheBackend] = None
+
+
+def get_anomaly_results() -> CacheBackend:
+    """
+    Store of full AnomalyResults by id, for paginated retrieval. It lives in
+    the result cache's backend, so with Redis any API process or job worker
+    can serve a result another one produced. Entries live for ANOMALY_RESULT_TTL_SECONDS.
+    """
+    global _anomaly_results
+    if _anomaly_results is None:
+        if settings.RESULT_CACHE_BACKEND == "redis":
+            _anomaly_results = RedisCache(settings.REDIS_URL, prefix="omnichain:anomaly:")
+        else:
+            _anomaly_results = InMemoryCache(max_entries=settings.ANOMALY_RESULT_MAX_ENTRIES)
+    return _anomaly_results
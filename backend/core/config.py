@@ -9,6 +9,11 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Auth caches
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
     # Database
     POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "admin")
@@ -20,6 +25,73 @@ class Settings(BaseSettings):
     def get_db_url(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
+    # DuckDB analytical catalog (shared by all requests in a process)
+    DUCKDB_PATH: str = os.getenv("DUCKDB_PATH", "data/omnichain.duckdb")
+    DUCKDB_MEMORY_LIMIT: str = os.getenv("DUCKDB_MEMORY_LIMIT", "2GB")
+    DUCKDB_THREADS: int = int(os.getenv("DUCKDB_THREADS", "4"))
+    # Read-only copies of the catalog published for job workers
+    DUCKDB_SNAPSHOT_DIR: str = os.getenv("DUCKDB_SNAPSHOT_DIR", "data/catalog_snapshots")
+    DUCKDB_SNAPSHOT_KEEP: int = int(os.getenv("DUCKDB_SNAPSHOT_KEEP", "3"))
+
+    # Agent result cache ("memory" or "redis")
+    RESULT_CACHE_BACKEND: str = os.getenv("RESULT_CACHE_BACKEND", "memory")
+    RESULT_CACHE_TTL_SECONDS: float = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Full anomaly results kept for paginated retrieval (reports carry summaries only)
+    ANOMALY_RESULT_TTL_SECONDS: float = float(os.getenv("ANOMALY_RESULT_TTL_SECONDS", "3600"))
+    ANOMALY_RESULT_MAX_ENTRIES: int = int(os.getenv("ANOMALY_RESULT_MAX_ENTRIES", "256"))
+
+    # Upper bound (and default) for a request's deadline; clients may ask for less via X-Request-Timeout
+    AGENT_REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("AGENT_REQUEST_TIMEOUT_SECONDS", "300"))
+
+    # Batch queries: identical items run once, distinct ones at most this many at a time
+    AGENT_BATCH_MAX_ITEMS: int = int(os.getenv("AGENT_BATCH_MAX_ITEMS", "100"))
+    AGENT_BATCH_CONCURRENCY: int = int(os.getenv("AGENT_BATCH_CONCURRENCY", "4"))
+
+    # Admission control in front of orchestrator runs (adaptive limit between min and max)
+    ADMISSION_INITIAL_CONCURRENCY: int = int(os.getenv("ADMISSION_INITIAL_CONCURRENCY", "4"))
+    ADMISSION_MIN_CONCURRENCY: int = int(os.getenv("ADMISSION_MIN_CONCURRENCY", "1"))
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "16"))
+    ADMISSION_PER_USER_LIMIT: int = int(os.getenv("ADMISSION_PER_USER_LIMIT", "4"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+    ADMISSION_TARGET_LATENCY_SECONDS: float = float(os.getenv("ADMISSION_TARGET_LATENCY_SECONDS", "5"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_SECONDS: float = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+
+    # Asynchronous jobs ("auto" uses Redis when reachable, SQLite otherwise)
+    JOB_BACKEND: str = os.getenv("JOB_BACKEND", "auto")
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "data/jobs.sqlite3")
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    JOB_INLINE_WORKERS: int = int(os.getenv("JOB_INLINE_WORKERS", "0"))
+    JOB_TIMEOUT_SECONDS: float = float(os.getenv("JOB_TIMEOUT_SECONDS", "3600"))
+    JOB_HEARTBEAT_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+    JOB_STALE_SECONDS: float = float(os.getenv("JOB_STALE_SECONDS", "60"))
+    JOB_RESULT_TTL_SECONDS: float = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+
+    # Uploaded Arrow / Parquet datasets, referenced by id in agent contexts
+    DATASET_DIR: str = os.getenv("DATASET_DIR", "data/datasets")
+    DATASET_MAX_UPLOAD_BYTES: int = int(os.getenv("DATASET_MAX_UPLOAD_BYTES", str(2 * 1024 ** 3)))
+    # Resident columns shared by all agents, evicted least recently used first
+    DATASET_CACHE_MAX_BYTES: int = int(os.getenv("DATASET_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+    # Agent worker pool for CPU-heavy analysis
+    AGENT_POOL_SIZE: int = int(os.getenv("AGENT_POOL_SIZE", "2"))
+    AGENT_MAX_TASKS_PER_WORKER: int = int(os.getenv("AGENT_MAX_TASKS_PER_WORKER", "100"))
+    AGENT_TASK_TIMEOUT_SECONDS: float = float(os.getenv("AGENT_TASK_TIMEOUT_SECONDS", "300"))
+    AGENT_OFFLOAD_MIN_ROWS: int = int(os.getenv("AGENT_OFFLOAD_MIN_ROWS", "100000"))
+
+    # Monitoring
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_RATE_LIMIT_PER_SECOND: float = float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", "50"))
+    LOG_RATE_LIMIT_BURST: int = int(os.getenv("LOG_RATE_LIMIT_BURST", "200"))
+    METRICS_LATENCY_BUCKETS: str = os.getenv(
+        "METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120"
+    )
+
     # AI Agents
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
 
@@ -1,21 +1,267 @@
+import atexit
+import glob
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import duckdb
 from backend.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # PostgreSQL Setup
 engine = create_engine(settings.get_db_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # DuckDB Setup (for fast analytical queries / EDA)
-def get_duckdb_conn():
+_duckdb_catalog = None
+_duckdb_lock = threading.Lock()
+_duckdb_local = threading.local()
+# Catalog bound to the running job in a worker process (see use_duckdb_catalog)
+_job_catalog: ContextVar[Optional[duckdb.DuckDBPyConnection]] = ContextVar("job_catalog", default=None)
+# Read-only snapshot connections by path, each with the number of running jobs holding it
+_snapshot_conns: Dict[str, list] = {}
+_latest_snapshot: Optional[str] = None
+# Objects built on each open catalog (see catalog_scoped), dropped when it closes
+_catalog_stores: Dict[duckdb.DuckDBPyConnection, Dict[str, Any]] = {}
+_stores_lock = threading.Lock()
+# Bumped by catalog_changed(); a snapshot is only published when it has moved
+_catalog_version = 0
+# (catalog version, path, copy in progress) of the newest snapshot
+_published: Tuple[Optional[int], Optional[str], Optional[Future]] = (None, None, None)
+_publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-snapshot")
+
+def _duckdb_config() -> dict:
+    return {
+        "memory_limit": settings.DUCKDB_MEMORY_LIMIT,
+        "threads": settings.DUCKDB_THREADS,
+    }
+
+def _process_catalog() -> duckdb.DuckDBPyConnection:
+    global _duckdb_catalog
+    if _duckdb_catalog is None:
+        with _duckdb_lock:
+            if _duckdb_catalog is None:
+                path = settings.DUCKDB_PATH
+                if path != ":memory:" and os.path.dirname(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                _duckdb_catalog = duckdb.connect(database=path, config=_duckdb_config())
+    return _duckdb_catalog
+
+def get_duckdb_catalog() -> duckdb.DuckDBPyConnection:
+    """
+    Returns the DuckDB database for the caller: the snapshot bound to the
+    running job in a worker process, otherwise the process-wide catalog,
+    opened on first use. The catalog is file-backed (settings.DUCKDB_PATH),
+    so ingested tables survive restarts. DuckDB allows a single read-write
+    process per file.
+    """
+    catalog = _job_catalog.get()
+    if catalog is not None:
+        return catalog
+    return _process_catalog()
+
+def catalog_scoped(name: str, factory: Callable[[duckdb.DuckDBPyConnection], Any]) -> Any:
+    """
+    Returns the object `factory(catalog)` registered as `name` for the
+    caller's catalog, building it on first use. Jobs on different snapshots
+    get their own; it is dropped when the snapshot is closed.
+    """
+    catalog = get_duckdb_catalog()
+    with _stores_lock:
+        scoped = _catalog_stores.setdefault(catalog, {})
+        if name not in scoped:
+            scoped[name] = factory(catalog)
+        return scoped[name]
+
+def catalog_changed() -> None:
+    """Records a write to the catalog, so the next job submission publishes a new snapshot."""
+    global _catalog_version
+    with _duckdb_lock:
+        _catalog_version += 1
+
+def _list_snapshots() -> list:
+    """Published snapshot files, oldest first."""
+    return sorted(glob.glob(os.path.join(settings.DUCKDB_SNAPSHOT_DIR, "catalog-*.duckdb")))
+
+def _copy_catalog(path: str) -> None:
+    tmp_path = path + ".tmp"
+    alias = f"snapshot_{uuid.uuid4().hex}"
+    cur = _process_catalog().cursor()
+    try:
+        source = cur.execute("SELECT current_database()").fetchone()[0]
+        cur.execute(f"ATTACH '{tmp_path}' AS {alias}")
+        try:
+            cur.execute(f'COPY FROM DATABASE "{source}" TO {alias}')
+        finally:
+            cur.execute(f"DETACH {alias}")
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        cur.close()
+    os.replace(tmp_path, path)
+    for old in _list_snapshots()[:-max(settings.DUCKDB_SNAPSHOT_KEEP, 1)]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+def _snapshot_done(path: str, copy: Future) -> None:
+    global _published
+    if copy.exception() is None:
+        return
+    logger.error(f"Publishing catalog snapshot {path} failed: {copy.exception()}")
+    with _duckdb_lock:
+        if _published[1] == path:
+            _published = (None, None, None)
+
+def publish_duckdb_snapshot() -> str:
+    """
+    Returns the path of a snapshot of the catalog for job workers, holding
+    at least every write made before the call. DuckDB locks the catalog file for the API process, so workers
+    cannot open it even read-only; they open the snapshot published when
+    their job was submitted instead. Submissions share one snapshot until a
+    writer calls catalog_changed(). A new snapshot is copied on a background
+    thread; its path is returned at once, and open_duckdb_snapshot() waits
+    for the file to appear.
     """
-    Returns a connection to a DuckDB instance.
-    For production, this could point to a persistent file or S3.
+    global _published
+    _process_catalog()
+    with _duckdb_lock:
+        version, path, copy = _published
+        if version == _catalog_version and (copy is not None and not copy.done() or os.path.exists(path)):
+            return path
+        os.makedirs(settings.DUCKDB_SNAPSHOT_DIR, exist_ok=True)
+        path = os.path.join(settings.DUCKDB_SNAPSHOT_DIR, f"catalog-{time.time_ns()}.duckdb")
+        copy = _publisher.submit(_copy_catalog, path)
+        _published = (_catalog_version, path, copy)
+    copy.add_done_callback(lambda done: _snapshot_done(path, done))
+    return path
+
+def _ready_snapshot(path: Optional[str], wait: float) -> str:
+    deadline = time.monotonic() + wait
+    while True:
+        if path and os.path.exists(path):
+            return path
+        snapshots = _list_snapshots()
+        # Paths older than the newest snapshot were pruned; newer ones are still being copied
+        if snapshots and (not path or os.path.basename(path) <= os.path.basename(snapshots[-1])):
+            return snapshots[-1]
+        if time.monotonic() >= deadline:
+            raise FileNotFoundError(f"catalog snapshot {path or ''} not published in {settings.DUCKDB_SNAPSHOT_DIR}")
+        time.sleep(0.05)
+
+def _close_idle_snapshot(path: str) -> None:
+    # Called with _duckdb_lock held; the newest snapshot stays open for the next job
+    entry = _snapshot_conns.get(path)
+    if entry is None or entry[1] > 0 or path == _latest_snapshot:
+        return
+    del _snapshot_conns[path]
+    with _stores_lock:
+        _catalog_stores.pop(entry[0], None)
+    entry[0].close()
+
+def open_duckdb_snapshot(path: Optional[str] = None, wait: float = 60.0) -> duckdb.DuckDBPyConnection:
     """
-    return duckdb.connect(database=':memory:')
+    Opens a published snapshot read-only for one job; release it with
+    release_duckdb_snapshot(). Jobs on the same snapshot share a connection.
+    Waits up to `wait` seconds for a snapshot still being copied, and falls
+    back to the newest one when `path` is missing or has been pruned.
+    """
+    global _latest_snapshot
+    path = _ready_snapshot(path, wait)
+    with _duckdb_lock:
+        entry = _snapshot_conns.get(path)
+        if entry is None:
+            conn = duckdb.connect(database=path, read_only=True, config=_duckdb_config())
+            entry = _snapshot_conns[path] = [conn, 0]
+        entry[1] += 1
+        if _latest_snapshot is None or os.path.basename(path) > os.path.basename(_latest_snapshot):
+            superseded, _latest_snapshot = _latest_snapshot, path
+            if superseded is not None:
+                _close_idle_snapshot(superseded)
+        return entry[0]
+
+def release_duckdb_snapshot(catalog: duckdb.DuckDBPyConnection) -> None:
+    """Releases a job's snapshot; it is closed once no running job holds it and a newer one is open."""
+    with _duckdb_lock:
+        for path, entry in _snapshot_conns.items():
+            if entry[0] is catalog:
+                entry[1] -= 1
+                break
+        else:
+            return
+        _close_idle_snapshot(path)
+
+def use_duckdb_catalog(catalog: duckdb.DuckDBPyConnection) -> None:
+    """
+    Binds `catalog` to the current context: the calling task, and threads it
+    starts with asyncio.to_thread, read it through get_duckdb_catalog().
+    """
+    _job_catalog.set(catalog)
+
+def get_duckdb_conn() -> duckdb.DuckDBPyConnection:
+    """
+    Returns a cursor on the caller's DuckDB catalog for the calling thread.
+    Cursors are cheap and see every table in the catalog; use
+    `new_duckdb_cursor()` when a task needs one it does not share.
+    """
+    catalog = get_duckdb_catalog()
+    if getattr(_duckdb_local, "catalog", None) is not catalog:
+        _duckdb_local.catalog = catalog
+        _duckdb_local.cursor = catalog.cursor()
+    return _duckdb_local.cursor
+
+# Catalog tables the stores keep for themselves: internal ("_*") tables and forecast state
+RESERVED_TABLES = ("forecast_state",)
+
+def is_user_table(conn, table_name: str) -> bool:
+    """
+    Whether `table_name` is a table of the catalog's main schema that clients
+    may name in a query context: loaded data, not a store's internal table,
+    view or system object.
+    """
+    parts = table_name.split(".")
+    if len(parts) > 2 or (len(parts) == 2 and parts[0].lower() != "main"):
+        return False
+    name = parts[-1]
+    if name.startswith("_") or name.lower() in RESERVED_TABLES:
+        return False
+    return conn.execute(
+        "SELECT count(*) FROM duckdb_tables() WHERE database_name = current_database() "
+        "AND schema_name = 'main' AND NOT temporary AND lower(table_name) = lower(?)",
+        [name],
+    ).fetchone()[0] > 0
+
+def new_duckdb_cursor() -> duckdb.DuckDBPyConnection:
+    """Returns a dedicated cursor on the caller's DuckDB catalog."""
+    return get_duckdb_catalog().cursor()
+
+@atexit.register
+def close_duckdb_catalog():
+    """Checkpoints and closes the shared DuckDB catalog and any open snapshots."""
+    global _duckdb_catalog, _latest_snapshot
+    _publisher.shutdown(wait=True)
+    with _duckdb_lock:
+        if _duckdb_catalog is not None:
+            _duckdb_catalog.close()
+            _duckdb_catalog = None
+        for conn, _ in _snapshot_conns.values():
+            conn.close()
+        _snapshot_conns.clear()
+        _latest_snapshot = None
+    with _stores_lock:
+        _catalog_stores.clear()
 
 def get_db():
     db = SessionLocal()
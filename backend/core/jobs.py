@@ -0,0 +1,397 @@
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Iterator, Optional
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED = ("succeeded", "failed", "cancelled")
+# Fields holding JSON documents; everything else is a scalar
+JSON_FIELDS = ("context", "result")
+
+
+class JobStore:
+    """
+    Queue and record of asynchronous agent jobs shared by the API and workers.
+
+    A job is a dict with job_id, user, query, context, catalog (the DuckDB
+    catalog snapshot the job reads), status (one of JOB_STATUSES), progress
+    (0..1), stage, result, error, worker and created_at / started_at /
+    finished_at / heartbeat_at timestamps.
+    """
+
+    def submit(self, user: str, query: str, context: Optional[dict], catalog: Optional[str] = None) -> str:
+        raise NotImplementedError("Subclasses must implement submit()")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError("Subclasses must implement get()")
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atomically moves the oldest queued job to running for `worker`; None if the queue is empty."""
+        raise NotImplementedError("Subclasses must implement claim()")
+
+    def update(self, job_id: str, **fields) -> None:
+        """Records progress (progress, stage) and refreshes the job's heartbeat."""
+        raise NotImplementedError("Subclasses must implement update()")
+
+    def finish(
+        self, job_id: str, worker: str, status: str, result: Optional[dict] = None, error: Optional[str] = None
+    ) -> bool:
+        """
+        Records the outcome of `worker`'s run. Only a job still running for
+        that worker is written, so a worker whose job was requeued (and
+        possibly cancelled or run again since) cannot overwrite it; returns
+        whether the outcome was recorded.
+        """
+        raise NotImplementedError("Subclasses must implement finish()")
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a queued job, or asks the worker running it to stop. False if already finished."""
+        raise NotImplementedError("Subclasses must implement cancel()")
+
+    def cancel_requested(self, job_id: str) -> bool:
+        raise NotImplementedError("Subclasses must implement cancel_requested()")
+
+    def requeue_stale(self, older_than: float) -> int:
+        """
+        Requeues running jobs whose worker has not sent a heartbeat for
+        `older_than` seconds. Those whose cancellation was requested are
+        cancelled instead, so no job goes back to the queue flagged for cancelling.
+        """
+        raise NotImplementedError("Subclasses must implement requeue_stale()")
+
+    def purge(self, older_than: float) -> int:
+        """Deletes finished jobs older than `older_than` seconds."""
+        return 0
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a local SQLite file, for development and single-host runs.
+    Any number of API and worker processes on the host can share the file;
+    claims are single UPDATE ... RETURNING statements, so each job goes to one worker.
+    """
+
+    COLUMNS = (
+        "job_id", "user", "query", "context", "catalog", "status", "progress", "stage", "result", "error",
+        "worker", "cancel_requested", "created_at", "started_at", "finished_at", "heartbeat_at",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, user TEXT, query TEXT, context TEXT, catalog TEXT, status TEXT, "
+                "progress REAL DEFAULT 0, stage TEXT, result TEXT, error TEXT, worker TEXT, "
+                "cancel_requested INTEGER DEFAULT 0, created_at REAL, started_at REAL, "
+                "finished_at REAL, heartbeat_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            # Job files created before jobs recorded their catalog snapshot
+            if "catalog" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN catalog TEXT")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit: every statement is its own transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        for field in JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(self, user: str, query: str, context: Optional[dict], catalog: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, user, query, context, catalog, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                [job_id, user, query, json.dumps(context), catalog, time.time()],
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", [job_id]).fetchone()
+        return self._row(row)
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? "
+                "WHERE job_id = (SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) "
+                f"AND status = 'queued' RETURNING {', '.join(self.COLUMNS)}",
+                [worker, now, now],
+            ).fetchone()
+        return self._row(row)
+
+    def update(self, job_id: str, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments + ', ' if fields else ''}heartbeat_at = ? "
+                "WHERE job_id = ? AND status = 'running'",
+                [*fields.values(), time.time(), job_id],
+            )
+
+    def finish(
+        self, job_id: str, worker: str, status: str, result: Optional[dict] = None, error: Optional[str] = None
+    ) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "progress = CASE WHEN ? = 'succeeded' THEN 1.0 ELSE progress END "
+                "WHERE job_id = ? AND status = 'running' AND worker = ?",
+                [status, json.dumps(result) if result is not None else None, error, time.time(), status, job_id, worker],
+            ).rowcount > 0
+
+    def cancel(self, job_id: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ? AND status = 'queued'",
+                [now, job_id],
+            ).rowcount
+            if cancelled:
+                return True
+            return conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = 'running'", [job_id]
+            ).rowcount > 0
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", [job_id]).fetchone()
+        return bool(row and row[0])
+
+    def requeue_stale(self, older_than: float) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE status = 'running' AND heartbeat_at < ? AND cancel_requested = 1",
+                [now, now - older_than],
+            )
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL, cancel_requested = 0 "
+                "WHERE status = 'running' AND heartbeat_at < ?",
+                [now - older_than],
+            ).rowcount
+
+    def purge(self, older_than: float) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?",
+                [time.time() - older_than],
+            ).rowcount
+
+
+# Pops queued ids until one whose job is still queued (others were cancelled
+# while queued) and marks it running, atomically: a job is always either in
+# the queue or in the running set, and a cancel cannot interleave.
+# KEYS: queue, running set; ARGV: job key prefix, worker, now
+CLAIM_SCRIPT = """
+while true do
+    local job_id = redis.call("RPOP", KEYS[1])
+    if not job_id then
+        return false
+    end
+    local key = ARGV[1] .. job_id
+    if redis.call("HGET", key, "status") == "queued" then
+        redis.call("HSET", key, "status", "running", "worker", ARGV[2], "started_at", ARGV[3], "heartbeat_at", ARGV[3])
+        redis.call("ZADD", KEYS[2], ARGV[3], job_id)
+        return job_id
+    end
+end
+"""
+
+# KEYS: job hash, queue; ARGV: job id, now, result ttl
+CANCEL_SCRIPT = """
+local status = redis.call("HGET", KEYS[1], "status")
+if status == "queued" then
+    redis.call("HSET", KEYS[1], "status", "cancelled", "finished_at", ARGV[2])
+    redis.call("LREM", KEYS[2], 0, ARGV[1])
+    redis.call("EXPIRE", KEYS[1], ARGV[3])
+    return 1
+elseif status == "running" then
+    redis.call("HSET", KEYS[1], "cancel_requested", 1)
+    return 1
+end
+return 0
+"""
+
+# Requeues a running job whose heartbeat is older than the cutoff, once;
+# cancels it instead if its cancellation was requested.
+# KEYS: running set, queue, job hash; ARGV: job id, cutoff, now, result ttl
+REQUEUE_SCRIPT = """
+local heartbeat = redis.call("ZSCORE", KEYS[1], ARGV[1])
+if not heartbeat or tonumber(heartbeat) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call("ZREM", KEYS[1], ARGV[1])
+if redis.call("HGET", KEYS[3], "cancel_requested") == "1" then
+    redis.call("HSET", KEYS[3], "status", "cancelled", "finished_at", ARGV[3])
+    redis.call("EXPIRE", KEYS[3], ARGV[4])
+    return 0
+end
+redis.call("HSET", KEYS[3], "status", "queued", "cancel_requested", 0)
+redis.call("HDEL", KEYS[3], "worker", "started_at")
+redis.call("RPUSH", KEYS[2], ARGV[1])
+return 1
+"""
+
+# Records a run's outcome only while the job is still running for that worker.
+# KEYS: job hash, running set; ARGV: job id, worker, result ttl, then field/value pairs
+FINISH_SCRIPT = """
+if redis.call("HGET", KEYS[1], "status") ~= "running" or redis.call("HGET", KEYS[1], "worker") ~= ARGV[2] then
+    return 0
+end
+redis.call("HSET", KEYS[1], unpack(ARGV, 4))
+redis.call("ZREM", KEYS[2], ARGV[1])
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisJobStore(JobStore):
+    """
+    Job store in Redis, shared by API and worker processes on any host.
+    Each job is a hash; queued ids sit in a list and running ids in a sorted
+    set scored by heartbeat. Finished jobs expire after `result_ttl` seconds.
+    Claims, cancels, requeues and finishes are Lua scripts, so each moves a job between
+    the queue and the running set in one atomic step.
+    """
+
+    def __init__(self, url: str, prefix: str = "omnichain:jobs:", result_ttl: float = 86400.0):
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True, socket_connect_timeout=5)
+        self.prefix = prefix
+        self.queue = prefix + "queued"
+        self.running = prefix + "running"
+        self.result_ttl = result_ttl
+        self._claim = self.client.register_script(CLAIM_SCRIPT)
+        self._cancel = self.client.register_script(CANCEL_SCRIPT)
+        self._requeue = self.client.register_script(REQUEUE_SCRIPT)
+        self._finish = self.client.register_script(FINISH_SCRIPT)
+
+    def _key(self, job_id: str) -> str:
+        return self.prefix + job_id
+
+    def submit(self, user: str, query: str, context: Optional[dict], catalog: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        fields = {
+            "job_id": job_id, "user": user, "query": query, "context": json.dumps(context),
+            "status": "queued", "progress": 0.0, "cancel_requested": 0, "created_at": time.time(),
+        }
+        if catalog is not None:
+            fields["catalog"] = catalog
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(job_id), mapping=fields)
+        pipe.lpush(self.queue, job_id)
+        pipe.execute()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job: Dict[str, Any] = self.client.hgetall(self._key(job_id))
+        if not job:
+            return None
+        for field in JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job.get(field) is not None else None
+        for field in ("progress", "created_at", "started_at", "finished_at", "heartbeat_at"):
+            job[field] = float(job[field]) if job.get(field) is not None else None
+        job["cancel_requested"] = job.get("cancel_requested") == "1"
+        for field in ("catalog", "stage", "error", "worker"):
+            job.setdefault(field, None)
+        return job
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        job_id = self._claim(keys=[self.queue, self.running], args=[self.prefix, worker, time.time()])
+        if job_id is None:
+            return None
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields) -> None:
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(job_id), mapping={**fields, "heartbeat_at": now})
+        pipe.zadd(self.running, {job_id: now}, xx=True)
+        pipe.execute()
+
+    def finish(
+        self, job_id: str, worker: str, status: str, result: Optional[dict] = None, error: Optional[str] = None
+    ) -> bool:
+        fields: Dict[str, Any] = {"status": status, "finished_at": time.time()}
+        if result is not None:
+            fields["result"] = json.dumps(result)
+        if error is not None:
+            fields["error"] = error
+        if status == "succeeded":
+            fields["progress"] = 1.0
+        pairs = [item for field in fields.items() for item in field]
+        keys = [self._key(job_id), self.running]
+        return bool(self._finish(keys=keys, args=[job_id, worker, int(self.result_ttl), *pairs]))
+
+    def cancel(self, job_id: str) -> bool:
+        keys = [self._key(job_id), self.queue]
+        return bool(self._cancel(keys=keys, args=[job_id, time.time(), int(self.result_ttl)]))
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return self.client.hget(self._key(job_id), "cancel_requested") == "1"
+
+    def requeue_stale(self, older_than: float) -> int:
+        requeued = 0
+        cutoff = time.time() - older_than
+        for job_id in self.client.zrangebyscore(self.running, 0, cutoff):
+            # Rechecked in the script: the job may have sent a heartbeat or been requeued since
+            requeued += self._requeue(
+                keys=[self.running, self.queue, self._key(job_id)],
+                args=[job_id, cutoff, time.time(), int(self.result_ttl)],
+            )
+        return requeued
+
+
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """
+    Returns the job store configured in settings. With JOB_BACKEND="auto",
+    Redis is used when it answers a ping, SQLite (JOB_DB_PATH) otherwise.
+    """
+    global _job_store
+    if _job_store is not None:
+        return _job_store
+    backend = settings.JOB_BACKEND
+    if backend in ("redis", "auto"):
+        try:
+            store = RedisJobStore(settings.REDIS_URL, result_ttl=settings.JOB_RESULT_TTL_SECONDS)
+            if backend == "auto":
+                store.client.ping()
+            _job_store = store
+            return _job_store
+        except Exception as e:
+            if backend == "redis":
+                raise
+            logger.info(f"Redis unavailable for jobs ({e}); using SQLite at {settings.JOB_DB_PATH}")
+    _job_store = SQLiteJobStore(settings.JOB_DB_PATH)
+    return _job_store
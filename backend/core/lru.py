@@ -0,0 +1,70 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class CacheBackend:
+    """
+    Minimal key/value interface for cached agent results.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError("Subclasses must implement get()")
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError("Subclasses must implement set()")
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError("Subclasses must implement delete()")
+
+    def clear(self) -> None:
+        raise NotImplementedError("Subclasses must implement clear()")
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Process-local cache with per-entry TTL and LRU eviction beyond `max_entries`.
+    Also serves as the stand-in for Redis in tests and local runs. With
+    `copy_values`, values are copied in and out, so callers never share a
+    cached object, as with Redis.
+    """
+
+    def __init__(self, max_entries: int = 1024, copy_values: bool = False):
+        self.max_entries = max_entries
+        self.copy_values = copy_values
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.copy_values:
+            value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
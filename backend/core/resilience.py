@@ -1,13 +1,60 @@
 import asyncio
+import contextvars
 import functools
 import logging
-from typing import Callable, Any
+import threading
+import time
+from typing import Callable, Any, Optional, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
-def retry(retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
+# Absolute deadline (epoch seconds) of the request being served, if it has one.
+# Set by each orchestrator node from AgentState, so nested calls see it implicitly.
+current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("current_deadline", default=None)
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a request's time budget is spent."""
+
+def remaining_budget(deadline: Optional[float] = None) -> Optional[float]:
+    """Seconds left before `deadline` (default: the current request's), or None without one."""
+    deadline = current_deadline.get() if deadline is None else deadline
+    return None if deadline is None else deadline - time.time()
+
+def budget_timeout(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    The tighter of `timeout` and the current request's remaining budget.
+    Raises DeadlineExceeded once the budget is spent.
+    """
+    remaining = remaining_budget()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return remaining if timeout is None else min(timeout, remaining)
+
+async def with_budget(awaitable, timeout: Optional[float] = None) -> Any:
+    """Awaits under `budget_timeout(timeout)`, reporting an expired budget as DeadlineExceeded."""
+    limit = budget_timeout(timeout)
+    try:
+        return await asyncio.wait_for(awaitable, limit)
+    except asyncio.TimeoutError as e:
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= 0 and not isinstance(e, DeadlineExceeded):
+            raise DeadlineExceeded("Request deadline exceeded") from e
+        raise
+
+def retry(
+    retries: int = 3,
+    delay: float = 1.0,
+    backoff: float = 2.0,
+    attempt_timeout: Optional[float] = None,
+    min_attempt_budget: float = 0.1,
+):
     """
     Decorator for retrying asynchronous functions with exponential backoff.
+    Attempts are bounded by the request deadline; a retry is abandoned (the
+    last error re-raised) when the budget left after its backoff would be
+    under `min_attempt_budget` seconds.
     """
     def decorator(func: Callable):
         @functools.wraps(func)
@@ -15,45 +62,124 @@ def retry(retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
             current_delay = delay
             for attempt in range(retries):
                 try:
-                    return await func(*args, **kwargs)
+                    return await with_budget(func(*args, **kwargs), attempt_timeout)
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
                     if attempt == retries - 1:
                         logger.error(f"Ultimate failure after {retries} attempts: {e}")
                         raise
+                    remaining = remaining_budget()
+                    if remaining is not None and remaining - current_delay < min_attempt_budget:
+                        logger.warning(f"Attempt {attempt + 1} failed: {e}. Not retrying: {remaining:.2f}s of budget left")
+                        raise
                     logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {current_delay}s...")
                     await asyncio.sleep(current_delay)
                     current_delay *= backoff
         return wrapper
     return decorator
 
+async def hedged(func: Callable, *args, delay: float, attempts: int = 2, **kwargs) -> Any:
+    """
+    Calls `func(*args, **kwargs)` and, whenever no call has finished after
+    `delay` seconds, starts another, up to `attempts` in flight in total.
+    Returns the first successful result and cancels the others; a failed call
+    is replaced straight away. For idempotent external tool and LLM calls,
+    where a duplicate request is cheaper than a slow tail. Bounded by the
+    request deadline.
+    """
+    pending = set()
+    started = 0
+    last_error: Optional[BaseException] = None
+    try:
+        while True:
+            if started < attempts:
+                pending.add(asyncio.ensure_future(func(*args, **kwargs)))
+                started += 1
+            wait = delay if started < attempts else None
+            remaining = budget_timeout(None)
+            if remaining is not None:
+                wait = remaining if wait is None else min(wait, remaining)
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+                logger.warning(f"Hedged call failed: {last_error}")
+            if not pending and started >= attempts:
+                raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling through while a circuit is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 class CircuitBreaker:
     """
     Simple circuit breaker pattern for agent and external API calls.
+    After `failure_threshold` consecutive failures the circuit opens for
+    `recovery_timeout` seconds; then a single trial call is let through
+    (HALF_OPEN) and its outcome closes or re-opens the circuit. State changes
+    are made under a lock, so one breaker can be shared across threads and
+    event loops. Expired request deadlines and `excluded` exceptions (errors in
+    the caller's input rather than the callee) propagate without counting as failures.
     """
-    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 60.0,
+        excluded: Tuple[Type[BaseException], ...] = (),
+    ):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
+        self.excluded = (DeadlineExceeded, *excluded)
         self.failure_count = 0
-        self.last_failure_time = 0
+        self.last_failure_time = 0.0
         self.state = "CLOSED"
+        self._probing = False
+        self._lock = threading.Lock()
 
-    async def call(self, func: Callable, *args, **kwargs) -> Any:
-        if self.state == "OPEN":
-            if asyncio.get_event_loop().time() - self.last_failure_time > self.recovery_timeout:
+    def _admit(self) -> bool:
+        """Raises CircuitOpenError if the call may not proceed; returns whether it is the trial call."""
+        with self._lock:
+            if self.state == "OPEN":
+                elapsed = time.monotonic() - self.last_failure_time
+                if elapsed < self.recovery_timeout:
+                    raise CircuitOpenError("Circuit is OPEN. Request rejected.", self.recovery_timeout - elapsed)
                 self.state = "HALF_OPEN"
-            else:
-                raise Exception("Circuit is OPEN. Request rejected.")
+            if self.state == "HALF_OPEN":
+                if self._probing:
+                    raise CircuitOpenError("Circuit is HALF_OPEN. Trial request in progress.", 1.0)
+                self._probing = True
+                return True
+            return False
 
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        probe = self._admit()
         try:
             result = await func(*args, **kwargs)
-            if self.state == "HALF_OPEN":
+        except self.excluded:
+            raise
+        except Exception as e:
+            with self._lock:
+                self.failure_count += 1
+                self.last_failure_time = time.monotonic()
+                if probe or self.failure_count >= self.failure_threshold:
+                    self.state = "OPEN"
+                    logger.error(f"Circuit tripped to OPEN state: {e}")
+            raise
+        else:
+            # Only consecutive failures trip the circuit
+            with self._lock:
                 self.state = "CLOSED"
                 self.failure_count = 0
             return result
-        except Exception as e:
-            self.failure_count += 1
-            self.last_failure_time = asyncio.get_event_loop().time()
-            if self.failure_count >= self.failure_threshold:
-                self.state = "OPEN"
-                logger.error(f"Circuit tripped to OPEN state: {e}")
-            raise
+        finally:
+            if probe:
+                with self._lock:
+                    self._probing = False
@@ -1,11 +1,24 @@
+import asyncio
+import functools
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, Union
 from jose import jwt
 from passlib.context import CryptContext
+from backend.core.lru import InMemoryCache
 from backend.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a thread pool lets password checks use every core
+_hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="bcrypt")
+
+# Verified token claims, each kept until its token expires
+_token_claims = InMemoryCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
@@ -19,8 +32,33 @@ def create_access_token(
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Decodes and validates a JWT, serving repeat tokens from an expiry-aware cache.
+    Raises JWTError for invalid or expired tokens.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    claims = _token_claims.get(key)
+    if claims is not None:
+        return claims
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    ttl = claims.get("exp", 0) - time.time()
+    if ttl > 0:
+        _token_claims.set(key, claims, ttl)
+    return claims
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Runs bcrypt verification on the hashing thread pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, verify_password, plain_password, hashed_password)
+
+@functools.lru_cache(maxsize=1)
+def dummy_password_hash() -> str:
+    """A fixed hash checked for unknown users so their logins cost the same as real ones."""
+    return get_password_hash("unused-dummy-password")
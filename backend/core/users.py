@@ -0,0 +1,33 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.core import security
+from backend.core.lru import InMemoryCache
+from backend.core.config import settings
+from backend.models import User
+from backend.schemas.user import UserInDB
+
+# Short-lived cache of user records so authenticated requests skip the database
+_user_records = InMemoryCache(max_entries=settings.USER_CACHE_MAX_ENTRIES)
+
+def get_user_by_email(db: Session, email: str) -> Optional[UserInDB]:
+    """Returns the stored user record for `email`, or None."""
+    cached = _user_records.get(email)
+    if cached is not None:
+        return cached
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        return None
+    record = UserInDB.model_validate(user)
+    _user_records.set(email, record, settings.USER_CACHE_TTL_SECONDS)
+    return record
+
+async def authenticate(db: Session, email: str, password: str) -> Optional[UserInDB]:
+    """
+    Checks credentials against the stored bcrypt hash without blocking the event loop.
+    Unknown users are checked against a dummy hash to keep timing uniform.
+    """
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    hashed_password = user.hashed_password if user else await run_in_threadpool(security.dummy_password_hash)
+    is_valid = await security.verify_password_async(password, hashed_password)
+    return user if user is not None and is_valid else None
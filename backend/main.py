@@ -1,12 +1,36 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from backend.core.config import settings
 from backend.api.auth import auth_router
 from backend.api.agents import router as agent_router
+from backend.api.datasets import router as dataset_router
+from backend.api.jobs import router as job_router
+from monitoring.logging import CorrelationIdMiddleware
+from monitoring.metrics import PrometheusMiddleware
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Runs JOB_INLINE_WORKERS job workers inside the API process (for local runs without a worker)."""
+    if settings.JOB_INLINE_WORKERS <= 0:
+        yield
+        return
+    from backend.core.jobs import get_job_store
+    from backend.worker import JobWorker
+
+    stop = asyncio.Event()
+    worker = JobWorker(get_job_store(), concurrency=settings.JOB_INLINE_WORKERS)
+    task = asyncio.create_task(worker.run(stop))
+    yield
+    stop.set()
+    await task
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -17,10 +41,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Supply Chain AI Intelligence Platform API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(agent_router, prefix=f"{settings.API_V1_STR}/agents", tags=["agents"])
+app.include_router(dataset_router, prefix=f"{settings.API_V1_STR}/datasets", tags=["datasets"])
+app.include_router(job_router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from backend.core.config import settings
 
 class AgentQuery(BaseModel):
     query: str
@@ -8,3 +9,13 @@ class AgentQuery(BaseModel):
 class AgentQueryResponse(BaseModel):
     response: str
     metadata: Optional[Dict[str, Any]] = None
+
+class BatchAgentQuery(BaseModel):
+    queries: List[AgentQuery] = Field(..., min_length=1, max_length=settings.AGENT_BATCH_MAX_ITEMS)
+
+class BatchItemResult(BaseModel):
+    response: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchAgentQueryResponse(BaseModel):
+    results: List[BatchItemResult]
@@ -0,0 +1,206 @@
+"""
+Job worker: claims queued agent jobs and runs them through the orchestrator.
+
+    python -m backend.worker --concurrency 4
+
+Run as many worker processes as the analysis load needs; they share the job
+store (Redis, or the SQLite file on a single host) with the API. The API is
+the only process that writes the DuckDB catalog: each job reads the read-only
+snapshot of it published in DUCKDB_SNAPSHOT_DIR when the job was submitted,
+so workers need read access to that directory and to DATASET_DIR. Anomaly
+results reach the API only through a shared RESULT_CACHE_BACKEND="redis".
+Set JOB_INLINE_WORKERS instead to run jobs on the API's own catalog.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Optional
+from backend.core.config import settings
+from backend.core.db import open_duckdb_snapshot, release_duckdb_snapshot, use_duckdb_catalog
+from backend.core.jobs import JobStore, get_job_store
+from monitoring.logging import correlation_id
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Runs up to `concurrency` jobs at a time. Each running job sends a heartbeat
+    every JOB_HEARTBEAT_SECONDS, which is also when a cancel request is noticed;
+    jobs of workers that stop sending heartbeats are requeued by the others.
+    With `use_snapshots`, each job first opens the catalog snapshot it was
+    submitted with, as worker processes do; inline workers share the API's catalog.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        orchestrator=None,
+        concurrency: int = 2,
+        poll_interval: float = 0.5,
+        name: Optional[str] = None,
+        use_snapshots: bool = False,
+    ):
+        if orchestrator is None:
+            from agents.orchestrator import WorkflowOrchestrator
+            orchestrator = WorkflowOrchestrator()
+        self.store = store
+        self.orchestrator = orchestrator
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.use_snapshots = use_snapshots
+
+    async def _track(self, job: Dict[str, Any], deadline: float, catalog=None) -> Dict[str, Any]:
+        """
+        Streams the run, recording progress as each workflow node finishes.
+        The result keeps each agent's full metadata, serialized as the stream
+        endpoint does; only progress stages are kept short. The run reads
+        `catalog` when given; it is bound to this task alone.
+        """
+        if catalog is not None:
+            use_duckdb_catalog(catalog)
+        job_id = job["job_id"]
+        done, routes, agents = 0, 0, []
+        final = None
+        stream = self.orchestrator.stream_query(job["query"], job["context"], deadline=deadline, full_metadata=True)
+        async for event in stream:
+            kind = event["event"]
+            if kind == "final":
+                final = event["response"]
+                continue
+            if kind == "agent_started":
+                routes += 1
+            elif kind in ("guardrail", "agent_completed", "verified"):
+                done += 1
+            if kind == "agent_completed":
+                agents.append({
+                    "agent": event["agent"],
+                    "confidence_score": event["confidence_score"],
+                    # Stored as JSON, where NaN and infinities have no spelling
+                    "metadata": json.loads(json.dumps(event["metadata"], default=str), parse_constant=lambda _: None),
+                })
+            # Steps are the guardrail, each routed agent and the verifier
+            progress = min(done / (2 + max(routes, 1)), 0.99)
+            stage = f"{kind}:{event['agent']}" if kind == "agent_completed" else kind
+            await asyncio.to_thread(self.store.update, job_id, progress=progress, stage=stage)
+        return {"response": final, "agents": agents}
+
+    async def _heartbeat(self, job_id: str, run: asyncio.Task) -> bool:
+        """Keeps the job's heartbeat fresh; returns True if it cancelled the run on request."""
+        while not run.done():
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            await asyncio.to_thread(self.store.update, job_id)
+            if await asyncio.to_thread(self.store.cancel_requested, job_id):
+                run.cancel()
+                return True
+        return False
+
+    async def _finish(self, job: Dict[str, Any], status: str, **outcome) -> None:
+        """Records the outcome under the worker that claimed the job; a requeued job keeps its newer state."""
+        if not await asyncio.to_thread(self.store.finish, job["job_id"], job["worker"], status, **outcome):
+            logger.warning("Job was requeued while running; its outcome is discarded", extra={"job_id": job["job_id"]})
+
+    async def run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        correlation_id.set(job_id)
+        deadline = time.time() + settings.JOB_TIMEOUT_SECONDS
+        catalog = None
+        if self.use_snapshots:
+            try:
+                catalog = await asyncio.to_thread(open_duckdb_snapshot, job.get("catalog"))
+            except Exception as e:
+                logger.exception("Catalog snapshot unavailable", extra={"job_id": job_id})
+                await self._finish(job, "failed", error=f"Catalog unavailable: {str(e)}")
+                return
+        run = asyncio.ensure_future(self._track(job, deadline, catalog))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id, run))
+        try:
+            result = await run
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                # Cancelled on request rather than by worker shutdown
+                await self._finish(job, "cancelled")
+                return
+            raise
+        except Exception as e:
+            logger.exception("Job failed", extra={"job_id": job_id})
+            await self._finish(job, "failed", error=f"Agent processing error: {str(e)}")
+            return
+        finally:
+            heartbeat.cancel()
+            if catalog is not None:
+                release_duckdb_snapshot(catalog)
+        await self._finish(job, "succeeded", result=result)
+
+    async def run_once(self) -> bool:
+        """Claims and runs one job; returns False when the queue was empty."""
+        job = await asyncio.to_thread(self.store.claim, self.name)
+        if job is None:
+            return False
+        await self.run_job(job)
+        return True
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Claims and runs jobs until `stop` is set, then lets running jobs finish."""
+        stop = stop or asyncio.Event()
+        slots = asyncio.Semaphore(self.concurrency)
+        running = set()
+        last_maintenance = 0.0
+        logger.info(f"Job worker {self.name} started", extra={"concurrency": self.concurrency})
+        while not stop.is_set():
+            if time.monotonic() - last_maintenance > settings.JOB_HEARTBEAT_SECONDS:
+                await asyncio.to_thread(self.store.requeue_stale, settings.JOB_STALE_SECONDS)
+                await asyncio.to_thread(self.store.purge, settings.JOB_RESULT_TTL_SECONDS)
+                last_maintenance = time.monotonic()
+            await slots.acquire()
+            # Stop may have been set while every slot was busy: claim nothing more during shutdown
+            if stop.is_set():
+                slots.release()
+                break
+            job = await asyncio.to_thread(self.store.claim, self.name)
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.ensure_future(self.run_job(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _: slots.release())
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        logger.info(f"Job worker {self.name} stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run OmniChain agent job workers.")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                        help="jobs run at once by this process")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="seconds between polls of an empty queue")
+    args = parser.parse_args()
+    if settings.RESULT_CACHE_BACKEND != "redis":
+        logger.warning("RESULT_CACHE_BACKEND is not redis: anomaly results of worker jobs cannot be fetched from the API")
+
+    async def serve():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        worker = JobWorker(
+            get_job_store(), concurrency=args.concurrency, poll_interval=args.poll_interval, use_snapshots=True
+        )
+        await worker.run(stop)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import threading
+import pandas as pd
+from typing import Iterable, Optional
+from ml.forecasting import DemandForecaster
+from pipelines.duckdb_eda import is_read_only, quote_identifier
+
+# Reserved in the catalog (backend.core.db.RESERVED_TABLES): query contexts cannot name it
+STATE_TABLE = "forecast_state"
+
+
+def series_ids(ids: pd.Series) -> pd.Series:
+    """
+    Series ids as stored: strings, with whole floats written as integers, so an
+    integer id column that came back as float64 because it held NULLs keys the
+    same series as one without.
+    """
+    if pd.api.types.is_float_dtype(ids):
+        present = ids.dropna()
+        if (present == present.round()).all():
+            ids = ids.astype("Int64")
+    return ids.astype(str)
+
+
+class ForecastStore:
+    """
+    Per-series forecasting state persisted in DuckDB.
+    A daily load touches only the series that received observations: their
+    state rows are read, advanced in bulk and written back in one upsert.
+    """
+
+    def __init__(self, conn, table_name: str = STATE_TABLE, alpha: float = 0.3, beta: float = 0.1):
+        self.conn = conn
+        self.table = quote_identifier(table_name)
+        self.alpha = alpha
+        self.beta = beta
+        # Serializes read-modify-write cycles on the state table
+        self._lock = threading.Lock()
+        # Read-only catalog snapshots already carry the table
+        if not is_read_only(self.conn):
+            self.conn.cursor().execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "series_id VARCHAR PRIMARY KEY, n BIGINT, sum_x DOUBLE, sum_y DOUBLE, sum_xy DOUBLE, "
+                "sum_xx DOUBLE, level DOUBLE, ewma_trend DOUBLE, updated_at TIMESTAMP)"
+            )
+
+    def load(self, ids: Optional[Iterable] = None, cursor=None) -> pd.DataFrame:
+        """Returns stored state indexed by series id (all series, or only `ids`)."""
+        cursor = cursor or self.conn.cursor()
+        query = f"SELECT series_id, {', '.join(DemandForecaster.STATE_COLUMNS)} FROM {self.table}"
+        if ids is None:
+            state = cursor.execute(query).df()
+        else:
+            wanted = pd.DataFrame({"series_id": series_ids(pd.Series(ids))})
+            cursor.register("wanted_series", wanted)
+            state = cursor.execute(f"{query} WHERE series_id IN (SELECT series_id FROM wanted_series)").df()
+            cursor.unregister("wanted_series")
+        return state.set_index("series_id")
+
+    def update(
+        self,
+        observations: pd.DataFrame,
+        id_column: str = "product_id",
+        date_column: str = "date",
+        value_column: str = "sales",
+        cursor=None,
+    ) -> int:
+        """
+        Appends new observations (long format, one row per series and date) to
+        the stored state. Returns the number of series updated. Pass a loader's
+        `cursor` to update the state in its transaction.
+        """
+        frame = observations[[c for c in (id_column, date_column, value_column) if c in observations.columns]]
+        # Rows without an id belong to no series, and must not become one named "None" or "nan"
+        frame = frame[frame[id_column].notna()]
+        frame = frame.assign(**{id_column: series_ids(frame[id_column])})
+        with self._lock:
+            cursor = cursor or self.conn.cursor()
+            prior = self.load(pd.unique(frame[id_column].to_numpy()), cursor)
+            updated = DemandForecaster.update_state(
+                prior, frame, id_column, date_column, value_column, alpha=self.alpha, beta=self.beta
+            )
+            if updated.empty:
+                return 0
+            rows = updated.rename_axis("series_id").reset_index()
+            cursor.register("updated_state", rows)
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                f"SELECT series_id, {', '.join(DemandForecaster.STATE_COLUMNS)}, now() FROM updated_state"
+            )
+            cursor.unregister("updated_state")
+        return len(updated)
+
+    def forecast(self, periods: int = 12, ids: Optional[Iterable] = None) -> pd.DataFrame:
+        """Forecasts stored series from their state alone."""
+        return DemandForecaster.forecast_from_state(self.load(ids), periods)
+
+    def reset(self, cursor=None) -> None:
+        with self._lock:
+            (cursor or self.conn.cursor()).execute(f"DELETE FROM {self.table}")
+
+    def version(self) -> str:
+        """Changes whenever the stored state does; cached forecasts from state are keyed on it."""
+        count, updated_at = self.conn.cursor().execute(
+            f"SELECT count(*), max(updated_at) FROM {self.table}"
+        ).fetchone()
+        return f"{count}:{updated_at}"
+
+
+def get_forecast_store() -> ForecastStore:
+    """Returns the forecast store backed by the caller's DuckDB catalog."""
+    from backend.core.db import catalog_scoped
+
+    return catalog_scoped("forecast_store", ForecastStore)
@@ -8,6 +8,13 @@ class DemandForecaster:
     Includes simple time-series forecasting (Linear Regression/Moving Average).
     """
 
+    BATCH_COLUMNS = [
+        "n_obs", "historical_mean", "slope", "intercept", "predicted_mean", "trend"
+    ]
+
+    # Per-series sufficient statistics for the linear trend, plus Holt (EWMA level/trend) state
+    STATE_COLUMNS = ["n", "sum_x", "sum_y", "sum_xy", "sum_xx", "level", "ewma_trend"]
+
     @classmethod
     def predict_sales(cls, history: pd.DataFrame, periods: int = 12) -> Dict[str, Any]:
         """
@@ -33,6 +40,159 @@ class DemandForecaster:
             "forecast_values": predictions.tolist()
         }
 
+    @classmethod
+    def predict_sales_batch(
+        cls,
+        sales: pd.DataFrame,
+        periods: int = 12,
+        id_column: str = "product_id",
+        date_column: str = "date",
+        value_column: str = "sales",
+    ) -> pd.DataFrame:
+        """
+        Fits a linear trend for every series in long-format sales data in one pass.
+
+        Each series is ordered by `date_column` (when present) and indexed 0..n-1,
+        matching `predict_sales`. The least-squares fit is computed in closed form
+        from per-series sums, so cost is linear in rows regardless of SKU count.
+        Returns one row per series, indexed by `id_column`.
+        """
+        if sales.empty or id_column not in sales.columns or value_column not in sales.columns:
+            return pd.DataFrame(columns=cls.BATCH_COLUMNS, index=pd.Index([], name=id_column))
+
+        # Rows without a series id or a value belong to no series
+        frame = sales[sales[id_column].notna() & sales[value_column].notna()]
+        if date_column in frame.columns:
+            frame = frame.sort_values([id_column, date_column], kind="mergesort")
+
+        codes, ids = pd.factorize(frame[id_column], sort=True)
+        y = frame[value_column].to_numpy(dtype=np.float64)
+        x = pd.Series(codes).groupby(codes).cumcount().to_numpy(dtype=np.float64)
+
+        n = np.bincount(codes, minlength=len(ids)).astype(np.float64)
+        sum_y = np.bincount(codes, weights=y, minlength=len(ids))
+        sum_xy = np.bincount(codes, weights=x * y, minlength=len(ids))
+
+        # x is always 0..n-1, so its mean and spread have closed forms
+        x_mean = (n - 1) / 2
+        y_mean = sum_y / n
+        sxx = n * (n ** 2 - 1) / 12
+        sxy = sum_xy - x_mean * sum_y
+
+        slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+        intercept = y_mean - slope * x_mean
+        predicted_mean = intercept + slope * (n + (periods - 1) / 2)
+
+        return pd.DataFrame(
+            {
+                "n_obs": n.astype(np.int64),
+                "historical_mean": y_mean,
+                "slope": slope,
+                "intercept": intercept,
+                "predicted_mean": predicted_mean,
+                "trend": np.where(slope > 0, "upward", "downward"),
+            },
+            index=pd.Index(ids, name=id_column),
+        )
+
+    @classmethod
+    def expand_batch_forecasts(cls, batch: pd.DataFrame, periods: int = 12) -> np.ndarray:
+        """
+        Materializes per-period forecasts for a `predict_sales_batch` result.
+        Returns an array of shape (len(batch), periods).
+        """
+        steps = np.arange(periods, dtype=np.float64)
+        start = batch["n_obs"].to_numpy(dtype=np.float64)[:, None]
+        return batch["intercept"].to_numpy()[:, None] + batch["slope"].to_numpy()[:, None] * (start + steps)
+
+    @classmethod
+    def update_state(
+        cls,
+        state: pd.DataFrame,
+        observations: pd.DataFrame,
+        id_column: str = "product_id",
+        date_column: str = "date",
+        value_column: str = "sales",
+        alpha: float = 0.3,
+        beta: float = 0.1,
+    ) -> pd.DataFrame:
+        """
+        Folds new observations into per-series trend state (STATE_COLUMNS, indexed by series id).
+
+        New points continue each series' index at x = n, n+1, ..., so the result
+        equals a fit over the full history, at O(1) cost per new observation.
+        Returns the updated state for every series that received observations.
+        """
+        # Rows without a series id or a value belong to no series
+        frame = observations[observations[id_column].notna() & observations[value_column].notna()]
+        if frame.empty:
+            return pd.DataFrame(columns=cls.STATE_COLUMNS, index=pd.Index([], name=id_column))
+        if date_column in frame.columns:
+            frame = frame.sort_values([id_column, date_column], kind="mergesort")
+
+        codes, ids = pd.factorize(frame[id_column], sort=True)
+        prior = state.reindex(ids)
+        known = prior["n"].notna().to_numpy().copy()
+        prior = prior.fillna(0.0)
+        y = frame[value_column].to_numpy(dtype=np.float64)
+        step = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+        x = prior["n"].to_numpy(dtype=np.float64)[codes] + step
+
+        updated = pd.DataFrame(index=pd.Index(ids, name=id_column))
+        updated["n"] = prior["n"].to_numpy() + np.bincount(codes, minlength=len(ids))
+        updated["sum_x"] = prior["sum_x"].to_numpy() + np.bincount(codes, weights=x, minlength=len(ids))
+        updated["sum_y"] = prior["sum_y"].to_numpy() + np.bincount(codes, weights=y, minlength=len(ids))
+        updated["sum_xy"] = prior["sum_xy"].to_numpy() + np.bincount(codes, weights=x * y, minlength=len(ids))
+        updated["sum_xx"] = prior["sum_xx"].to_numpy() + np.bincount(codes, weights=x * x, minlength=len(ids))
+
+        # Holt's recursion is sequential within a series but vectorized across series:
+        # one pass per observation rank, so a daily load with one point per SKU is one step
+        level = prior["level"].to_numpy(dtype=np.float64).copy()
+        trend = prior["ewma_trend"].to_numpy(dtype=np.float64).copy()
+        for k in range(int(step.max()) + 1):
+            at = step == k
+            series, value = codes[at], y[at]
+            first = ~known[series]
+            previous = level[series]
+            new_level = np.where(first, value, alpha * value + (1 - alpha) * (previous + trend[series]))
+            trend[series] = np.where(first, 0.0, beta * (new_level - previous) + (1 - beta) * trend[series])
+            level[series] = new_level
+            known[series] = True
+        updated["level"] = level
+        updated["ewma_trend"] = trend
+        return updated[cls.STATE_COLUMNS]
+
+    @classmethod
+    def forecast_from_state(cls, state: pd.DataFrame, periods: int = 12) -> pd.DataFrame:
+        """
+        Forecasts every series from its stored state without touching history.
+        Returns BATCH_COLUMNS plus the Holt projection `ewma_forecast`.
+        """
+        n = state["n"].to_numpy(dtype=np.float64)
+        sum_x, sum_y = state["sum_x"].to_numpy(dtype=np.float64), state["sum_y"].to_numpy(dtype=np.float64)
+        sxx = state["sum_xx"].to_numpy(dtype=np.float64) - sum_x ** 2 / np.where(n > 0, n, 1)
+        sxy = state["sum_xy"].to_numpy(dtype=np.float64) - sum_x * sum_y / np.where(n > 0, n, 1)
+
+        # Relative tolerance: sxx is a difference of large sums for long series
+        slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 1e-9 * np.maximum(n, 1) ** 3)
+        y_mean = np.divide(sum_y, n, out=np.full_like(sum_y, np.nan), where=n > 0)
+        intercept = y_mean - slope * np.divide(sum_x, n, out=np.zeros_like(sum_x), where=n > 0)
+        predicted_mean = intercept + slope * (n + (periods - 1) / 2)
+        ewma_forecast = state["level"].to_numpy() + state["ewma_trend"].to_numpy() * (periods + 1) / 2
+
+        return pd.DataFrame(
+            {
+                "n_obs": n.astype(np.int64),
+                "historical_mean": y_mean,
+                "slope": slope,
+                "intercept": intercept,
+                "predicted_mean": predicted_mean,
+                "trend": np.where(slope > 0, "upward", "downward"),
+                "ewma_forecast": ewma_forecast,
+            },
+            index=state.index,
+        )
+
     @classmethod
     def detect_stockouts(cls, inventory: pd.DataFrame, forecast: list) -> List[int]:
         """Detects potential stockouts based on forecast."""
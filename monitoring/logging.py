@@ -1,20 +1,148 @@
+import atexit
+import contextvars
 import logging
+import queue
 import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from pythonjsonlogger import jsonlogger
+from backend.core.config import settings
+
+# Correlation ID of the request (or job) currently being processed
+correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
+
+_listener: Optional[QueueListener] = None
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex
+
+def bind_correlation_id(value: Optional[str] = None) -> str:
+    """Sets the correlation ID for the current context, generating one if needed."""
+    value = value or correlation_id.get() or new_correlation_id()
+    correlation_id.set(value)
+    return value
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamps each record with the correlation ID of the context that logged it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket rate limit per message template, applied before records are queued.
+    Warnings and errors always pass; the next record emitted for a throttled
+    template carries the number of suppressed duplicates.
+
+    Messages formatted before logging (f-strings) make a template per message,
+    so at most `max_buckets` are kept, least recently used evicted first; an
+    evicted bucket simply starts full again.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, max_buckets: int = 1024):
+        super().__init__()
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.pop(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking or raising when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+class CorrelationIdMiddleware:
+    """
+    Pure ASGI middleware that binds a correlation ID per request, taken from the
+    X-Request-ID header when present, and echoes it on the response.
+    """
+
+    header = b"x-request-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = dict(scope.get("headers", [])).get(self.header)
+        request_id = incoming.decode("latin-1")[:128] if incoming else new_correlation_id()
+        token = correlation_id.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(self.header, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            correlation_id.reset(token)
 
 def setup_logging():
     """
     Sets up JSON structured logging for production observability.
+    Records are queued on the calling thread and formatted and written by a
+    background listener, so slow stdout never stalls request handling.
+    Safe to call repeatedly: previously installed handlers are replaced.
     """
+    global _listener
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(settings.LOG_LEVEL)
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(logger.handlers):
+        if getattr(handler, "_omnichain", False):
+            logger.removeHandler(handler)
 
     logHandler = logging.StreamHandler(sys.stdout)
     formatter = jsonlogger.JsonFormatter(
-        '%(asctime)s %(levelname)s %(name)s %(message)s'
+        '%(asctime)s %(levelname)s %(name)s %(message)s %(correlation_id)s'
     )
     logHandler.setFormatter(formatter)
-    logger.addHandler(logHandler)
+
+    queueHandler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queueHandler._omnichain = True
+    queueHandler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_PER_SECOND, settings.LOG_RATE_LIMIT_BURST))
+    queueHandler.addFilter(CorrelationIdFilter())
+    logger.addHandler(queueHandler)
+
+    _listener = QueueListener(queueHandler.queue, logHandler, respect_handler_level=True)
+    _listener.start()
 
     # Prevent logs from other libraries being too noisy
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
@@ -22,4 +150,11 @@ def setup_logging():
 
     return logger
 
+@atexit.register
+def _flush_logs():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 logger = setup_logging()
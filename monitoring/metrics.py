@@ -1,12 +1,21 @@
-from prometheus_client import Counter, Histogram, Summary
+from prometheus_client import Counter, Gauge, Histogram, Summary
+import functools
 import time
+from backend.core.config import settings
+
+LATENCY_BUCKETS = tuple(float(b) for b in settings.METRICS_LATENCY_BUCKETS.split(","))
+ROW_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+SIZE_BUCKETS = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
 
 # API Metrics
 REQUEST_COUNT = Counter(
     'api_requests_total', 'Total API requests', ['method', 'endpoint', 'status_code']
 )
 REQUEST_LATENCY = Histogram(
-    'api_request_latency_seconds', 'API request latency', ['endpoint']
+    'api_request_latency_seconds', 'API request latency', ['endpoint'], buckets=LATENCY_BUCKETS
+)
+PAYLOAD_SIZE = Histogram(
+    'api_payload_bytes', 'API request and response body sizes', ['endpoint', 'direction'], buckets=SIZE_BUCKETS
 )
 
 # Agent Metrics
@@ -16,6 +25,28 @@ AGENT_EXECUTION_COUNT = Counter(
 AGENT_EXECUTION_TIME = Summary(
     'agent_execution_duration_seconds', 'Time spent in agent execution', ['agent_name']
 )
+NODE_LATENCY = Histogram(
+    'workflow_node_latency_seconds', 'Latency of each orchestrator node', ['node'], buckets=LATENCY_BUCKETS
+)
+DATASET_ROWS = Histogram(
+    'agent_dataset_rows', 'Rows in datasets passed to agents', ['agent_name'], buckets=ROW_BUCKETS
+)
+
+# Result Cache Metrics
+RESULT_CACHE_REQUESTS = Counter(
+    'result_cache_requests_total', 'Agent result cache lookups', ['intent', 'outcome']
+)
+
+# Admission Control Metrics
+ADMISSION_REJECTED = Counter(
+    'admission_rejected_total', 'Agent requests shed by admission control', ['reason']
+)
+ADMISSION_LIMIT = Gauge('admission_concurrency_limit', 'Current adaptive concurrency limit')
+ADMISSION_IN_FLIGHT = Gauge('admission_in_flight', 'Agent requests currently executing')
+ADMISSION_QUEUE_DEPTH = Gauge('admission_queue_depth', 'Agent requests waiting for a slot')
+CIRCUIT_STATE = Gauge(
+    'agent_circuit_open', 'Whether the circuit breaker around an agent is open (1) or not (0)', ['agent_name']
+)
 
 def track_request_time(endpoint):
     def decorator(func):
@@ -26,3 +57,76 @@ def track_request_time(endpoint):
             return response
         return wrapper
     return decorator
+
+def track_node_time(node):
+    """Records the latency of an async orchestrator node, including failed runs."""
+    histogram = NODE_LATENCY.labels(node=node)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and payload sizes.
+    Endpoints are labelled by route template to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _endpoint_label(scope) -> str:
+        """
+        Full route template; unmatched paths share one label. The matched route
+        may carry only its own template (included routers, mounts), so the
+        segments before it are taken from the request path, which are the
+        literal router and mount prefixes.
+        """
+        route = scope.get("route")
+        if route is None:
+            return "unmatched"
+        template = getattr(route, "path_format", route.path)
+        template_parts = [part for part in template.split("/") if part]
+        path_parts = [part for part in scope["path"].split("/") if part]
+        # Catch-all templates (mounts, {name:path}) span a variable number of segments
+        if ":path}" in template or template.endswith("/{path}") or len(template_parts) > len(path_parts):
+            return template
+        return "/" + "/".join(path_parts[:len(path_parts) - len(template_parts)] + template_parts)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start_time = time.perf_counter()
+        status_code = 500
+        response_size = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name == b"content-length":
+                        response_size = int(value)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            endpoint = self._endpoint_label(scope)
+            REQUEST_COUNT.labels(method=scope["method"], endpoint=endpoint, status_code=status_code).inc()
+            REQUEST_LATENCY.labels(endpoint=endpoint).observe(time.perf_counter() - start_time)
+            for name, value in scope.get("headers", []):
+                if name == b"content-length":
+                    PAYLOAD_SIZE.labels(endpoint=endpoint, direction="request").observe(int(value))
+                    break
+            if response_size is not None:
+                PAYLOAD_SIZE.labels(endpoint=endpoint, direction="response").observe(response_size)
@@ -0,0 +1,129 @@
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+# Scale factor that makes the MAD a consistent estimator of the std for normal data
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+DEFAULT_THRESHOLDS = {"zscore": 3.0, "mad": 3.5}
+
+
+def robust_scores(values: np.ndarray, method: str = "zscore") -> np.ndarray:
+    """
+    Absolute anomaly scores for one column: |x - mean| / std for "zscore",
+    |x - median| / (1.4826 * MAD) for the outlier-resistant "mad". NaN stays NaN.
+    """
+    if method not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unsupported anomaly method: {method}")
+    if np.isnan(values).all():
+        return np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "zscore":
+            return np.abs(values - np.nanmean(values)) / np.nanstd(values, ddof=1)
+        if method == "mad":
+            deviation = np.abs(values - np.nanmedian(values))
+            return deviation / mad_scale(deviation)
+
+
+def mad_scale(deviation: np.ndarray) -> float:
+    """
+    Robust std estimate from absolute deviations around the median. Falls back
+    to the scaled mean absolute deviation when over half the values tie at the median.
+    """
+    mad = np.nanmedian(deviation)
+    return MAD_SCALE * mad if mad > 0 else MEAN_AD_SCALE * np.nanmean(deviation)
+
+
+class AnomalyResult:
+    """
+    Compact anomaly detection result: per column, a sorted int64 array of row
+    positions (or DuckDB row ids) and a float32 array of their scores.
+    Reports carry `summary()`; rows are fetched a page at a time with `page()`.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        threshold: float,
+        rows: int,
+        indices: Dict[str, np.ndarray],
+        scores: Dict[str, np.ndarray],
+        table: Optional[str] = None,
+        table_state: Optional[str] = None,
+        owner: Optional[str] = None,
+    ):
+        self.method = method
+        self.threshold = threshold
+        self.rows = rows
+        self.indices = {c: np.asarray(v, dtype=np.int64) for c, v in indices.items()}
+        self.scores = {c: np.asarray(scores[c], dtype=np.float32) for c in indices}
+        # DuckDB table the row ids refer to, if any, and its state when they were taken
+        # (see fingerprint_table): once it changes, the ids may point at other rows
+        self.table = table
+        self.table_state = table_state
+        # User who may page through the result; None for results not produced for a user
+        self.owner = owner
+
+    @classmethod
+    def from_scores(
+        cls, method: str, threshold: float, rows: int, scores: Dict[str, np.ndarray], **kwargs
+    ) -> "AnomalyResult":
+        """Builds a result from full per-row score arrays, keeping rows above the threshold."""
+        indices = {c: np.flatnonzero(s > threshold) for c, s in scores.items()}
+        return cls(method, threshold, rows, indices, {c: scores[c][indices[c]] for c in scores}, **kwargs)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {c: int(v.size) for c, v in self.indices.items()}
+
+    def anomalous_rows(self) -> np.ndarray:
+        """Sorted row positions flagged in any column."""
+        if not self.indices:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(list(self.indices.values())))
+
+    def mask(self, column: Optional[str] = None) -> np.ndarray:
+        """Flags as a packed bitmask (np.packbits) over `rows` positions, for one column or any."""
+        flags = np.zeros(self.rows, dtype=bool)
+        flagged = self.indices[column] if column is not None else self.anomalous_rows()
+        flags[flagged[flagged < self.rows]] = True
+        return np.packbits(flags)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "threshold": self.threshold,
+            "rows": self.rows,
+            "anomalous_rows": int(self.anomalous_rows().size),
+            "columns": {
+                c: {"count": int(v.size), "max_score": float(self.scores[c].max()) if v.size else None}
+                for c, v in self.indices.items()
+            },
+        }
+
+    def page(self, column: Optional[str] = None, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """
+        One page of anomalous rows, ordered by position. Without a column, rows
+        flagged in any column are listed with their highest score.
+        """
+        if column is not None:
+            if column not in self.indices:
+                raise KeyError(column)
+            positions, scores = self.indices[column], self.scores[column]
+        else:
+            positions = self.anomalous_rows()
+            scores = np.zeros(positions.size, dtype=np.float32)
+            for c, idx in self.indices.items():
+                at = np.searchsorted(positions, idx)
+                np.maximum.at(scores, at, self.scores[c])
+        window = slice(offset, offset + limit)
+        return {
+            "column": column,
+            "total": int(positions.size),
+            "offset": offset,
+            "limit": limit,
+            "rows": [{"index": int(i), "score": float(s)} for i, s in zip(positions[window], scores[window])],
+        }
+
+    def to_lists(self) -> Dict[str, List[int]]:
+        """The legacy report form: a list of flagged rows per column."""
+        return {c: v.tolist() for c, v in self.indices.items()}
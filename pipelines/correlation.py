@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+# Elements per (block x columns) product; bounds the working set to ~64 MB in float32
+BLOCK_ELEMENTS = 1 << 24
+
+
+def standardize(df: pd.DataFrame, dtype=np.float32, column_block: int = 256) -> np.ndarray:
+    """
+    Returns the columns of `df` centered and scaled to unit norm, so that
+    Z.T @ Z is their Pearson correlation matrix. Missing values are mean-imputed
+    (they contribute zero) and constant columns become all-zero. Converted one
+    column block at a time, so only one float64 block exists next to the result.
+    """
+    n, p = df.shape
+    Z = np.empty((n, p), dtype=dtype)
+    for start in range(0, p, column_block):
+        X = df.iloc[:, start:start + column_block].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = (~np.isnan(X)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(X, axis=0)
+            centered = np.nan_to_num(X - mean, nan=0.0)
+            norm = np.sqrt((centered ** 2).sum(axis=0))
+            scale = np.where((norm > 0) & (present > 1), 1.0 / norm, 0.0)
+        Z[:, start:start + X.shape[1]] = centered * scale
+    return Z
+
+
+def top_correlations(
+    df: pd.DataFrame,
+    top_k: Optional[int] = 100,
+    threshold: Optional[float] = None,
+    block_size: Optional[int] = None,
+    dtype=np.float32,
+) -> Dict[str, Any]:
+    """
+    Strongest column pairs by |Pearson r|, computed blockwise over the upper triangle.
+
+    Keeps the `top_k` strongest pairs, the pairs with |r| >= `threshold`, or the
+    top_k among those above the threshold when both are given. Memory stays at
+    one (block_size x columns) product plus the standardized matrix, however
+    many columns there are. Returns a compact coordinate form: column names
+    plus parallel `i`, `j` and `r` lists, strongest first.
+    """
+    columns: List[str] = [str(c) for c in df.columns]
+    p = len(columns)
+    result = {"format": "sparse", "columns": columns, "i": [], "j": [], "r": []}
+    if p < 2 or (top_k is not None and top_k <= 0):
+        return result
+
+    Z = standardize(df, dtype)
+    block = block_size or max(1, min(p, BLOCK_ELEMENTS // p))
+    keep_i = np.empty(0, dtype=np.int64)
+    keep_j = np.empty(0, dtype=np.int64)
+    keep_r = np.empty(0, dtype=np.float64)
+
+    for start in range(0, p, block):
+        stop = min(start + block, p)
+        corr = Z[:, start:stop].T @ Z[:, start:]
+        # Only pairs with j > i: blank the diagonal and lower triangle of the leading square
+        corr[np.tril_indices(stop - start, m=corr.shape[1])] = 0
+        strength = np.abs(corr)
+
+        candidates = np.flatnonzero(strength >= threshold) if threshold is not None else np.flatnonzero(strength)
+        if top_k is not None and candidates.size > top_k:
+            candidates = candidates[np.argpartition(strength.ravel()[candidates], -top_k)[-top_k:]]
+        rows, cols = np.unravel_index(candidates, corr.shape)
+
+        keep_i = np.concatenate([keep_i, rows + start])
+        keep_j = np.concatenate([keep_j, cols + start])
+        keep_r = np.concatenate([keep_r, corr.ravel()[candidates].astype(np.float64)])
+        if top_k is not None and keep_r.size > top_k:
+            best = np.argpartition(np.abs(keep_r), -top_k)[-top_k:]
+            keep_i, keep_j, keep_r = keep_i[best], keep_j[best], keep_r[best]
+
+    order = np.argsort(-np.abs(keep_r), kind="stable")
+    result.update({
+        "i": keep_i[order].tolist(),
+        "j": keep_j[order].tolist(),
+        "r": np.clip(keep_r[order], -1.0, 1.0).tolist(),
+    })
+    return result
+
+
+def sparse_to_pairs(sparse: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expands the coordinate form into readable {"a", "b", "r"} records."""
+    columns = sparse["columns"]
+    return [{"a": columns[i], "b": columns[j], "r": r} for i, j, r in zip(sparse["i"], sparse["j"], sparse["r"])]
@@ -0,0 +1,356 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from pipelines.duckdb_eda import is_read_only, quote_identifier
+
+DATASET_TABLE = "_datasets"
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "arrow_stream": ".arrows"}
+
+
+class DatasetNotFound(KeyError):
+    """Raised when a dataset id is not registered."""
+
+
+def detect_format(path: str) -> str:
+    """Tells Parquet, Arrow IPC file and Arrow IPC stream uploads apart by their leading bytes."""
+    with open(path, "rb") as f:
+        head = f.read(len(ARROW_FILE_MAGIC))
+    if head.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if head == ARROW_FILE_MAGIC:
+        return "arrow"
+    return "arrow_stream"
+
+
+def open_arrow(path: str, file_format: str) -> pa.Table:
+    """
+    Reads an Arrow IPC file or stream through a memory map. The table's buffers
+    point into the mapped file, so nothing is copied onto the heap and pages
+    are only read when a scan touches them.
+    """
+    source = pa.memory_map(path, "r")
+    reader = ipc.open_file(source) if file_format == "arrow" else ipc.open_stream(source)
+    return reader.read_all()
+
+
+def dataset_view(dataset_id: str) -> str:
+    """Name under which a dataset is queryable on the cursor `DatasetRegistry.cursor` returns."""
+    return f"dataset_{dataset_id}"
+
+
+# Context key the API sets to the requesting user; datasets resolve among their uploads only
+DATASET_OWNER = "dataset_owner"
+# Context key the API sets for superusers, whose dataset ids resolve whoever uploaded them
+DATASET_ANY_OWNER = "dataset_any_owner"
+
+
+def dataset_ref(context: Optional[dict]) -> Optional[str]:
+    """The dataset an agent context refers to: an upload id ("dataset_id") or name ("dataset")."""
+    if not context:
+        return None
+    return context.get("dataset_id") or context.get("dataset")
+
+
+def dataset_owner(context: Optional[dict]) -> Optional[str]:
+    """The user whose uploads the context's dataset refers to."""
+    return context.get(DATASET_OWNER) if context else None
+
+
+def dataset_any_owner(context: Optional[dict]) -> bool:
+    """Whether the context's dataset id may refer to another user's upload."""
+    return bool(context.get(DATASET_ANY_OWNER)) if context else False
+
+
+def with_dataset_owner(context: Optional[dict], owner: str, any_owner: bool = False) -> dict:
+    """
+    A copy of a client's context scoped to `owner`'s uploads, or by id to any
+    upload with `any_owner`; client-set values for either are overwritten.
+    """
+    return {**(context or {}), DATASET_OWNER: owner, DATASET_ANY_OWNER: any_owner}
+
+
+class DatasetCache:
+    """
+    Process-wide LRU of dataset columns under a byte budget.
+
+    Columns are cached individually, so an agent that needs three columns of a
+    wide dataset loads (and keeps resident) only those three. Concurrent
+    requests for a column that is still loading wait for that one load rather
+    than reading it again, so every agent shares a single resident copy.
+    Evicted columns stay valid for readers that still hold them.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._columns: "OrderedDict[Tuple[str, str], pa.ChunkedArray]" = OrderedDict()
+        self._loading: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str, columns: List[str], loader: Callable[[List[str]], pa.Table]) -> pa.Table:
+        """
+        Returns `columns` of a dataset as one table, calling `loader` with
+        only the columns that are neither cached nor being loaded.
+        """
+        columns = list(dict.fromkeys(columns))
+        found: Dict[str, pa.ChunkedArray] = {}
+        pending: Dict[str, Future] = {}
+        missing: List[str] = []
+        with self._lock:
+            for column in columns:
+                key = (dataset_id, column)
+                if key in self._columns:
+                    self._columns.move_to_end(key)
+                    found[column] = self._columns[key]
+                    self.hits += 1
+                elif key in self._loading:
+                    pending[column] = self._loading[key]
+                    self.hits += 1
+                else:
+                    self._loading[key] = Future()
+                    missing.append(column)
+                    self.misses += 1
+
+        if missing:
+            try:
+                loaded = loader(missing)
+            except BaseException as e:
+                with self._lock:
+                    for column in missing:
+                        self._loading.pop((dataset_id, column)).set_exception(e)
+                raise
+            with self._lock:
+                for column in missing:
+                    key = (dataset_id, column)
+                    found[column] = loaded.column(column)
+                    self._admit(key, found[column])
+                    self._loading.pop(key).set_result(found[column])
+
+        for column, future in pending.items():
+            found[column] = future.result()
+        return pa.Table.from_arrays([found[c] for c in columns], names=columns)
+
+    def _admit(self, key: Tuple[str, str], column: pa.ChunkedArray) -> None:
+        size = column.nbytes
+        if size > self.max_bytes:
+            return
+        self._columns[key] = column
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._columns.popitem(last=False)
+            self.bytes -= evicted.nbytes
+
+    def invalidate(self, dataset_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._columns if k[0] == dataset_id]:
+                self.bytes -= self._columns.pop(key).nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._columns.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "columns": len(self._columns),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class DatasetRegistry:
+    """
+    Uploaded columnar datasets, addressed by id.
+
+    Uploads are kept on disk in their own format and registered with DuckDB
+    without conversion: Parquet files behind a catalog view scanned in place,
+    Arrow IPC files as memory-mapped tables registered on the cursor that
+    queries them. Nothing is read until an agent resolves the id. Agents read
+    Arrow columns, and Parquet columns they need as DataFrames, through a
+    shared DatasetCache, one column at a time.
+    """
+
+    def __init__(self, conn, storage_dir: str, cache_bytes: int = 1024 ** 3, cache: Optional[DatasetCache] = None):
+        self.conn = conn
+        self.storage_dir = storage_dir
+        self.cache = cache if cache is not None else DatasetCache(cache_bytes)
+        os.makedirs(storage_dir, exist_ok=True)
+        # Read-only catalog snapshots already carry the table
+        if not is_read_only(self.conn):
+            self.conn.cursor().execute(
+                f"CREATE TABLE IF NOT EXISTS {DATASET_TABLE} ("
+                "dataset_id VARCHAR PRIMARY KEY, name VARCHAR, format VARCHAR, path VARCHAR, "
+                "row_count BIGINT, columns VARCHAR[], types VARCHAR[], bytes BIGINT, owner VARCHAR, created_at TIMESTAMP)"
+            )
+
+    def new_upload_path(self) -> str:
+        """A fresh path in the storage directory to stream an upload into before registering it."""
+        return os.path.join(self.storage_dir, f"{uuid.uuid4().hex}.upload")
+
+    def register(self, path: str, name: Optional[str] = None, owner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Validates an uploaded file, moves it into the storage directory and
+        records it. Raises ValueError (removing the file) if it is neither
+        Parquet nor Arrow IPC.
+        """
+        try:
+            file_format = detect_format(path)
+            if file_format == "parquet":
+                metadata = pq.read_metadata(path)
+                schema, rows = metadata.schema.to_arrow_schema(), metadata.num_rows
+            else:
+                table = open_arrow(path, file_format)
+                schema, rows = table.schema, table.num_rows
+        except (pa.ArrowInvalid, OSError) as e:
+            os.remove(path)
+            raise ValueError(f"Not a Parquet or Arrow IPC file: {e}") from e
+
+        dataset_id = uuid.uuid4().hex
+        stored = os.path.join(self.storage_dir, dataset_id + EXTENSIONS[file_format])
+        os.replace(path, stored)
+        info = {
+            "dataset_id": dataset_id,
+            "name": name,
+            "format": file_format,
+            "path": os.path.abspath(stored),
+            "rows": rows,
+            "columns": schema.names,
+            "types": [str(t) for t in schema.types],
+            "bytes": os.path.getsize(stored),
+            "owner": owner,
+        }
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"INSERT INTO {DATASET_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, now())",
+            [dataset_id, name, file_format, info["path"], rows, info["columns"], info["types"], info["bytes"], owner],
+        )
+        return info
+
+    def info(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("dataset_id = ?", [dataset_id])
+
+    def resolve(self, ref: str, owner: Optional[str] = None, any_owner: bool = False) -> Dict[str, Any]:
+        """
+        Looks a dataset up by id, or else by name: the latest upload of that
+        name by `owner`, so one user's uploads never shadow another's. Ids
+        resolve only to `owner`'s uploads unless `any_owner` is set.
+        """
+        info = self.info(ref)
+        if info is not None and not any_owner and info["owner"] != owner:
+            info = None
+        if info is None:
+            info = self._lookup(
+                "name = ? AND owner IS NOT DISTINCT FROM ? ORDER BY created_at DESC LIMIT 1", [ref, owner]
+            )
+        if info is None:
+            raise DatasetNotFound(ref)
+        return info
+
+    def _lookup(self, where: str, params: list) -> Optional[Dict[str, Any]]:
+        row = self.conn.cursor().execute(
+            f"SELECT dataset_id, name, format, path, row_count, columns, types, bytes, owner, created_at "
+            f"FROM {DATASET_TABLE} WHERE {where}", params
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ["dataset_id", "name", "format", "path", "rows", "columns", "types", "bytes", "owner", "created_at"]
+        return dict(zip(keys, row))
+
+    @staticmethod
+    def _read(info: Dict[str, Any], columns: List[str]) -> pa.Table:
+        if info["format"] == "parquet":
+            return pq.read_table(info["path"], columns=columns, memory_map=True)
+        return open_arrow(info["path"], info["format"]).select(columns)
+
+    def _cached(self, info: Dict[str, Any], columns: Optional[List[str]]) -> pa.Table:
+        wanted = info["columns"] if columns is None else list(columns)
+        return self.cache.get(info["dataset_id"], wanted, lambda missing: self._read(info, missing))
+
+    def table(
+        self, ref: str, columns: Optional[List[str]] = None, owner: Optional[str] = None, any_owner: bool = False
+    ) -> pa.Table:
+        """
+        The dataset (or just `columns` of it) as an Arrow table served from the
+        shared cache. Arrow IPC columns are memory-mapped; Parquet columns are
+        decoded once and then shared.
+        """
+        return self._cached(self.resolve(ref, owner, any_owner), columns)
+
+    def frame(
+        self, ref: str, columns: Optional[List[str]] = None, owner: Optional[str] = None, any_owner: bool = False
+    ) -> pd.DataFrame:
+        return self.table(ref, columns, owner, any_owner).to_pandas()
+
+    def cursor(
+        self, ref: str, columns: Optional[List[str]] = None, owner: Optional[str] = None, any_owner: bool = False
+    ) -> Tuple[Any, str]:
+        """
+        A dedicated catalog cursor plus the view name the dataset (or just
+        `columns` of it) is queryable under on it. Parquet is scanned in place
+        through read_parquet, which decodes only the columns and row groups a
+        query touches; Arrow IPC columns come from the shared cache and are
+        registered on the cursor, so DuckDB scans the mapped buffers without
+        copying them. Close it when done. Uploads are only ever visible on such
+        cursors, never in the shared catalog, so only an owner check reaches them.
+        """
+        info = self.resolve(ref, owner, any_owner)
+        view = dataset_view(info["dataset_id"])
+        cursor = self.conn.cursor()
+        if info["format"] != "parquet":
+            cursor.register(view, self._cached(info, columns))
+        else:
+            # Temporary views belong to this cursor alone
+            path_literal = info["path"].replace("'", "''")
+            projection = "*" if columns is None else ", ".join(quote_identifier(c) for c in columns)
+            cursor.execute(
+                f"CREATE TEMP VIEW {quote_identifier(view)} AS SELECT {projection} FROM read_parquet('{path_literal}')"
+            )
+        return cursor, view
+
+    def delete(self, dataset_id: str) -> bool:
+        info = self.info(dataset_id)
+        if info is None:
+            return False
+        self.cache.invalidate(dataset_id)
+        cursor = self.conn.cursor()
+        # Catalogs from before uploads were kept off the shared catalog still carry a view
+        cursor.execute(f"DROP VIEW IF EXISTS {quote_identifier(dataset_view(dataset_id))}")
+        cursor.execute(f"DELETE FROM {DATASET_TABLE} WHERE dataset_id = ?", [dataset_id])
+        if os.path.exists(info["path"]):
+            os.remove(info["path"])
+        return True
+
+
+_cache: Optional[DatasetCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_dataset_registry() -> DatasetRegistry:
+    """
+    Returns the dataset registry backed by the caller's DuckDB catalog.
+    Registries on different catalog snapshots share one column cache.
+    """
+    global _cache
+    from backend.core.config import settings
+    from backend.core.db import catalog_scoped
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = DatasetCache(settings.DATASET_CACHE_MAX_BYTES)
+    return catalog_scoped(
+        "dataset_registry", lambda catalog: DatasetRegistry(catalog, settings.DATASET_DIR, cache=_cache)
+    )
@@ -0,0 +1,193 @@
+import duckdb
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+from pipelines.anomalies import DEFAULT_THRESHOLDS, MAD_SCALE, MEAN_AD_SCALE, AnomalyResult
+from pipelines.streaming_eda import SUMMARY_ROWS
+
+NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "DECIMAL",
+)
+
+
+def quote_identifier(name: str) -> str:
+    """Quotes a (optionally schema-qualified) DuckDB identifier."""
+    return ".".join('"' + part.replace('"', '""') + '"' for part in name.split("."))
+
+
+def is_read_only(conn) -> bool:
+    """Whether the connection's current database is attached read-only (e.g. a job worker's catalog snapshot)."""
+    return conn.cursor().execute(
+        "SELECT readonly FROM duckdb_databases() WHERE database_name = current_database()"
+    ).fetchone()[0]
+
+
+class DuckDBEDA:
+    """
+    EDA backend that pushes the profile down to DuckDB as SQL aggregates.
+    Produces the same `run_full_profile` report shape as AutomatedEDA, but only
+    small aggregate result sets are materialized in Python.
+    """
+
+    def __init__(self, conn, table_name: str):
+        self.conn = conn
+        self.table_name = table_name
+        self.table = quote_identifier(table_name)
+        relation = conn.table(table_name)
+        self.columns: List[str] = list(relation.columns)
+        self.numeric_columns: List[str] = [
+            col for col, dtype in zip(relation.columns, relation.dtypes)
+            if str(dtype).upper().startswith(NUMERIC_TYPES)
+        ]
+        # Views and registered Arrow data have no rowid; rows are then numbered in scan order
+        try:
+            conn.execute(f"SELECT rowid FROM {self.table} LIMIT 0")
+            self.has_rowid = True
+        except duckdb.BinderException:
+            self.has_rowid = False
+
+    def _fetch_row(self, expressions: List[str]) -> Tuple:
+        return self.conn.execute(f"SELECT {', '.join(expressions)} FROM {self.table}").fetchone()
+
+    def row_count(self) -> int:
+        return self._fetch_row(["count(*)"])[0]
+
+    def get_summary_statistics(self) -> pd.DataFrame:
+        """Returns descriptive statistics in the layout of `describe(include='all')`."""
+        expressions = []
+        for col in self.columns:
+            c = quote_identifier(col)
+            if col in self.numeric_columns:
+                expressions += [
+                    f"count({c})", f"avg({c})", f"stddev_samp({c})", f"min({c})",
+                    f"quantile_cont({c}, [0.25, 0.5, 0.75])", f"max({c})",
+                ]
+            else:
+                expressions += [f"count({c})", f"count(DISTINCT {c})"]
+        row = iter(self._fetch_row(expressions)) if expressions else iter(())
+
+        described = {}
+        for col in self.columns:
+            if col in self.numeric_columns:
+                count, mean, std, lo, quartiles, hi = (next(row) for _ in range(6))
+                quartiles = quartiles or [None] * 3
+                stats = {"count": count, "mean": mean, "std": std, "min": lo,
+                         "25%": quartiles[0], "50%": quartiles[1], "75%": quartiles[2], "max": hi}
+                described[col] = {k: np.nan if v is None else float(v) for k, v in stats.items()}
+            else:
+                count, unique = next(row), next(row)
+                described[col] = {"count": count, "unique": unique, **self._top_value(col)}
+
+        frame = pd.DataFrame(described)
+        return frame.reindex([row for row in SUMMARY_ROWS if row in frame.index])
+
+    def _top_value(self, column: str) -> Dict[str, Any]:
+        c = quote_identifier(column)
+        top = self.conn.execute(
+            f"SELECT {c}, count(*) AS freq FROM {self.table} WHERE {c} IS NOT NULL "
+            f"GROUP BY {c} ORDER BY freq DESC LIMIT 1"
+        ).fetchone()
+        return {"top": top[0], "freq": top[1]} if top else {"top": np.nan, "freq": np.nan}
+
+    def analyze_missing_values(self) -> Dict[str, Any]:
+        """Returns missing value counts and percentages."""
+        row = self._fetch_row(["count(*)"] + [f"count(*) - count({quote_identifier(c)})" for c in self.columns])
+        total, missing = row[0], row[1:]
+        counts = dict(zip(self.columns, missing))
+        return {
+            "counts": counts,
+            "percentages": {col: (n / total) * 100 if total else np.nan for col, n in counts.items()},
+        }
+
+    def detect_outliers(self, column: str) -> Dict[str, Any]:
+        """Returns IQR outlier bounds and the number of rows outside them."""
+        if column not in self.numeric_columns:
+            return {"lower_bound": np.nan, "upper_bound": np.nan, "count": 0}
+        c = quote_identifier(column)
+        lower, upper, count = self.conn.execute(
+            f"WITH q AS (SELECT quantile_cont({c}, 0.25) AS q1, quantile_cont({c}, 0.75) AS q3 FROM {self.table}), "
+            f"b AS (SELECT q1 - 1.5 * (q3 - q1) AS lo, q3 + 1.5 * (q3 - q1) AS hi FROM q) "
+            f"SELECT lo, hi, (SELECT count(*) FROM {self.table} WHERE {c} < lo OR {c} > hi) FROM b"
+        ).fetchone()
+        return {"lower_bound": lower, "upper_bound": upper, "count": count}
+
+    def correlation_analysis(self) -> pd.DataFrame:
+        """Returns the correlation matrix for numerical columns."""
+        cols = self.numeric_columns
+        pairs = [(i, j) for i in range(len(cols)) for j in range(i, len(cols))]
+        matrix = np.full((len(cols), len(cols)), np.nan)
+        if pairs:
+            row = self._fetch_row([
+                f"corr({quote_identifier(cols[i])}, {quote_identifier(cols[j])})" for i, j in pairs
+            ])
+            for (i, j), value in zip(pairs, row):
+                matrix[i, j] = matrix[j, i] = np.nan if value is None else value
+        return pd.DataFrame(matrix, index=cols, columns=cols)
+
+    def correlation_report(self) -> Dict[str, Any]:
+        return self.correlation_analysis().to_dict()
+
+    def _centers_and_scales(self, method: str) -> List[Tuple[float, float]]:
+        """Per numeric column, the (center, scale) that anomaly scores are measured against."""
+        cols = [quote_identifier(c) for c in self.numeric_columns]
+        if method == "zscore":
+            row = self._fetch_row([f"avg({c}), stddev_samp({c})" for c in cols])
+            return [(row[2 * i], row[2 * i + 1]) for i in range(len(cols))]
+
+        medians = self._fetch_row([f"median({c})" for c in cols])
+        scales = self._fetch_row([
+            f"coalesce(nullif({MAD_SCALE} * median(abs({c} - {m!r})), 0), {MEAN_AD_SCALE} * avg(abs({c} - {m!r})))"
+            if m is not None else "NULL"
+            for c, m in zip(cols, medians)
+        ])
+        return list(zip(medians, scales))
+
+    def anomaly_result(self, method: str = "zscore", threshold: Optional[float] = None) -> AnomalyResult:
+        """
+        Compact anomaly detection evaluated inside DuckDB ("zscore" or robust "mad").
+        Flags are row ids (scan positions for views); only flagged rows leave the database.
+        """
+        if method not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"Unsupported anomaly method: {method}")
+        threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+        rows = self.row_count()
+        empty = np.empty(0, dtype=np.int64)
+        indices = {col: empty for col in self.numeric_columns}
+        scores = {col: np.empty(0) for col in self.numeric_columns}
+
+        scored = [
+            (col, float(center), float(scale))
+            for col, (center, scale) in zip(self.numeric_columns, self._centers_and_scales(method) if indices else [])
+            if center is not None and scale is not None and scale > 0
+        ]
+        if scored:
+            terms = [f"abs(({quote_identifier(c)} - {center!r}) / {scale!r})" for c, center, scale in scored]
+            source = self.table if self.has_rowid else f"(SELECT row_number() OVER () - 1 AS rowid, * FROM {self.table})"
+            flagged = self.conn.execute(
+                f"SELECT rowid, {', '.join(f'{t} AS s{i}' for i, t in enumerate(terms))} "
+                f"FROM {source} WHERE {' OR '.join(f'{t} > {threshold!r}' for t in terms)} ORDER BY rowid"
+            ).fetchnumpy()
+            row_ids = np.asarray(flagged["rowid"], dtype=np.int64)
+            for i, (col, _, _) in enumerate(scored):
+                values = np.ma.filled(np.ma.asarray(flagged[f"s{i}"], dtype=np.float64), np.nan)
+                hit = values > threshold
+                indices[col], scores[col] = row_ids[hit], values[hit]
+        return AnomalyResult(method, threshold, rows, indices, scores, table=self.table_name if self.has_rowid else None)
+
+    def detect_anomalies(self) -> Dict[str, List[int]]:
+        """
+        Z-score anomaly detection evaluated inside DuckDB.
+        Returns row ids of anomalous rows.
+        """
+        return self.anomaly_result("zscore", 3.0).to_lists()
+
+    def run_full_profile(self) -> Dict[str, Any]:
+        """Runs a complete EDA cycle and returns a report."""
+        return {
+            "summary": self.get_summary_statistics().to_dict(),
+            "missing_values": self.analyze_missing_values(),
+            "correlation": self.correlation_analysis().to_dict(),
+            "anomalies": self.detect_anomalies()
+        }
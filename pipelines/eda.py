@@ -1,15 +1,34 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional, List
+from pipelines.anomalies import DEFAULT_THRESHOLDS, AnomalyResult, robust_scores
+from pipelines.correlation import top_correlations
 
 class AutomatedEDA:
     """
     Module for automated Exploratory Data Analysis.
     Performs profiling, anomaly detection, and correlation analysis.
+
+    `correlation` selects how the report carries correlations: "dense" is the full
+    matrix, "sparse" the strongest pairs only (see `sparse_correlation`), and "auto"
+    switches to sparse beyond SPARSE_CORRELATION_MIN_COLUMNS numeric columns.
     """
+
+    SPARSE_CORRELATION_MIN_COLUMNS = 100
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        correlation: str = "auto",
+        top_k: Optional[int] = 100,
+        threshold: Optional[float] = None,
+    ):
+        if correlation not in ("auto", "dense", "sparse"):
+            raise ValueError(f"Unsupported correlation mode: {correlation}")
         self.df = df
+        self.correlation = correlation
+        self.top_k = top_k
+        self.threshold = threshold
 
     def get_summary_statistics(self) -> pd.DataFrame:
         """Returns standard descriptive statistics."""
@@ -40,6 +59,23 @@ class AutomatedEDA:
         """Returns the correlation matrix for numerical columns."""
         return self.df.corr(numeric_only=True)
 
+    def sparse_correlation(self, top_k: Optional[int] = None, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns the strongest numeric column pairs in compact coordinate form,
+        computed blockwise in float32 without materializing the full matrix.
+        """
+        numeric = self.df.select_dtypes(include=[np.number])
+        if top_k is None and threshold is None:
+            top_k, threshold = self.top_k, self.threshold
+        return top_correlations(numeric, top_k=top_k, threshold=threshold)
+
+    def correlation_report(self) -> Dict[str, Any]:
+        mode = self.correlation
+        if mode == "auto":
+            wide = self.df.select_dtypes(include=[np.number]).shape[1] > self.SPARSE_CORRELATION_MIN_COLUMNS
+            mode = "sparse" if wide else "dense"
+        return self.sparse_correlation() if mode == "sparse" else self.correlation_analysis().to_dict()
+
     def detect_anomalies(self) -> Dict[str, List[int]]:
         """
         Simple anomaly detection based on Z-score.
@@ -51,11 +87,23 @@ class AutomatedEDA:
             anomalies[col] = self.df.index[np.abs(z_scores) > 3].tolist()
         return anomalies
 
+    def anomaly_result(self, method: str = "zscore", threshold: Optional[float] = None) -> AnomalyResult:
+        """
+        Compact anomaly detection over numeric columns ("zscore" or robust "mad").
+        Flags are row positions rather than index labels.
+        """
+        threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+        scores = {
+            col: robust_scores(self.df[col].to_numpy(dtype=np.float64, na_value=np.nan), method)
+            for col in self.df.select_dtypes(include=[np.number]).columns
+        }
+        return AnomalyResult.from_scores(method, threshold, len(self.df), scores)
+
     def run_full_profile(self) -> Dict[str, Any]:
         """Runs a complete EDA cycle and returns a report."""
         return {
             "summary": self.get_summary_statistics().to_dict(),
             "missing_values": self.analyze_missing_values(),
-            "correlation": self.correlation_analysis().to_dict(),
+            "correlation": self.correlation_report(),
             "anomalies": self.detect_anomalies()
         }
@@ -1,16 +1,60 @@
+import contextlib
+import io
+import duckdb
 import pandas as pd
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from psycopg2 import sql
 from sqlalchemy.orm import Session
-from backend.core.db import engine, get_duckdb_conn
-from typing import Optional
+from backend.core.db import catalog_changed, engine, get_duckdb_conn
+from ml.forecast_store import ForecastStore, get_forecast_store
+from pipelines.duckdb_eda import quote_identifier
+from pipelines.profile_store import ProfileStore, get_profile_store
+from typing import Dict, Optional
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+# DuckDB tables whose loads feed the forecast store: (series id, date, value) columns
+FORECAST_SOURCES = {"sales": ("product_id", "sale_date", "quantity")}
 
 class ETLPipeline:
     """
     Handles data ingestion from external sources into PostgreSQL and DuckDB.
     """
     
-    def __init__(self, db_session: Optional[Session] = None):
+    def __init__(
+        self,
+        db_session: Optional[Session] = None,
+        profile_store: Optional[ProfileStore] = None,
+        forecast_store: Optional[ForecastStore] = None,
+    ):
         self.db = db_session
         self.duck_conn = get_duckdb_conn()
+        # Per-table EDA statistics, updated with each DuckDB ingest
+        self.profiles = profile_store or get_profile_store()
+        # Per-series forecasting state, advanced by loads of FORECAST_SOURCES tables
+        self.forecasts = forecast_store or get_forecast_store()
+
+    def _update_forecasts(self, table_name: str, rows: pd.DataFrame, replace: bool, cursor) -> None:
+        columns = FORECAST_SOURCES.get(table_name)
+        if columns is None or not set(columns) <= set(rows.columns):
+            return
+        if replace:
+            self.forecasts.reset(cursor)
+        id_column, date_column, value_column = columns
+        self.forecasts.update(rows, id_column, date_column, value_column, cursor=cursor)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """A DuckDB load plus the profile and forecast updates it feeds, committed together."""
+        conn = self.duck_conn
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        catalog_changed()
 
     def ingest_csv(self, file_path: str, table_name: str, target: str = "both"):
         """
@@ -23,20 +67,143 @@ class ETLPipeline:
         
         if target in ["duckdb", "both"]:
             # DuckDB can query dataframes directly
-            self.duck_conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM df")
+            with self._transaction() as conn:
+                conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM df")
+                self.profiles.update(table_name, [df], replace=True, cursor=conn)
+                self._update_forecasts(table_name, df, True, conn)
 
-    def ingest_dataframe(self, df: pd.DataFrame, table_name: str, target: str = "both"):
+    def ingest_dataframe(self, df: pd.DataFrame, table_name: str, target: str = "both", if_exists: str = "replace"):
         """
         Ingests a DataFrame directly.
+        In DuckDB `if_exists="append"` adds the rows to the table and merges them
+        into its stored profile; "replace" recreates both.
         """
+        if if_exists not in ("append", "replace"):
+            raise ValueError(f"Unsupported if_exists mode: {if_exists}")
+
         if target in ["postgres", "both"]:
             df.to_sql(table_name, con=engine, if_exists='append', index=False)
         
         if target in ["duckdb", "both"]:
-            self.duck_conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM df")
+            with self._transaction() as conn:
+                if if_exists == "replace":
+                    conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM df")
+                else:
+                    conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM df LIMIT 0")
+                    conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM df")
+                self.profiles.update(table_name, [df], replace=if_exists == "replace", cursor=conn)
+                self._update_forecasts(table_name, df, if_exists == "replace", conn)
+
+    def bulk_ingest(
+        self,
+        file_path: str,
+        table_name: str,
+        target: str = "both",
+        if_exists: str = "append",
+        batch_size: int = 100_000,
+    ) -> Dict[str, int]:
+        """
+        Streams a CSV or Parquet file into PostgreSQL and/or DuckDB without
+        materializing it as a DataFrame. DuckDB reads the file natively;
+        PostgreSQL is loaded with COPY FROM STDIN.
+        `if_exists` is "append" or "replace". Returns rows loaded per target.
+        """
+        if if_exists not in ("append", "replace"):
+            raise ValueError(f"Unsupported if_exists mode: {if_exists}")
+        is_parquet = file_path.lower().endswith(PARQUET_EXTENSIONS)
+        loaded = {}
+
+        if target in ["duckdb", "both"]:
+            loaded["duckdb"] = self._bulk_load_duckdb(file_path, table_name, is_parquet, if_exists, batch_size)
+
+        if target in ["postgres", "both"]:
+            loaded["postgres"] = self._bulk_load_postgres(file_path, table_name, is_parquet, if_exists, batch_size)
+
+        return loaded
+
+    def _bulk_load_duckdb(
+        self, file_path: str, table_name: str, is_parquet: bool, if_exists: str, batch_size: int
+    ) -> int:
+        """
+        Loads the file with DuckDB's native reader, then profiles the new rows
+        by scanning them back from the table as Arrow batches, so the file is
+        parsed only once. The load and the stored profile and forecast state
+        commit in one transaction: rows appended by other writers meanwhile are
+        not in its snapshot, and a failed load leaves the profile untouched.
+        """
+        table = quote_identifier(table_name)
+        source = "read_parquet(?)" if is_parquet else "read_csv_auto(?)"
+        with self._transaction() as conn:
+            if if_exists == "replace":
+                conn.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM {source}", [file_path])
+                rows = conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                last_rowid = -1
+            else:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM {source} LIMIT 0", [file_path])
+                # Appended rows get row ids past every existing one
+                last_rowid = conn.execute(f"SELECT coalesce(max(rowid), -1) FROM {table}").fetchone()[0]
+                rows = conn.execute(f"INSERT INTO {table} BY NAME SELECT * FROM {source}", [file_path]).fetchone()[0]
+            reader = conn.execute(f"SELECT * FROM {table} WHERE rowid > ?", [last_rowid]).to_arrow_reader(batch_size)
+            self.profiles.update(
+                table_name, (batch.to_pandas() for batch in reader), replace=if_exists == "replace", cursor=conn
+            )
+            if table_name in FORECAST_SOURCES:
+                # Only the forecast columns of the new rows are read back
+                present = [d[0] for d in conn.execute(f"SELECT * FROM {table} LIMIT 0").description]
+                selected = ", ".join(quote_identifier(c) for c in FORECAST_SOURCES[table_name] if c in present)
+                if selected:
+                    new_rows = conn.execute(f"SELECT {selected} FROM {table} WHERE rowid > ?", [last_rowid]).df()
+                    self._update_forecasts(table_name, new_rows, if_exists == "replace", conn)
+        return rows
+
+    def _bulk_load_postgres(
+        self, file_path: str, table_name: str, is_parquet: bool, if_exists: str, batch_size: int
+    ) -> int:
+        # Create the table from a small sample so column types follow pandas' inference, as with to_sql
+        if is_parquet:
+            parquet = pq.ParquetFile(file_path)
+            sample = next(parquet.iter_batches(batch_size=1000), None)
+            sample = sample.to_pandas() if sample is not None else parquet.schema_arrow.empty_table().to_pandas()
+        else:
+            sample = pd.read_csv(file_path, nrows=1000)
+        sample.head(0).to_sql(
+            table_name, con=engine, if_exists="replace" if if_exists == "replace" else "append", index=False
+        )
+
+        copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(
+            sql.Identifier(table_name), sql.SQL(", ").join(map(sql.Identifier, sample.columns))
+        )
+        raw = engine.raw_connection()
+        try:
+            with raw.cursor() as cur:
+                statement = copy.as_string(cur)
+                rows = 0
+                if is_parquet:
+                    for batch in parquet.iter_batches(batch_size=batch_size):
+                        buffer = io.BytesIO()
+                        pa_csv.write_csv(batch, buffer)
+                        buffer.seek(0)
+                        cur.copy_expert(statement, buffer)
+                        rows += cur.rowcount
+                else:
+                    with open(file_path, "rb") as f:
+                        cur.copy_expert(statement, f, size=1 << 20)
+                        rows = cur.rowcount
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+        return rows
 
     def get_analytical_results(self, sql_query: str) -> pd.DataFrame:
         """
         Runs a query against DuckDB for high-speed analysis.
         """
-        return self.duck_conn.execute(sql_query).df()
+        result = self.duck_conn.execute(sql_query).df()
+        # Profiles cannot tell which tables a write touched, so any write makes them all stale
+        if any(statement.type != duckdb.StatementType.SELECT for statement in duckdb.extract_statements(sql_query)):
+            self.profiles.mark_changed()
+            catalog_changed()
+        return result
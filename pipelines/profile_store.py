@@ -0,0 +1,208 @@
+import copy
+import pickle
+import threading
+import duckdb
+import pandas as pd
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from pipelines.duckdb_eda import DuckDBEDA, is_read_only, quote_identifier
+from pipelines.streaming_eda import StreamingProfile
+
+PROFILE_TABLE = "_eda_profiles"
+# Per-table load counter, bumped in the same transaction as each write the store is told about
+VERSION_TABLE = "_table_versions"
+
+
+def table_oid(cursor, table_name: str) -> Optional[int]:
+    """DuckDB's id for the table; a table dropped and created again gets a new one."""
+    parts = table_name.split(".")
+    row = cursor.execute(
+        "SELECT table_oid FROM duckdb_tables() WHERE database_name = current_database() "
+        "AND schema_name = coalesce(?, current_schema()) AND table_name = ?",
+        [parts[-2] if len(parts) > 1 else None, parts[-1]],
+    ).fetchone()
+    return row[0] if row is not None else None
+
+
+def table_version(cursor, table_name: str) -> Optional[int]:
+    """The table's load version (see ProfileStore); None if no write to it was recorded."""
+    try:
+        row = cursor.execute(f"SELECT version FROM {VERSION_TABLE} WHERE table_name = ?", [table_name]).fetchone()
+    except duckdb.CatalogException:
+        # Databases the store never ran on have no version table
+        return None
+    return row[0] if row is not None else None
+
+
+class ProfileStore:
+    """
+    Per-table StreamingProfiles kept current by the ETL pipeline.
+    Each ingest merges a profile of only the new rows into the stored state,
+    which is persisted in the DuckDB catalog so it survives restarts.
+
+    Every profile records the table's load version and oid. Loads bump the
+    version and store the profile in their own transaction, so a profile is
+    fresh exactly while no other write has been recorded since; writers
+    outside the pipeline record theirs with `mark_changed`.
+    """
+
+    def __init__(self, conn, sketch_size: int = 4096, max_categories: int = 100_000):
+        self.conn = conn
+        self.sketch_size = sketch_size
+        self.max_categories = max_categories
+        # Profiles by table name, with the version they were stored at
+        self._profiles: Dict[str, Tuple[int, StreamingProfile]] = {}
+        self._lock = threading.RLock()
+        # Read-only catalog snapshots already carry the tables
+        if not is_read_only(self.conn):
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} "
+                "(table_name VARCHAR PRIMARY KEY, row_count BIGINT, profile BLOB, updated_at TIMESTAMP)"
+            )
+            # Profiles stored before versions were recorded are never fresh
+            cursor.execute(f"ALTER TABLE {PROFILE_TABLE} ADD COLUMN IF NOT EXISTS table_oid BIGINT")
+            cursor.execute(f"ALTER TABLE {PROFILE_TABLE} ADD COLUMN IF NOT EXISTS version BIGINT")
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (table_name VARCHAR PRIMARY KEY, version BIGINT)"
+            )
+
+    def _stored(self, cursor, table_name: str) -> Optional[Tuple[int, int, StreamingProfile]]:
+        """(version, table oid, profile) as stored, reusing the unpickled profile while its version holds."""
+        row = cursor.execute(
+            f"SELECT version, table_oid FROM {PROFILE_TABLE} WHERE table_name = ?", [table_name]
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        version, oid = row
+        cached = self._profiles.get(table_name)
+        if cached is None or cached[0] != version:
+            blob = cursor.execute(
+                f"SELECT profile FROM {PROFILE_TABLE} WHERE table_name = ?", [table_name]
+            ).fetchone()[0]
+            cached = self._profiles[table_name] = (version, pickle.loads(blob))
+        return version, oid, cached[1]
+
+    def get(self, table_name: str, cursor=None) -> Optional[StreamingProfile]:
+        with self._lock:
+            stored = self._stored(cursor or self.conn.cursor(), table_name)
+            return stored[2] if stored is not None else None
+
+    def mark_changed(self, table_name: Optional[str] = None, cursor=None) -> Optional[int]:
+        """
+        Records a write to `table_name` (every table when None), making its
+        profile stale. Returns the table's new version.
+        """
+        cursor = cursor or self.conn.cursor()
+        if table_name is None:
+            cursor.execute(f"UPDATE {VERSION_TABLE} SET version = version + 1")
+            return None
+        return cursor.execute(
+            f"INSERT INTO {VERSION_TABLE} VALUES (?, 1) "
+            "ON CONFLICT (table_name) DO UPDATE SET version = version + 1 RETURNING version",
+            [table_name],
+        ).fetchone()[0]
+
+    def update(
+        self, table_name: str, chunks: Iterable[pd.DataFrame], replace: bool = False, cursor=None
+    ) -> StreamingProfile:
+        """
+        Profiles `chunks` (the newly ingested rows) and merges them into the
+        table's stored profile, or starts a new one when `replace` is set or
+        the table was dropped and created again since. Pass the loader's
+        `cursor` to record the load in its transaction.
+        """
+        delta = StreamingProfile(self.sketch_size, self.max_categories)
+        for chunk in chunks:
+            delta.update(chunk)
+
+        cursor = cursor or self.conn.cursor()
+        with self._lock:
+            oid = table_oid(cursor, table_name)
+            stored = None if replace else self._stored(cursor, table_name)
+            current = stored[2] if stored is not None and stored[1] == oid else None
+            # Merge into a copy so readers holding the previous profile never see a partial update
+            profile = copy.deepcopy(current).merge(delta) if current is not None else delta
+            version = self.mark_changed(table_name, cursor)
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {PROFILE_TABLE} (table_name, row_count, profile, updated_at, table_oid, version) "
+                "VALUES (?, ?, ?, now(), ?, ?)",
+                [table_name, profile.rows, pickle.dumps(profile), oid, version],
+            )
+            self._profiles[table_name] = (version, profile)
+        return profile
+
+    def invalidate(self, table_name: str) -> None:
+        with self._lock:
+            self._profiles.pop(table_name, None)
+            self.conn.cursor().execute(f"DELETE FROM {PROFILE_TABLE} WHERE table_name = ?", [table_name])
+
+    def rebuild(self, conn, table_name: str, batch_size: int = 100_000) -> StreamingProfile:
+        """Re-profiles a table loaded outside the ETL pipeline in one streaming pass."""
+        cursor = conn.cursor()
+        cursor.execute("BEGIN TRANSACTION")
+        try:
+            reader = cursor.execute(f"SELECT * FROM {quote_identifier(table_name)}").to_arrow_reader(batch_size)
+            profile = self.update(table_name, (batch.to_pandas() for batch in reader), replace=True, cursor=cursor)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        return profile
+
+    def fresh(self, conn, table_name: str) -> Optional[StreamingProfile]:
+        """
+        Returns the stored profile if no write has been recorded since it was
+        stored: the table's load version and oid still match, and, as a check
+        on writes nobody recorded, so does its row count. The unfiltered
+        count(*) reads no column data, so checking stays cheap next to a rescan.
+        """
+        with self._lock:
+            stored = self._stored(conn, table_name)
+        if stored is None:
+            return None
+        version, oid, profile = stored
+        if table_version(conn, table_name) != version or table_oid(conn, table_name) != oid:
+            return None
+        rows = conn.execute(f"SELECT count(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+        return profile if rows == profile.rows else None
+
+
+class IncrementalEDA(DuckDBEDA):
+    """
+    DuckDBEDA that answers summary, missing-value and correlation queries from a
+    stored StreamingProfile in O(columns). Z-score anomaly detection still filters
+    rows in DuckDB, but against the stored mean and std instead of recomputing them.
+    """
+
+    def __init__(self, conn, table_name: str, profile: StreamingProfile):
+        super().__init__(conn, table_name)
+        self.profile = profile
+
+    def row_count(self) -> int:
+        return self.profile.rows
+
+    def get_summary_statistics(self) -> pd.DataFrame:
+        """Returns descriptive statistics in the layout of `describe(include='all')`."""
+        return self.profile.summary()
+
+    def analyze_missing_values(self) -> Dict[str, Any]:
+        """Returns missing value counts and percentages."""
+        return self.profile.missing_values()
+
+    def correlation_analysis(self) -> pd.DataFrame:
+        """Returns the correlation matrix for numerical columns."""
+        return self.profile.correlation()
+
+    def _centers_and_scales(self, method: str) -> List[Tuple[float, float]]:
+        # Z-scores use the stored moments; robust (MAD) scores still need exact medians from DuckDB
+        if method != "zscore" or any(c not in self.profile.numeric for c in self.numeric_columns):
+            return super()._centers_and_scales(method)
+        stats = [self.profile.numeric[c] for c in self.numeric_columns]
+        return [(s.mean, s.std) if s.count > 1 else (None, None) for s in stats]
+
+
+def get_profile_store() -> ProfileStore:
+    """Returns the profile store backed by the caller's DuckDB catalog."""
+    from backend.core.db import catalog_scoped
+
+    return catalog_scoped("profile_store", ProfileStore)
@@ -0,0 +1,388 @@
+import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, Tuple
+
+ChunkFactory = Callable[[], Iterable[pd.DataFrame]]
+
+SUMMARY_ROWS = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch built from compacting buffers (KLL-style).
+    Items at level i carry weight 2**i; memory is O(k log(n / k)).
+    Results are exact until more than `k` values have been seen.
+    """
+
+    def __init__(self, k: int = 4096):
+        self.k = k
+        self.levels: List[np.ndarray] = []
+        self._odd = False
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self._insert(0, values)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for level, items in enumerate(other.levels):
+            if items.size:
+                self._insert(level, items)
+        return self
+
+    def _insert(self, level: int, values: np.ndarray) -> None:
+        while values.size:
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            buf = np.concatenate([self.levels[level], values])
+            if buf.size <= self.k:
+                self.levels[level] = buf
+                return
+            buf.sort()
+            if buf.size % 2:
+                self.levels[level], buf = buf[-1:], buf[:-1]
+            else:
+                self.levels[level] = np.empty(0)
+            # Alternate which half survives so compaction is unbiased on average
+            values = buf[int(self._odd)::2]
+            self._odd = not self._odd
+            level += 1
+
+    def quantile(self, q: float) -> float:
+        populated = [(i, items) for i, items in enumerate(self.levels) if items.size]
+        if not populated:
+            return np.nan
+        if len(populated) == 1 and populated[0][0] == 0:
+            return float(np.quantile(populated[0][1], q))
+
+        items = np.concatenate([items for _, items in populated])
+        weights = np.concatenate([np.full(items.size, 2.0 ** i) for i, items in populated])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        cum = np.cumsum(weights)
+        positions = (cum - weights / 2) / cum[-1]
+        return float(np.interp(q, positions, items))
+
+
+class NumericStats:
+    """Count, Welford mean/variance, min/max and a quantile sketch for one column."""
+
+    def __init__(self, sketch_size: int = 4096):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(sketch_size)
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        mean = values.mean()
+        self._combine(values.size, mean, float(((values - mean) ** 2).sum()), values.min(), values.max())
+        self.sketch.update(values)
+
+    def merge(self, other: "NumericStats") -> "NumericStats":
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _combine(self, n: int, mean: float, m2: float, lo: float, hi: float) -> None:
+        # Chan et al. parallel update of the running mean and sum of squared deviations
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(lo))
+        self.max = max(self.max, float(hi))
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    def describe(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0.0, "mean": np.nan, "std": np.nan, "min": np.nan,
+                    "25%": np.nan, "50%": np.nan, "75%": np.nan, "max": np.nan}
+        return {
+            "count": float(self.count),
+            "mean": float(self.mean),
+            "std": self.std,
+            "min": self.min,
+            "25%": self.sketch.quantile(0.25),
+            "50%": self.sketch.quantile(0.5),
+            "75%": self.sketch.quantile(0.75),
+            "max": self.max,
+        }
+
+
+class CoMoments:
+    """
+    Pairwise-complete co-moment matrices for Pearson correlation.
+    Mirrors the NaN handling of `DataFrame.corr`: each pair only uses rows where both values are present.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self._pos: Dict[str, int] = {}
+        self.n = np.zeros((0, 0))
+        self.mean_x = np.zeros((0, 0))
+        self.mean_y = np.zeros((0, 0))
+        self.cxy = np.zeros((0, 0))
+        self.m2x = np.zeros((0, 0))
+        self.m2y = np.zeros((0, 0))
+
+    def _ensure(self, columns: List[str]) -> List[int]:
+        new = [c for c in columns if c not in self._pos]
+        if new:
+            for c in new:
+                self._pos[c] = len(self.columns)
+                self.columns.append(c)
+            pad = ((0, len(new)), (0, len(new)))
+            for name in ("n", "mean_x", "mean_y", "cxy", "m2x", "m2y"):
+                setattr(self, name, np.pad(getattr(self, name), pad))
+        return [self._pos[c] for c in columns]
+
+    def update(self, frame: pd.DataFrame) -> None:
+        idx = self._ensure(list(frame.columns))
+        X = frame.to_numpy(dtype=np.float64)
+        mask = ~np.isnan(X)
+        M = mask.astype(np.float64)
+
+        # Center on the chunk mean before forming products to keep sums well-conditioned
+        present = M.sum(axis=0)
+        mu = np.divide(np.where(mask, X, 0.0).sum(axis=0), present, out=np.zeros(X.shape[1]), where=present > 0)
+        Xc = np.where(mask, X - mu, 0.0)
+
+        n = M.T @ M
+        sx = Xc.T @ M
+        sxx = (Xc ** 2).T @ M
+        sxy = Xc.T @ Xc
+        safe_n = np.where(n > 0, n, 1.0)
+        self._combine(
+            np.ix_(idx, idx), n,
+            mu[:, None] + sx / safe_n,
+            mu[None, :] + sx.T / safe_n,
+            sxy - sx * sx.T / safe_n,
+            sxx - sx ** 2 / safe_n,
+            sxx.T - sx.T ** 2 / safe_n,
+        )
+
+    def merge(self, other: "CoMoments") -> "CoMoments":
+        if other.columns:
+            idx = self._ensure(other.columns)
+            self._combine(np.ix_(idx, idx), other.n, other.mean_x, other.mean_y, other.cxy, other.m2x, other.m2y)
+        return self
+
+    def _combine(self, sel: Tuple, nb, mean_xb, mean_yb, cxy_b, m2x_b, m2y_b) -> None:
+        na = self.n[sel]
+        total = na + nb
+        safe = np.where(total > 0, total, 1.0)
+        dx = mean_xb - self.mean_x[sel]
+        dy = mean_yb - self.mean_y[sel]
+        w = na * nb / safe
+        self.mean_x[sel] += dx * nb / safe
+        self.mean_y[sel] += dy * nb / safe
+        self.cxy[sel] += cxy_b + dx * dy * w
+        self.m2x[sel] += m2x_b + dx * dx * w
+        self.m2y[sel] += m2y_b + dy * dy * w
+        self.n[sel] = total
+
+    def correlation(self) -> pd.DataFrame:
+        denom = np.sqrt(self.m2x * self.m2y)
+        corr = np.divide(self.cxy, denom, out=np.full(self.cxy.shape, np.nan), where=denom > 0)
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+
+class StreamingProfile:
+    """
+    Mergeable, bounded-memory statistics for a tabular dataset, accumulated chunk by chunk.
+    Categorical value counts are capped at `max_categories`; beyond that `unique`,
+    `top` and `freq` describe the retained heavy hitters only.
+    """
+
+    def __init__(self, sketch_size: int = 4096, max_categories: int = 100_000):
+        self.sketch_size = sketch_size
+        self.max_categories = max_categories
+        self.rows = 0
+        self.columns: List[str] = []
+        self.nulls: Dict[str, int] = {}
+        self.numeric: Dict[str, NumericStats] = {}
+        self.categorical: Dict[str, pd.Series] = {}
+        self.comoments = CoMoments()
+
+    def _classify(self, col: str, series: pd.Series) -> None:
+        if col in self.numeric or col in self.categorical or series.isna().all():
+            return
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            self.numeric[col] = NumericStats(self.sketch_size)
+        else:
+            self.categorical[col] = pd.Series(dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame) -> "StreamingProfile":
+        self.rows += len(chunk)
+        numeric_values = {}
+        for col in chunk.columns:
+            if col not in self.nulls:
+                self.columns.append(col)
+                self.nulls[col] = 0
+            series = chunk[col]
+            self.nulls[col] += int(series.isna().sum())
+            self._classify(col, series)
+
+            if col in self.numeric:
+                values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                self.numeric[col].update(values)
+                numeric_values[col] = values
+            elif col in self.categorical:
+                self._add_counts(col, series.value_counts())
+
+        if numeric_values:
+            self.comoments.update(pd.DataFrame(numeric_values))
+        return self
+
+    def _add_counts(self, col: str, counts: pd.Series) -> None:
+        merged = self.categorical[col].add(counts, fill_value=0).astype(np.int64)
+        if len(merged) > self.max_categories:
+            merged = merged.nlargest(self.max_categories)
+        self.categorical[col] = merged
+
+    def merge(self, other: "StreamingProfile") -> "StreamingProfile":
+        self.rows += other.rows
+        for col in other.columns:
+            if col not in self.nulls:
+                self.columns.append(col)
+                self.nulls[col] = 0
+            self.nulls[col] += other.nulls[col]
+        for col, stats in other.numeric.items():
+            self.numeric.setdefault(col, NumericStats(self.sketch_size)).merge(stats)
+        for col, counts in other.categorical.items():
+            self.categorical.setdefault(col, pd.Series(dtype=np.int64))
+            self._add_counts(col, counts)
+        self.comoments.merge(other.comoments)
+        return self
+
+    def summary(self) -> pd.DataFrame:
+        """Same layout as `DataFrame.describe(include='all')`."""
+        described = {}
+        for col in self.columns:
+            if col in self.numeric:
+                described[col] = self.numeric[col].describe()
+            else:
+                counts = self.categorical.get(col, pd.Series(dtype=np.int64))
+                described[col] = {"count": self.rows - self.nulls[col], "unique": len(counts)}
+                if len(counts):
+                    described[col]["top"] = counts.idxmax()
+                    described[col]["freq"] = int(counts.max())
+                else:
+                    described[col].update({"top": np.nan, "freq": np.nan})
+        frame = pd.DataFrame(described)
+        return frame.reindex([row for row in SUMMARY_ROWS if row in frame.index])
+
+    def missing_values(self) -> Dict[str, Any]:
+        counts = {col: self.nulls[col] for col in self.columns}
+        return {
+            "counts": counts,
+            "percentages": {col: (n / self.rows) * 100 if self.rows else np.nan for col, n in counts.items()},
+        }
+
+    def correlation(self) -> pd.DataFrame:
+        numeric = [c for c in self.columns if c in self.numeric]
+        return self.comoments.correlation().reindex(index=numeric, columns=numeric)
+
+
+class StreamingEDA:
+    """
+    Out-of-core counterpart of AutomatedEDA.
+    Profiles a re-iterable source of DataFrame chunks with bounded memory and
+    produces the same `run_full_profile` report shape. Anomaly detection needs
+    the global mean and std, so it makes a second pass over the source.
+    """
+
+    def __init__(self, chunks: ChunkFactory, sketch_size: int = 4096, max_categories: int = 100_000):
+        self.chunks = chunks
+        self.sketch_size = sketch_size
+        self.max_categories = max_categories
+        self._profile: Optional[StreamingProfile] = None
+
+    @classmethod
+    def from_csv(cls, path: str, chunksize: int = 100_000, **kwargs) -> "StreamingEDA":
+        return cls(lambda: pd.read_csv(path, chunksize=chunksize, **kwargs))
+
+    @classmethod
+    def from_parquet(cls, path: str, batch_size: int = 100_000, columns: Optional[List[str]] = None) -> "StreamingEDA":
+        def chunks() -> Iterator[pd.DataFrame]:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pandas()
+        return cls(chunks)
+
+    @classmethod
+    def from_duckdb(cls, conn, query: str, batch_size: int = 100_000) -> "StreamingEDA":
+        """Streams the result of `query`; the query is re-executed for each pass."""
+        def chunks() -> Iterator[pd.DataFrame]:
+            reader = conn.cursor().execute(query).to_arrow_reader(batch_size)
+            for batch in reader:
+                yield batch.to_pandas()
+        return cls(chunks)
+
+    def profile(self) -> StreamingProfile:
+        if self._profile is None:
+            profile = StreamingProfile(self.sketch_size, self.max_categories)
+            for chunk in self.chunks():
+                profile.update(chunk)
+            self._profile = profile
+        return self._profile
+
+    def get_summary_statistics(self) -> pd.DataFrame:
+        """Returns standard descriptive statistics."""
+        return self.profile().summary()
+
+    def analyze_missing_values(self) -> Dict[str, Any]:
+        """Returns missing value counts and percentages."""
+        return self.profile().missing_values()
+
+    def outlier_bounds(self, column: str) -> Tuple[float, float]:
+        """Returns the IQR outlier bounds for a numeric column from its quantile sketch."""
+        stats = self.profile().numeric.get(column)
+        if stats is None:
+            return (np.nan, np.nan)
+        q1, q3 = stats.sketch.quantile(0.25), stats.sketch.quantile(0.75)
+        iqr = q3 - q1
+        return (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+    def correlation_analysis(self) -> pd.DataFrame:
+        """Returns the correlation matrix for numerical columns."""
+        return self.profile().correlation()
+
+    def detect_anomalies(self) -> Dict[str, List[int]]:
+        """
+        Z-score anomaly detection over a second pass.
+        Returns positional indices of anomalous rows.
+        """
+        numeric = self.profile().numeric
+        anomalies: Dict[str, List[int]] = {col: [] for col in numeric}
+        offset = 0
+        for chunk in self.chunks():
+            for col, stats in numeric.items():
+                if col not in chunk.columns:
+                    continue
+                values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    z_scores = (values - stats.mean) / stats.std
+                anomalies[col].extend((offset + np.flatnonzero(np.abs(z_scores) > 3)).tolist())
+            offset += len(chunk)
+        return anomalies
+
+    def run_full_profile(self) -> Dict[str, Any]:
+        """Runs a complete EDA cycle and returns a report."""
+        return {
+            "summary": self.get_summary_statistics().to_dict(),
+            "missing_values": self.analyze_missing_values(),
+            "correlation": self.correlation_analysis().to_dict(),
+            "anomalies": self.detect_anomalies()
+        }
@@ -0,0 +1,200 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from typing import Dict, Iterator
+
+CATEGORIES = np.array(["Electronics", "Home & Kitchen", "Fashion", "Beauty", "Sports"])
+SYNTHETIC_TABLES = ("products", "inventory", "sales")
+
+
+class SyntheticSalesGenerator:
+    """
+    Vectorized generator of products, daily sales and inventory matching backend.models.
+    Daily demand per product is Poisson around a base rate shaped by a linear trend,
+    a seasonal sine wave and a weekly cycle; random stockout windows zero it out.
+    Output is deterministic for a given seed and `chunk_products`.
+    """
+
+    def __init__(
+        self,
+        n_products: int = 1000,
+        days: int = 365,
+        seed: int = 42,
+        start_date: str = "2025-01-01",
+        seasonality_amplitude: float = 0.3,
+        seasonal_period: float = 365.0,
+        weekly_amplitude: float = 0.15,
+        trend_scale: float = 0.5,
+        stockout_rate: float = 0.005,
+        stockout_days: int = 7,
+        chunk_products: int = 10_000,
+    ):
+        self.n_products = n_products
+        self.days = days
+        self.seed = seed
+        self.start_date = pd.Timestamp(start_date)
+        self.seasonality_amplitude = seasonality_amplitude
+        self.seasonal_period = seasonal_period
+        self.weekly_amplitude = weekly_amplitude
+        self.trend_scale = trend_scale
+        self.stockout_rate = stockout_rate
+        self.stockout_days = stockout_days
+        self.chunk_products = chunk_products
+
+        # Per-product parameters are drawn once so every table agrees on them
+        rng = np.random.default_rng(seed)
+        self.product_ids = np.arange(1, n_products + 1)
+        self.category_codes = rng.integers(0, len(CATEGORIES), size=n_products)
+        self.prices = np.round(rng.lognormal(mean=3.5, sigma=0.8, size=n_products), 2).clip(1.0)
+        self.base_demand = rng.gamma(shape=2.0, scale=1.5, size=n_products)
+        self.trends = rng.normal(0.0, trend_scale, size=n_products)
+        # Products in a category peak together, with some jitter
+        category_phases = rng.uniform(0, seasonal_period, size=len(CATEGORIES))
+        self.phases = category_phases[self.category_codes] + rng.normal(0, seasonal_period / 24, size=n_products)
+
+    def products(self) -> pd.DataFrame:
+        ids = pd.Series(self.product_ids).astype(str)
+        return pd.DataFrame({
+            "id": self.product_ids,
+            "name": "Product " + ids,
+            "category": CATEGORIES[self.category_codes],
+            "sku": "SKU-" + ids.str.zfill(8),
+            "price": self.prices,
+        })
+
+    def _demand(self, lo: int, hi: int, rng: np.random.Generator) -> np.ndarray:
+        """Returns the (products, days) quantity matrix for products [lo, hi)."""
+        day = np.arange(self.days)
+        rate = self.base_demand[lo:hi, None] * (1 + self.trends[lo:hi, None] * day / max(self.days, 1)).clip(0)
+        rate = rate * (1 + self.seasonality_amplitude * np.sin(2 * np.pi * (day + self.phases[lo:hi, None]) / self.seasonal_period))
+        weekday = (self.start_date.dayofweek + day) % 7
+        rate = rate * (1 + self.weekly_amplitude * np.where(weekday >= 5, 1.0, -0.4))
+        quantity = rng.poisson(rate.clip(0))
+
+        if self.stockout_rate > 0 and self.stockout_days > 0:
+            # A day is out of stock if a stockout started within the last `stockout_days` days
+            starts = np.cumsum(rng.random(quantity.shape) < self.stockout_rate, axis=1)
+            lagged = np.zeros_like(starts)
+            lagged[:, self.stockout_days:] = starts[:, :-self.stockout_days]
+            quantity[starts - lagged > 0] = 0
+        return quantity
+
+    def _chunk_rng(self, lo: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, lo])
+
+    def sales_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yields sales rows (one per product-day with demand) in product chunks."""
+        next_id = 1
+        for lo in range(0, self.n_products, self.chunk_products):
+            hi = min(lo + self.chunk_products, self.n_products)
+            rng = self._chunk_rng(lo)
+            quantity = self._demand(lo, hi, rng)
+            rows, days = np.nonzero(quantity)
+            qty = quantity[rows, days]
+            product_index = rows + lo
+            seconds = rng.integers(0, 86_400, size=qty.size)
+            yield pd.DataFrame({
+                "id": np.arange(next_id, next_id + qty.size),
+                "product_id": self.product_ids[product_index],
+                "quantity": qty,
+                "amount": np.round(qty * self.prices[product_index], 2),
+                "sale_date": self.start_date + pd.to_timedelta(days * 86_400 + seconds, unit="s"),
+            })
+            next_id += qty.size
+
+    def inventory(self) -> pd.DataFrame:
+        """
+        Current stock per product, around two lead times of demand. The share of
+        products sitting in a stockout window at the end of the history hold zero units.
+        """
+        # Chunk streams are keyed by product offsets below n_products, so this one is distinct
+        rng = np.random.default_rng([self.seed, self.n_products])
+        lead_time_days = 7
+        reorder_point = np.ceil(self.base_demand * lead_time_days).astype(int)
+        stock = rng.poisson(reorder_point * 2.0)
+        if self.stockout_rate > 0:
+            stock[rng.random(self.n_products) < self.stockout_rate * self.stockout_days] = 0
+        return pd.DataFrame({
+            "id": self.product_ids,
+            "product_id": self.product_ids,
+            "stock_level": stock,
+            "reorder_point": reorder_point,
+            "last_updated": self.start_date + pd.Timedelta(days=self.days),
+        })
+
+    def write_files(self, out_dir: str, file_format: str = "parquet") -> Dict[str, str]:
+        """
+        Writes products, inventory and sales to `out_dir` as Parquet or CSV,
+        streaming sales chunk by chunk. Returns the path per table.
+        """
+        if file_format not in ("parquet", "csv"):
+            raise ValueError(f"Unsupported file format: {file_format}")
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {name: os.path.join(out_dir, f"{name}.{file_format}") for name in SYNTHETIC_TABLES}
+
+        for name, df in (("products", self.products()), ("inventory", self.inventory())):
+            _write_table(pa.Table.from_pandas(df, preserve_index=False), paths[name], file_format)
+
+        writer = None
+        try:
+            for chunk in self.sales_chunks():
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = (pq.ParquetWriter(paths["sales"], table.schema) if file_format == "parquet"
+                              else pa_csv.CSVWriter(paths["sales"], table.schema))
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return paths
+
+    def load(
+        self, target: str, out_dir: str, etl=None, file_format: str = "parquet", if_exists: str = "append"
+    ) -> Dict[str, int]:
+        """
+        Writes the files and bulk-loads them into "duckdb", "postgres" or "both"
+        through ETLPipeline.bulk_ingest (native DuckDB readers / Postgres COPY).
+        Returns rows loaded per table, summed over targets.
+        """
+        from pipelines.etl import ETLPipeline
+
+        etl = etl or ETLPipeline()
+        paths = self.write_files(out_dir, file_format)
+        loaded = {}
+        # Parents first, so Postgres foreign keys hold
+        for name in SYNTHETIC_TABLES:
+            counts = etl.bulk_ingest(paths[name], name, target=target, if_exists=if_exists)
+            loaded[name] = sum(counts.values())
+
+        if target in ("postgres", "both"):
+            _sync_postgres_sequences(SYNTHETIC_TABLES)
+        return loaded
+
+
+def _write_table(table: pa.Table, path: str, file_format: str) -> None:
+    if file_format == "parquet":
+        pq.write_table(table, path)
+    else:
+        pa_csv.write_csv(table, path)
+
+
+def _sync_postgres_sequences(tables) -> None:
+    """COPY bypasses serial defaults; move each id sequence past the loaded ids."""
+    from sqlalchemy import text
+    from backend.core.db import engine
+
+    with engine.begin() as conn:
+        for table in tables:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence(:table, 'id'), (SELECT max(id) FROM {table}))"
+            ), {"table": table})
+
+
+def generate_sales(n_products: int, days: int, seed: int = 42, **options) -> pd.DataFrame:
+    """Convenience wrapper returning the full sales history as one DataFrame."""
+    generator = SyntheticSalesGenerator(n_products=n_products, days=days, seed=seed, **options)
+    chunks = list(generator.sales_chunks())
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
@@ -1,57 +1,69 @@
 import sys
 import os
-import random
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+import argparse
+import tempfile
+import time
 
 # Add the project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.core.db import engine
+from sqlalchemy import text
+from backend.core.db import Base, engine, get_duckdb_conn
 from backend.models import Product, Sale, Inventory
+from pipelines.synthetic import SYNTHETIC_TABLES, SyntheticSalesGenerator
 
-def seed_data():
-    print("Seeding demo data...")
-    with Session(engine) as session:
-        # 1. Create Sample Products
-        categories = ["Electronics", "Home & Kitchen", "Fashion", "Beauty", "Sports"]
-        products = []
-        for i in range(20):
-            p = Product(
-                name=f"Product {i+1}",
-                category=random.choice(categories),
-                sku=f"SKU-{1000+i}",
-                price=round(random.uniform(10.0, 500.0), 2)
-            )
-            session.add(p)
-            products.append(p)
-        
-        session.flush() # Populate IDs
-        
-        # 2. Add Inventory
-        for p in products:
-            inv = Inventory(
-                product_id=p.id,
-                stock_level=random.randint(5, 100),
-                reorder_point=15
-            )
-            session.add(inv)
-            
-        # 3. Add Historical Sales (Last 30 days)
-        for p in products:
-            for d in range(30):
-                if random.random() > 0.5: # 50% chance of a sale each day
-                    qty = random.randint(1, 10)
-                    sale = Sale(
-                        product_id=p.id,
-                        quantity=qty,
-                        amount=round(qty * p.price, 2),
-                        sale_date=datetime.now() - timedelta(days=d)
-                    )
-                    session.add(sale)
-                    
-        session.commit()
-        print("Data seeding completed successfully.")
+def seed_data(
+    target: str = "postgres",
+    products: int = 20,
+    days: int = 30,
+    seed: int = 42,
+    out_dir: str = None,
+    file_format: str = "parquet",
+    replace: bool = False,
+    **options,
+):
+    """
+    Generates synthetic products, sales and inventory and writes them to
+    Parquet/CSV files ("files") or bulk-loads them into "duckdb", "postgres" or "both".
+    """
+    print(f"Seeding {products} products x {days} days of sales into {target}...")
+    start = time.perf_counter()
+    generator = SyntheticSalesGenerator(n_products=products, days=days, seed=seed, **options)
+
+    if target == "files":
+        paths = generator.write_files(out_dir or "data/synthetic", file_format)
+        for name, path in paths.items():
+            print(f"  {name}: {path}")
+    else:
+        if target in ("postgres", "both"):
+            Base.metadata.create_all(bind=engine, tables=[Product.__table__, Inventory.__table__, Sale.__table__])
+            if replace:
+                # Truncate rather than drop, so the ORM's keys and constraints survive
+                with engine.begin() as conn:
+                    conn.execute(text("TRUNCATE sales, inventory, products RESTART IDENTITY"))
+        if target in ("duckdb", "both") and replace:
+            for name in SYNTHETIC_TABLES:
+                get_duckdb_conn().execute(f"DROP TABLE IF EXISTS {name}")
+        with tempfile.TemporaryDirectory() as staging:
+            loaded = generator.load(target, out_dir or staging, file_format=file_format)
+        for name, rows in loaded.items():
+            print(f"  {name}: {rows} rows")
+
+    print(f"Data seeding completed in {time.perf_counter() - start:.1f}s.")
 
 if __name__ == "__main__":
-    seed_data()
+    parser = argparse.ArgumentParser(description="Seed synthetic demo or load-test data.")
+    parser.add_argument("--target", choices=["files", "duckdb", "postgres", "both"], default="postgres")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", help="Where to write the Parquet/CSV files (kept when given)")
+    parser.add_argument("--format", dest="file_format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--replace", action="store_true", help="Replace existing tables instead of appending")
+    parser.add_argument("--start-date", default="2025-01-01")
+    parser.add_argument("--seasonality", dest="seasonality_amplitude", type=float, default=0.3)
+    parser.add_argument("--trend-scale", type=float, default=0.5)
+    parser.add_argument("--stockout-rate", type=float, default=0.005)
+    parser.add_argument("--stockout-days", type=int, default=7)
+    args = parser.parse_args()
+    seed_data(**vars(args))
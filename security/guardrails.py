@@ -1,5 +1,17 @@
+import hashlib
 import re
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+_MISS = object()
+
+def _scope_flags(pattern: str) -> str:
+    """Turns a leading global flag group like (?i) into a scoped group so patterns can be joined."""
+    flags = re.match(r"^\(\?([imsx]+)\)", pattern)
+    if flags:
+        return f"(?{flags.group(1)}:{pattern[flags.end():]})"
+    return f"(?:{pattern})"
 
 class AIProtectionLayer:
     """
@@ -18,15 +30,87 @@ class AIProtectionLayer:
         r"(?i)execute"
     ]
 
+    # Verdicts are cached by content hash; long texts are scanned in overlapping windows
+    VERDICT_CACHE_SIZE = 4096
+    SCAN_CHUNK_SIZE = 8192
+    SCAN_CHUNK_OVERLAP = 256
+
+    _compiled = None
+    _verdicts: "OrderedDict[bytes, Optional[str]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _matcher(cls) -> Tuple[Tuple[str, ...], re.Pattern]:
+        """
+        Returns the rules and all of them compiled into one alternation with a
+        named group per rule, as one pair: a match's group indexes the rules it
+        was compiled from. Recompiles (and drops cached verdicts) when
+        INJECTION_PATTERNS changes.
+        """
+        patterns = tuple(cls.INJECTION_PATTERNS)
+        compiled = cls._compiled
+        if compiled is None or compiled[0] != patterns:
+            regex = re.compile("|".join(f"(?P<r{i}>{_scope_flags(p)})" for i, p in enumerate(patterns)))
+            compiled = (patterns, regex)
+            with cls._lock:
+                cls._compiled = compiled
+                cls._verdicts = OrderedDict()
+        return compiled
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drops every cached verdict, so the next check of each text scans it again."""
+        with cls._lock:
+            cls._verdicts = OrderedDict()
+
+    @classmethod
+    def detect_injection(cls, text: str) -> Optional[str]:
+        """
+        Returns the injection pattern that matched `text`, or None.
+        Uses a bounded LRU cache keyed on a hash of the text.
+        """
+        compiled = cls._matcher()
+        patterns, matcher = compiled
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with cls._lock:
+            verdict = cls._verdicts.get(key, _MISS)
+            if verdict is not _MISS:
+                cls._verdicts.move_to_end(key)
+                return verdict
+
+        match = matcher.search(text)
+        verdict = patterns[int(match.lastgroup[1:])] if match else None
+
+        with cls._lock:
+            # A verdict under rules replaced meanwhile is not cached for the new ones
+            if cls._compiled is not compiled:
+                return verdict
+            cls._verdicts[key] = verdict
+            if len(cls._verdicts) > cls.VERDICT_CACHE_SIZE:
+                cls._verdicts.popitem(last=False)
+        return verdict
+
+    @classmethod
+    def scan_text(cls, text: str) -> Optional[str]:
+        """
+        Like detect_injection, but scans long texts in overlapping chunks so
+        per-call work is bounded and repeated chunks are served from the cache.
+        """
+        if len(text) <= cls.SCAN_CHUNK_SIZE:
+            return cls.detect_injection(text)
+        step = cls.SCAN_CHUNK_SIZE - cls.SCAN_CHUNK_OVERLAP
+        for start in range(0, len(text) - cls.SCAN_CHUNK_OVERLAP, step):
+            verdict = cls.detect_injection(text[start:start + cls.SCAN_CHUNK_SIZE])
+            if verdict is not None:
+                return verdict
+        return None
+
     @classmethod
     def check_prompt_injection(cls, prompt: str) -> bool:
         """
         Returns True if a prompt injection attempt is detected.
         """
-        for pattern in cls.INJECTION_PATTERNS:
-            if re.search(pattern, prompt):
-                return True
-        return False
+        return cls.scan_text(prompt) is not None
 
     @classmethod
     def sanitize_output(cls, output: str) -> str:
@@ -52,10 +136,12 @@ class OutputVerificationAgent:
         # In a real implementation, this would use another LLM call to verify
         # or check against ground truth data.
         
-        is_safe = not AIProtectionLayer.check_prompt_injection(response)
+        violated_rule = AIProtectionLayer.scan_text(response)
+        is_safe = violated_rule is None
         
         return {
             "is_verified": is_safe,
             "confidence_score": 0.95 if is_safe else 0.2,
+            "violated_rule": violated_rule,
             "sanitized_response": response if is_safe else "[REDACTED: SECURITY VIOLATION]"
         }
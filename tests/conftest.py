@@ -1,7 +1,52 @@
 import os
 import sys
+import tempfile
+
+import pytest
 
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
+
+# Keep the shared DuckDB catalog in memory so tests never touch data/
+os.environ.setdefault("DUCKDB_PATH", ":memory:")
+os.environ.setdefault("DUCKDB_SNAPSHOT_DIR", tempfile.mkdtemp(prefix="omnichain-snapshots-"))
+os.environ.setdefault("DATASET_DIR", tempfile.mkdtemp(prefix="omnichain-datasets-"))
+os.environ.setdefault("JOB_BACKEND", "sqlite")
+os.environ.setdefault("JOB_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="omnichain-jobs-"), "jobs.sqlite3"))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def user_database():
+    """Serves auth lookups from an in-memory SQLite database seeded with the admin user."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from backend.core.db import Base, get_db
+    from backend.core.security import get_password_hash
+    from backend.main import app
+    from backend.models import User
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with TestingSession() as session:
+        session.add(User(
+            email="admin@example.com",
+            hashed_password=get_password_hash("password"),
+            full_name="Admin User",
+            is_superuser=True,
+        ))
+        session.commit()
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
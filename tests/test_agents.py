@@ -1,9 +1,13 @@
+import os
+import duckdb
 import pytest
 import pandas as pd
 from agents.eda_agent import EDAAgent
 from agents.forecasting_agent import ForecastingAgent
 from agents.orchestrator import WorkflowOrchestrator
 
+DEMO_SALES = os.path.join(os.path.dirname(__file__), "..", "data", "demo_sales.csv")
+
 @pytest.mark.asyncio
 async def test_eda_agent_execution():
     agent = EDAAgent()
@@ -15,6 +19,15 @@ async def test_eda_agent_execution():
     assert "anomalies" in response.metadata
     assert response.confidence_score > 0.9
 
+@pytest.mark.asyncio
+async def test_eda_agent_rejects_unknown_anomaly_method():
+    agent = EDAAgent()
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    response = await agent.execute("Analyze this", context={"dataframe": df, "anomaly_method": "iqr"})
+
+    assert response.confidence_score == 0.0
+    assert "Unsupported anomaly method 'iqr'" in response.content
+
 @pytest.mark.asyncio
 async def test_forecasting_agent_execution():
     agent = ForecastingAgent()
@@ -33,3 +46,115 @@ async def test_orchestrator_guardrail():
     response = await orch.process_query(query)
     
     assert response == "[REDACTED: SECURITY VIOLATION]"
+
+@pytest.mark.asyncio
+async def test_forecasting_agent_category_batch():
+    agent = ForecastingAgent()
+    sales = pd.read_csv(DEMO_SALES)
+    response = await agent.execute("Forecast all products in category electronics", context={"history": sales})
+
+    assert response.metadata["category"] == "Electronics"
+    expected = sales.loc[sales["category"] == "Electronics", "product_id"].nunique()
+    assert response.metadata["product_count"] == expected
+
+@pytest.mark.asyncio
+async def test_eda_agent_profiles_duckdb_table():
+    conn = duckdb.connect()
+    conn.execute(f"CREATE TABLE sales AS SELECT * FROM read_csv_auto('{DEMO_SALES}')")
+    response = await EDAAgent().execute("Profile sales", context={"table": "sales", "duckdb_conn": conn})
+
+    assert "(30 records)" in response.content
+    assert "sales" in response.metadata["anomalies"]
+
+@pytest.mark.asyncio
+async def test_orchestrator_fans_out_to_all_matching_agents():
+    orch = WorkflowOrchestrator()
+    sales = pd.read_csv(DEMO_SALES)
+    query = "Profile my sales and forecast next month"
+
+    assert orch.route_after_guardrail({"query": query, "is_safe": True}) == ["eda", "forecast"]
+    assert orch.route_after_guardrail({"query": "Analyze sales", "is_safe": True}) == ["eda"]
+
+    response = await orch.process_query(query, context={"dataframe": sales, "history": sales})
+    assert "I have thoroughly analyzed the dataset" in response
+    assert "I have projected future demand" in response
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_the_guardrails_routes_without_routing_again(monkeypatch):
+    orch = WorkflowOrchestrator()
+    sales = pd.read_csv(DEMO_SALES)
+    routed = []
+    select_routes = orch.select_routes
+    monkeypatch.setattr(orch, "select_routes", lambda query: routed.append(query) or select_routes(query))
+
+    events = [e async for e in orch.stream_query("Profile and forecast sales", context={"dataframe": sales, "history": sales})]
+    assert [e["route"] for e in events if e["event"] == "agent_started"] == ["eda", "forecast"]
+    assert len(routed) == 1
+
+@pytest.mark.asyncio
+async def test_agent_executor_runs_dataframe_work_in_worker_process():
+    import asyncio
+    import time
+    from agents.base import AgentExecutor
+    from agents.eda_agent import profile_dataframe
+
+    executor = AgentExecutor(max_workers=1, max_tasks_per_worker=2)
+    df = pd.read_csv(DEMO_SALES)
+    try:
+        report, anomalies = await executor.run(profile_dataframe, df)
+        assert report["anomalies"] == profile_dataframe(df)[0]["anomalies"]
+        assert anomalies.counts == {col: info["count"] for col, info in report["anomalies"].items()}
+
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 5, timeout=0.5)
+        assert await executor.run(len, df) == len(df)
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_agent_executor_timeout_does_not_fail_concurrent_tasks():
+    import asyncio
+    import time
+    from agents.base import AgentExecutor
+
+    executor = AgentExecutor(max_workers=2)
+    try:
+        # Warm the pool so both tasks start at once
+        await asyncio.gather(executor.run(time.sleep, 0.1), executor.run(time.sleep, 0.1))
+        slow = executor.run(time.sleep, 5, timeout=0.5)
+        other = executor.run(sum, range(10))
+        healthy = executor.run(time.sleep, 1.0, timeout=10)
+        results = await asyncio.gather(slow, other, healthy, return_exceptions=True)
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1:] == [45, None]
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_dedups_on_context_content_not_its_repr():
+    orch = WorkflowOrchestrator()
+    calls = []
+
+    async def fake_process_query(query, context=None, deadline=None):
+        calls.append(context)
+        return str(len(calls))
+
+    orch.process_query = fake_process_query
+    base = pd.DataFrame({"x": range(200)})
+    changed = base.copy()
+    changed.loc[100, "x"] = -1
+    # Identical truncated reprs, different rows
+    assert repr(base) == repr(changed)
+    missing = {"dataset": "never-uploaded"}
+
+    results = await orch.process_batch([
+        ("q", {"dataframe": base}),
+        ("q", {"dataframe": changed}),
+        ("q", {"dataframe": base.copy()}),
+        ("q", missing),
+        ("q", missing),
+    ])
+    assert [r["response"] for r in results] == ["1", "2", "1", "3", "4"]
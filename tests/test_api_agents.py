@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from backend.main import app
@@ -38,3 +40,339 @@ def test_agent_query_with_auth_and_guardrail():
 
     assert response.status_code == 200
     assert response.json()["response"] == "[REDACTED: SECURITY VIOLATION]"
+
+
+def test_agent_query_stream_emits_progress_then_final_answer():
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    token = login.json()["access_token"]
+
+    response = client.post(
+        "/api/v1/agents/query/stream",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"query": "Forecast next month"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == [
+        "guardrail", "agent_started", "agent_completed", "verified", "final"
+    ]
+    assert events[-1]["response"] == "Historical data not found for forecasting."
+
+
+def test_login_rejects_bad_credentials():
+    for username, password in [("admin@example.com", "wrong"), ("nobody@example.com", "password")]:
+        response = client.post("/api/v1/auth/login", data={"username": username, "password": password})
+        assert response.status_code == 400
+
+
+def test_verified_token_claims_are_cached():
+    from backend.core import security
+
+    token = security.create_access_token(subject="admin@example.com")
+    claims = security.decode_access_token(token)
+
+    assert security.decode_access_token(token) is claims
+    assert claims["sub"] == "admin@example.com"
+
+
+def test_metrics_endpoint_exposes_request_and_node_metrics():
+    client.post("/api/v1/agents/query", json={"query": "Analyze sales"})
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    client.post(
+        "/api/v1/agents/query",
+        headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+        json={"query": "Forecast next month"},
+    )
+    # Path parameter values must not leak into labels, even when they also occur in the prefix
+    client.get("/api/v1/datasets/1", headers={"Authorization": f"Bearer {login.json()['access_token']}"})
+
+    body = client.get("/metrics").text
+    assert 'api_requests_total{endpoint="/api/v1/datasets/{dataset_id}",method="GET",status_code="404"}' in body
+    assert "/api/v{" not in body
+    assert 'api_requests_total{endpoint="/api/v1/agents/query",method="POST",status_code="401"}' in body
+    assert 'workflow_node_latency_seconds_count{node="guardrail"}' in body
+    assert 'workflow_node_latency_seconds_count{node="verifier"}' in body
+    assert 'api_payload_bytes_count{direction="request",endpoint="/api/v1/agents/query"}' in body
+
+
+def test_anomaly_rows_are_paged_on_demand():
+    from backend.core.db import get_duckdb_conn
+
+    get_duckdb_conn().execute(
+        "CREATE OR REPLACE TABLE anomaly_readings AS "
+        "SELECT i AS reading_id, CASE WHEN i % 100 = 0 THEN 1000.0 ELSE 10.0 + i % 7 END AS units FROM range(1000) t(i)"
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    response = client.post(
+        "/api/v1/agents/query/stream",
+        headers=headers,
+        json={"query": "Profile anomalies in readings", "context": {"table": "anomaly_readings"}},
+    )
+    completed = [json.loads(line) for line in response.text.splitlines() if '"agent_completed"' in line][0]
+    result_id = completed["metadata"]["anomaly_result_id"]
+
+    page = client.get(
+        f"/api/v1/agents/anomalies/{result_id}", headers=headers, params={"column": "units", "limit": 4}
+    ).json()
+    assert page["total"] == 10 and len(page["rows"]) == 4
+    assert page["rows"][0]["values"] == {"reading_id": 0, "units": 1000.0}
+
+    assert client.get("/api/v1/agents/anomalies/unknown", headers=headers).status_code == 404
+
+    # Only the requesting user may page the result
+    from types import SimpleNamespace
+    from backend.api import deps
+
+    app.dependency_overrides[deps.get_current_active_user] = lambda: SimpleNamespace(
+        email="other@example.com", is_superuser=False
+    )
+    try:
+        assert client.get(f"/api/v1/agents/anomalies/{result_id}", headers=headers).status_code == 404
+    finally:
+        app.dependency_overrides.pop(deps.get_current_active_user)
+
+    # Once the table changes, its row ids may point at other rows
+    get_duckdb_conn().execute("CREATE OR REPLACE TABLE anomaly_readings AS SELECT 1 AS reading_id, 2.0 AS units")
+    assert client.get(f"/api/v1/agents/anomalies/{result_id}", headers=headers).status_code == 410
+
+
+def test_uploaded_datasets_are_resolved_by_id(monkeypatch):
+    import io
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from backend.api import datasets as datasets_api
+
+    # Uploads span several write blocks
+    monkeypatch.setattr(datasets_api, "UPLOAD_WRITE_BYTES", 1024)
+
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    table = pa.table({
+        "reading_id": pa.array(range(1000)),
+        "units": pa.array([1000.0 if i % 100 == 0 else 10.0 + i % 7 for i in range(1000)]),
+    })
+
+    stream, parquet = io.BytesIO(), io.BytesIO()
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table)
+    pq.write_table(table, parquet)
+
+    for body, expected_format in ((stream.getvalue(), "arrow_stream"), (parquet.getvalue(), "parquet")):
+        uploaded = client.post("/api/v1/datasets", headers=headers, content=body, params={"name": "readings"})
+        assert uploaded.status_code == 201
+        info = uploaded.json()
+        assert info["format"] == expected_format and info["rows"] == 1000 and "path" not in info
+
+        response = client.post(
+            "/api/v1/agents/query/stream",
+            headers=headers,
+            json={"query": "Profile anomalies in readings", "context": {"dataset_id": info["dataset_id"]}},
+        )
+        completed = [json.loads(line) for line in response.text.splitlines() if '"agent_completed"' in line][0]
+        assert completed["confidence_score"] > 0
+        page = client.get(
+            f"/api/v1/agents/anomalies/{completed['metadata']['anomaly_result_id']}",
+            headers=headers, params={"column": "units"},
+        ).json()
+        assert [row["index"] for row in page["rows"]] == list(range(0, 1000, 100))
+
+        assert client.delete(f"/api/v1/datasets/{info['dataset_id']}", headers=headers).status_code == 204
+        assert client.get(f"/api/v1/datasets/{info['dataset_id']}", headers=headers).status_code == 404
+
+    assert client.post("/api/v1/datasets", headers=headers, content=b"not columnar").status_code == 400
+
+
+def test_other_users_uploads_and_internal_tables_cannot_be_named_as_tables():
+    import io
+    from types import SimpleNamespace
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from backend.api import deps
+
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    parquet = io.BytesIO()
+    pq.write_table(pa.table({"secret_salary": [100.0, 200.0, 9000.0]}), parquet)
+    dataset_id = client.post("/api/v1/datasets", headers=headers, content=parquet.getvalue()).json()["dataset_id"]
+
+    app.dependency_overrides[deps.get_current_active_user] = lambda: SimpleNamespace(
+        email="mallory@example.com", is_superuser=False
+    )
+    try:
+        # Neither the upload's columns nor the registry's rows (paths, owners) come back
+        for context in (
+            {"dataset_id": dataset_id},
+            {"table": f"dataset_{dataset_id}"},
+            {"table": "_datasets"},
+            {"table": "main._eda_profiles"},
+            {"table": "_table_versions"},
+            {"table": "forecast_state"},
+            {"table": "information_schema.tables"},
+        ):
+            response = client.post(
+                "/api/v1/agents/query/stream", headers=headers, json={"query": "Profile this", "context": context}
+            )
+            completed = [json.loads(line) for line in response.text.splitlines() if '"agent_completed"' in line][0]
+            assert completed["confidence_score"] == 0.0, context
+            assert "anomaly_result_id" not in completed["metadata"]
+            assert "secret_salary" not in response.text and "admin@example.com" not in response.text
+    finally:
+        app.dependency_overrides.pop(deps.get_current_active_user)
+
+
+def test_anomaly_rows_of_tables_clients_may_not_read_are_refused():
+    import io
+    import uuid
+    from types import SimpleNamespace
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from backend.api import deps
+    from backend.core.cache import fingerprint_table, get_anomaly_results
+    from backend.core.db import get_duckdb_conn
+    from pipelines.anomalies import AnomalyResult
+    from pipelines.datasets import get_dataset_registry
+
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    parquet = io.BytesIO()
+    pq.write_table(pa.table({"secret_salary": [100.0, 200.0, 9000.0]}), parquet)
+    dataset_id = client.post("/api/v1/datasets", headers=headers, content=parquet.getvalue()).json()["dataset_id"]
+    # Catalogs from before uploads were kept off it carry a view of each Parquet upload
+    path = get_dataset_registry().info(dataset_id)["path"]
+    conn = get_duckdb_conn()
+    conn.execute(f"CREATE VIEW dataset_{dataset_id} AS SELECT * FROM read_parquet('{path}')")
+
+    app.dependency_overrides[deps.get_current_active_user] = lambda: SimpleNamespace(
+        email="mallory@example.com", is_superuser=False
+    )
+    try:
+        for table in (f"dataset_{dataset_id}", "_datasets"):
+            result_id = uuid.uuid4().hex
+            result = AnomalyResult(
+                "zscore", 3.0, 3, {"secret_salary": [2]}, {"secret_salary": [3.5]},
+                table=table, table_state=fingerprint_table(conn, table), owner="mallory@example.com",
+            )
+            get_anomaly_results().set(result_id, result, 60)
+            page = client.get(f"/api/v1/agents/anomalies/{result_id}", headers=headers)
+            assert page.status_code == 403 and "9000" not in page.text
+    finally:
+        app.dependency_overrides.pop(deps.get_current_active_user)
+        conn.execute(f"DROP VIEW dataset_{dataset_id}")
+
+
+def test_batch_runs_identical_queries_once_and_keeps_order(monkeypatch):
+    import asyncio
+    from backend.api import agents as agents_api
+    from backend.core.admission import AdmissionController
+
+    calls, running, peak = [], [0], [0]
+
+    async def fake_process_query(query, context=None, deadline=None):
+        calls.append(query)
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        if query == "fail":
+            raise RuntimeError("boom")
+        return f"answer to {query} {context.get('table')}"
+
+    monkeypatch.setattr(agents_api.orchestrator, "process_query", fake_process_query)
+    monkeypatch.setattr(agents_api.settings, "AGENT_BATCH_CONCURRENCY", 4)
+    # Each run is admitted on its own, so the global limit caps the batch's parallelism
+    monkeypatch.setattr(agents_api, "admission", AdmissionController(initial_limit=2, max_limit=2, per_user_limit=8))
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    queries = [
+        {"query": "Analyze sales", "context": {"table": "sales"}},
+        {"query": "fail"},
+        {"query": "Analyze sales", "context": {"table": "sales"}},
+        {"query": "Analyze sales", "context": {"table": "inventory"}},
+        {"query": "Forecast sales"},
+    ]
+    response = client.post(
+        "/api/v1/agents/query/batch",
+        headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+        json={"queries": queries},
+    )
+
+    results = response.json()["results"]
+    assert sorted(calls) == sorted(["Analyze sales", "fail", "Analyze sales", "Forecast sales"])
+    assert peak[0] == 2
+    assert results[0] == results[2] == {"response": "answer to Analyze sales sales", "error": None}
+    assert results[1] == {"response": None, "error": "Agent processing error: boom"}
+    assert results[3]["response"].endswith("inventory")
+    assert results[4]["response"] == "answer to Forecast sales None"
+    assert agents_api.admission.active == 0
+
+
+def test_overload_is_shed_with_retry_after(monkeypatch):
+    from backend.api import agents as agents_api
+    from backend.core.admission import AdmissionController
+
+    monkeypatch.setattr(agents_api, "admission", AdmissionController(per_user_limit=0))
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    # Streaming and batch runs are admitted too, so neither gets around the limits
+    for path, body in (
+        ("/api/v1/agents/query", {"query": "Analyze sales"}),
+        ("/api/v1/agents/query/stream", {"query": "Analyze sales"}),
+        ("/api/v1/agents/query/batch", {"queries": [{"query": "Analyze sales"}, {"query": "Forecast"}]}),
+    ):
+        response = client.post(path, headers=headers, json=body)
+        assert response.status_code == 429, path
+        assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_stream_holds_its_admission_slot_until_it_closes(monkeypatch):
+    from backend.api import agents as agents_api
+    from backend.core.admission import AdmissionController
+
+    admission = AdmissionController()
+    monkeypatch.setattr(agents_api, "admission", admission)
+    seen = []
+
+    async def fake_stream_query(query, context=None, deadline=None):
+        seen.append(admission.active)
+        yield {"event": "final", "response": "done"}
+
+    monkeypatch.setattr(agents_api.orchestrator, "stream_query", fake_stream_query)
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    response = client.post(
+        "/api/v1/agents/query/stream",
+        headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+        json={"query": "Analyze sales"},
+    )
+    assert response.status_code == 200
+    assert seen == [1]
+    assert admission.active == 0 and admission.per_user == {}
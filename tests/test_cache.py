@@ -0,0 +1,186 @@
+import time
+import pandas as pd
+import pytest
+from agents.orchestrator import WorkflowOrchestrator
+from backend.core.cache import InMemoryCache, ResultCache, fingerprint_context
+from monitoring.metrics import RESULT_CACHE_REQUESTS
+
+
+def test_in_memory_cache_ttl_and_lru_eviction():
+    cache = InMemoryCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+
+
+def test_result_cache_hands_out_copies():
+    from backend.core.cache import get_result_cache
+
+    cache = get_result_cache()
+    response = {"content": "ok", "metadata": {"rows": 1}}
+    cache.set("k", response)
+    response["metadata"]["rows"] = 2
+    cached = cache.get("k")
+    cached["metadata"]["rows"] = 3
+    assert cache.get("k") == {"content": "ok", "metadata": {"rows": 1}}
+
+
+def test_fingerprint_tracks_dataframe_content():
+    df = pd.DataFrame({"sales": [1.0, 2.0, 3.0]})
+    changed = df.copy()
+    changed.loc[1, "sales"] = 5.0
+
+    assert fingerprint_context({"history": df}) == fingerprint_context({"history": df.copy()})
+    assert fingerprint_context({"history": df}) != fingerprint_context({"history": changed})
+
+
+def test_fingerprint_tracks_forecast_state():
+    from ml.forecast_store import get_forecast_store
+
+    before = fingerprint_context({"forecast_state": True})
+    get_forecast_store().update(pd.DataFrame({"product_id": ["fp-1"], "date": ["2026-01-01"], "sales": [4.0]}))
+    assert fingerprint_context({"forecast_state": True}) != before
+
+
+def test_fingerprint_keys_missing_tables_by_name_only_on_request():
+    with pytest.raises(Exception):
+        fingerprint_context({"table": "no_such_table"})
+    missing = fingerprint_context({"table": "no_such_table"}, table_name_fallback=True)
+    assert missing == fingerprint_context({"table": "no_such_table"}, table_name_fallback=True)
+    assert missing != fingerprint_context({"table": "other_missing_table"}, table_name_fallback=True)
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_serves_repeat_queries_from_cache():
+    orch = WorkflowOrchestrator(result_cache=ResultCache(InMemoryCache()))
+    calls = []
+    original = orch.forecasting_agent.execute
+
+    async def counting_execute(task, context=None):
+        calls.append(task)
+        return await original(task, context=context)
+
+    orch.forecasting_agent.execute = counting_execute
+    context = {"history": pd.DataFrame({"sales": [100, 110, 120, 130]})}
+    hits = RESULT_CACHE_REQUESTS.labels(intent="forecast", outcome="hit")
+    before = hits._value.get()
+
+    first = await orch.process_query("Forecast sales", context=context)
+    second = await orch.process_query("forecast   sales", context=context)
+
+    assert first == second
+    assert len(calls) == 1
+    assert hits._value.get() == before + 1
+
+
+def test_dataset_cache_projects_columns_and_evicts_by_bytes(tmp_path):
+    import threading
+    import duckdb
+    import numpy as np
+    import pyarrow as pa
+    from pipelines.datasets import DatasetRegistry
+
+    table = pa.table({f"c{i}": np.arange(10_000, dtype=np.float64) * i for i in range(4)})
+    upload = tmp_path / "upload.arrow"
+    with pa.ipc.new_file(str(upload), table.schema) as writer:
+        writer.write_table(table)
+
+    # Room for two 80 KB columns
+    registry = DatasetRegistry(duckdb.connect(), str(tmp_path / "datasets"), cache_bytes=200_000)
+    dataset_id = registry.register(str(upload), name="wide")["dataset_id"]
+
+    reads = []
+    read = registry._read
+    registry._read = lambda info, columns: reads.append(list(columns)) or read(info, columns)
+    barrier = threading.Barrier(4)
+    def fetch():
+        barrier.wait()
+        return registry.table("wide", ["c1", "c2"])
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Concurrent readers share one load of just the projected columns
+    assert sum(len(columns) for columns in reads) == 2
+    assert registry.table(dataset_id, ["c2", "c1"]).column("c1").equals(table.column("c1"))
+    assert registry.cache.stats()["bytes"] == 160_000
+
+    # c2 is the least recently used column, so c3 displaces it
+    registry.table(dataset_id, ["c3"])
+    assert registry.cache.stats()["bytes"] <= 200_000
+    registry.table(dataset_id, ["c1", "c3"])
+    assert reads[-1] == ["c3"]
+    registry.table(dataset_id, ["c2"])
+    assert reads[-1] == ["c2"]
+
+
+def test_parquet_datasets_are_scanned_in_place_not_cached(tmp_path):
+    import duckdb
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pipelines.datasets import DatasetRegistry
+
+    upload = tmp_path / "upload.parquet"
+    pq.write_table(pa.table({"a": np.arange(1000), "b": np.arange(1000) * 2.0}), str(upload))
+    registry = DatasetRegistry(duckdb.connect(), str(tmp_path / "datasets"))
+    dataset_id = registry.register(str(upload))["dataset_id"]
+
+    cursor, view = registry.cursor(dataset_id)
+    assert cursor.execute(f"SELECT sum(b) FROM {view}").fetchone()[0] == 999_000.0
+    cursor.close()
+    cursor, view = registry.cursor(dataset_id, ["b"])
+    assert [c[0] for c in cursor.execute(f"SELECT * FROM {view} LIMIT 0").description] == ["b"]
+    cursor.close()
+    assert registry.cache.stats()["bytes"] == 0
+
+
+def test_anomaly_results_share_the_configured_redis_backend(monkeypatch):
+    from backend.core import cache
+
+    monkeypatch.setattr(cache.settings, "RESULT_CACHE_BACKEND", "redis")
+    monkeypatch.setattr(cache, "_anomaly_results", None)
+    store = cache.get_anomaly_results()
+    # Redis clients connect lazily, so no server is needed to build one
+    assert isinstance(store, cache.RedisCache) and store.prefix == "omnichain:anomaly:"
+
+
+def test_dataset_names_resolve_among_the_callers_uploads(tmp_path):
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pipelines.datasets import (
+        DATASET_ANY_OWNER, DatasetNotFound, DatasetRegistry, dataset_any_owner, with_dataset_owner,
+    )
+
+    registry = DatasetRegistry(duckdb.connect(), str(tmp_path / "datasets"))
+    uploaded = {}
+    for owner in ("a@example.com", "b@example.com"):
+        path = str(tmp_path / f"{owner}.parquet")
+        pq.write_table(pa.table({"units": [1.0, 2.0]}), path)
+        uploaded[owner] = registry.register(path, name="sales", owner=owner)["dataset_id"]
+
+    # The later upload by b does not shadow a's dataset of the same name
+    assert registry.resolve("sales", "a@example.com")["dataset_id"] == uploaded["a@example.com"]
+    assert registry.resolve("sales", "b@example.com")["dataset_id"] == uploaded["b@example.com"]
+    with pytest.raises(DatasetNotFound):
+        registry.resolve("sales", "c@example.com")
+    # Ids resolve only among the caller's uploads, unless any owner is explicitly allowed
+    assert registry.resolve(uploaded["a@example.com"], "a@example.com")["owner"] == "a@example.com"
+    with pytest.raises(DatasetNotFound):
+        registry.resolve(uploaded["b@example.com"], "a@example.com")
+    with pytest.raises(DatasetNotFound):
+        registry.frame(uploaded["b@example.com"], owner="a@example.com")
+    assert registry.resolve(uploaded["b@example.com"], "a@example.com", any_owner=True)["owner"] == "b@example.com"
+    # Clients cannot grant themselves access to other users' uploads
+    context = with_dataset_owner({"dataset_id": uploaded["b@example.com"], DATASET_ANY_OWNER: True}, "a@example.com")
+    assert not dataset_any_owner(context)
@@ -0,0 +1,155 @@
+import os
+import duckdb
+import numpy as np
+import pandas as pd
+from pipelines.eda import AutomatedEDA
+from pipelines.duckdb_eda import DuckDBEDA
+from pipelines.streaming_eda import StreamingEDA, QuantileSketch
+
+DEMO_SALES = os.path.join(os.path.dirname(__file__), "..", "data", "demo_sales.csv")
+
+
+def test_streaming_profile_matches_in_memory_profile():
+    expected = AutomatedEDA(pd.read_csv(DEMO_SALES)).run_full_profile()
+    report = StreamingEDA.from_csv(DEMO_SALES, chunksize=7).run_full_profile()
+
+    assert report.keys() == expected.keys()
+    assert report["missing_values"] == expected["missing_values"]
+    assert report["anomalies"] == expected["anomalies"]
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(report["summary"]), pd.DataFrame(expected["summary"]), check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(report["correlation"]), pd.DataFrame(expected["correlation"])
+    )
+
+
+def test_quantile_sketch_is_bounded_and_accurate():
+    values = np.random.default_rng(0).normal(size=500_000)
+    left, right = QuantileSketch(k=1024), QuantileSketch(k=1024)
+    for chunk in np.array_split(values[:250_000], 10):
+        left.update(chunk)
+    for chunk in np.array_split(values[250_000:], 10):
+        right.update(chunk)
+    sketch = left.merge(right)
+
+    assert sum(level.size for level in sketch.levels) < 20 * 1024
+    for q in (0.25, 0.5, 0.75):
+        assert abs(sketch.quantile(q) - np.quantile(values, q)) < 0.02
+
+
+def test_duckdb_profile_matches_in_memory_profile():
+    df = pd.read_csv(DEMO_SALES)
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE sales AS SELECT * FROM df")
+
+    expected = AutomatedEDA(df).run_full_profile()
+    report = DuckDBEDA(conn, "sales").run_full_profile()
+
+    assert report["missing_values"] == expected["missing_values"]
+    assert report["anomalies"] == expected["anomalies"]
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(report["summary"]), pd.DataFrame(expected["summary"]), check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(report["correlation"]), pd.DataFrame(expected["correlation"])
+    )
+
+
+def test_duckdb_catalog_is_shared_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.core.db import get_duckdb_conn
+
+    get_duckdb_conn().execute("CREATE OR REPLACE TABLE shared_probe AS SELECT 42 AS answer")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(lambda: (get_duckdb_conn(), get_duckdb_conn().execute("SELECT answer FROM shared_probe").fetchone()[0]))
+        cursor, answer = other.result()
+
+    assert answer == 42
+    assert cursor is not get_duckdb_conn()
+
+
+def test_incremental_profile_tracks_appends_without_rescanning():
+    from agents.eda_agent import profile_table
+    from backend.core.db import get_duckdb_conn
+    from pipelines.etl import ETLPipeline
+    from pipelines.profile_store import get_profile_store
+
+    df = pd.read_csv(DEMO_SALES)
+    etl = ETLPipeline()
+    etl.ingest_dataframe(df.iloc[:10], "incremental_sales", target="duckdb")
+    for part in (df.iloc[10:20], df.iloc[20:]):
+        etl.ingest_dataframe(part, "incremental_sales", target="duckdb", if_exists="append")
+
+    conn = get_duckdb_conn()
+    assert get_profile_store().fresh(conn, "incremental_sales").rows == len(df)
+    expected = AutomatedEDA(df).run_full_profile()
+    rows, report, anomalies = profile_table(None, "incremental_sales")
+
+    assert rows == len(df)
+    assert report["missing_values"] == expected["missing_values"]
+    assert anomalies.to_lists() == expected["anomalies"]
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(report["summary"]), pd.DataFrame(expected["summary"]), check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(report["correlation"]), pd.DataFrame(expected["correlation"]), atol=1e-12
+    )
+
+    # Writes that bypass the pipeline make the stored profile stale
+    conn.execute("INSERT INTO incremental_sales SELECT * FROM incremental_sales LIMIT 1")
+    assert get_profile_store().fresh(conn, "incremental_sales") is None
+
+
+def test_sparse_correlation_matches_dense_top_pairs():
+    from pipelines.correlation import sparse_to_pairs, top_correlations
+
+    rng = np.random.default_rng(1)
+    values = rng.standard_normal((500, 120))
+    values[:, 10] = 0.8 * values[:, 2] + 0.2 * values[:, 10]
+    values[:, 90] = -values[:, 40] + 0.5 * values[:, 90]
+    df = pd.DataFrame(values, columns=[f"f{i}" for i in range(120)])
+
+    dense = df.corr().to_numpy()
+    upper = np.triu_indices(120, k=1)
+    expected = np.sort(np.abs(dense[upper]))[::-1][:25]
+
+    sparse = top_correlations(df, top_k=25, block_size=7)
+    assert np.allclose(np.abs(sparse["r"]), expected, atol=1e-5)
+    assert sparse_to_pairs(sparse)[0]["a"] == "f2" and sparse_to_pairs(sparse)[0]["b"] == "f10"
+
+    above = top_correlations(df, top_k=None, threshold=0.5, block_size=16)
+    assert sorted(zip(above["i"], above["j"])) == [(2, 10), (40, 90)]
+
+    # Wide frames switch the report to the sparse form automatically
+    report = AutomatedEDA(df).run_full_profile()
+    assert report["correlation"]["format"] == "sparse"
+    assert len(report["correlation"]["r"]) == 100
+    assert "format" not in AutomatedEDA(df.iloc[:, :5]).run_full_profile()["correlation"]
+
+
+def test_compact_anomalies_page_and_robust_scores():
+    values = np.r_[np.random.default_rng(3).normal(100, 5, 500), [1_000.0, 950.0, -400.0]]
+    df = pd.DataFrame({"units": values, "flat": 1.0, "label": "x"})
+    eda = AutomatedEDA(df)
+
+    zscore = eda.anomaly_result()
+    assert zscore.to_lists()["units"] == eda.detect_anomalies()["units"]
+    assert zscore.summary()["columns"]["flat"] == {"count": 0, "max_score": None}
+
+    # The extreme values inflate the std; MAD stays anchored on the bulk of the data
+    robust = eda.anomaly_result("mad")
+    assert set(robust.indices["units"]) >= {500, 501, 502}
+    assert robust.counts["units"] >= zscore.counts["units"]
+
+    page = robust.page("units", offset=0, limit=2)
+    assert page["total"] == robust.counts["units"] and len(page["rows"]) == 2
+    everything = robust.page(limit=1000)
+    assert [row["index"] for row in everything["rows"]] == robust.anomalous_rows().tolist()
+    assert np.unpackbits(robust.mask("units"))[:len(df)].sum() == robust.counts["units"]
+
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE readings AS SELECT * FROM df")
+    in_db = DuckDBEDA(conn, "readings").anomaly_result("mad")
+    assert in_db.to_lists()["units"] == robust.to_lists()["units"]
+    assert np.allclose(in_db.scores["units"], robust.scores["units"], rtol=1e-5)
@@ -0,0 +1,80 @@
+import os
+import pandas as pd
+from pipelines.etl import ETLPipeline
+
+DEMO_SALES = os.path.join(os.path.dirname(__file__), "..", "data", "demo_sales.csv")
+
+
+def test_bulk_ingest_streams_csv_and_parquet_into_duckdb(tmp_path):
+    parquet_path = str(tmp_path / "sales.parquet")
+    pd.read_csv(DEMO_SALES).to_parquet(parquet_path)
+    etl = ETLPipeline()
+
+    loaded = etl.bulk_ingest(DEMO_SALES, "bulk_sales", target="duckdb", if_exists="replace")
+    assert loaded == {"duckdb": 30}
+
+    loaded = etl.bulk_ingest(parquet_path, "bulk_sales", target="duckdb")
+    assert loaded == {"duckdb": 30}
+
+    total = etl.get_analytical_results("SELECT count(*) AS n FROM bulk_sales")["n"][0]
+    assert total == 60
+
+
+def test_bulk_ingest_profiles_only_the_new_rows_without_rereading_the_file(tmp_path, monkeypatch):
+    etl = ETLPipeline()
+    df = pd.read_csv(DEMO_SALES)
+    etl.bulk_ingest(DEMO_SALES, "bulk_profiled", target="duckdb", if_exists="replace")
+
+    # The profile comes from the loaded table, not a second pandas pass over the file
+    monkeypatch.setattr(pd, "read_csv", lambda *a, **k: (_ for _ in ()).throw(AssertionError("file re-read")))
+    etl.bulk_ingest(DEMO_SALES, "bulk_profiled", target="duckdb")
+
+    profile = etl.profiles.get("bulk_profiled")
+    assert profile.rows == 2 * len(df)
+    assert etl.profiles.fresh(etl.duck_conn, "bulk_profiled") is not None
+
+
+def test_sales_loads_feed_the_forecast_store(tmp_path):
+    import duckdb
+    from ml.forecast_store import ForecastStore
+    from pipelines.profile_store import ProfileStore
+
+    conn = duckdb.connect()
+    etl = ETLPipeline(profile_store=ProfileStore(conn), forecast_store=ForecastStore(conn))
+    etl.duck_conn = conn
+    sales = pd.DataFrame({
+        "product_id": [1, 2, 1, 2],
+        "quantity": [3, 5, 4, 6],
+        "sale_date": pd.to_datetime(["2026-01-01", "2026-01-01", "2026-01-02", "2026-01-02"]),
+    })
+    path = str(tmp_path / "sales.parquet")
+    sales.iloc[:2].to_parquet(path)
+    etl.bulk_ingest(path, "sales", target="duckdb", if_exists="replace")
+    version = etl.forecasts.version()
+    assert etl.forecasts.load()["n"].tolist() == [1, 1]
+
+    sales.iloc[2:].to_parquet(path)
+    etl.bulk_ingest(path, "sales", target="duckdb")
+    assert etl.forecasts.load()["n"].tolist() == [2, 2]
+    assert etl.forecasts.version() != version
+
+    # Replacing the table restarts the series
+    etl.ingest_dataframe(sales.iloc[:2], "sales", target="duckdb", if_exists="replace")
+    assert etl.forecasts.load()["n"].tolist() == [1, 1]
+
+
+def test_profile_freshness_follows_recorded_writes_not_row_counts():
+    etl = ETLPipeline()
+    df = pd.read_csv(DEMO_SALES)
+    etl.ingest_dataframe(df, "versioned_sales", target="duckdb")
+    assert etl.profiles.fresh(etl.duck_conn, "versioned_sales").rows == len(df)
+
+    # An update keeps the row count but is recorded as a write
+    etl.get_analytical_results("UPDATE versioned_sales SET sales = sales * 2")
+    assert etl.profiles.fresh(etl.duck_conn, "versioned_sales") is None
+
+    # Dropping and reloading the table starts a new profile instead of merging into the old one
+    etl.ingest_dataframe(df, "versioned_sales", target="duckdb")
+    etl.duck_conn.execute("DROP TABLE versioned_sales")
+    etl.ingest_dataframe(df.iloc[:5], "versioned_sales", target="duckdb", if_exists="append")
+    assert etl.profiles.fresh(etl.duck_conn, "versioned_sales").rows == 5
@@ -0,0 +1,113 @@
+import os
+import numpy as np
+import pandas as pd
+from ml.forecasting import DemandForecaster
+
+DEMO_SALES = os.path.join(os.path.dirname(__file__), "..", "data", "demo_sales.csv")
+
+
+def test_predict_sales_batch_matches_single_series_fit():
+    sales = pd.read_csv(DEMO_SALES)
+    batch = DemandForecaster.predict_sales_batch(sales, periods=6)
+
+    assert len(batch) == sales["product_id"].nunique()
+    for product_id, group in sales.groupby("product_id"):
+        row = batch.loc[product_id]
+        assert row["n_obs"] == len(group)
+        if len(group) < 2:
+            assert row["slope"] == 0
+            continue
+        single = DemandForecaster.predict_sales(group.sort_values("date"), periods=6)
+        assert np.isclose(row["predicted_mean"], single["predicted_mean"])
+        assert row["trend"] == single["trend"]
+
+
+def test_expand_batch_forecasts_shape():
+    sales = pd.DataFrame({
+        "product_id": [1, 1, 1, 2, 2],
+        "date": ["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-01", "2026-01-02"],
+        "sales": [1.0, 2.0, 3.0, 5.0, 3.0],
+    })
+    batch = DemandForecaster.predict_sales_batch(sales, periods=2)
+    values = DemandForecaster.expand_batch_forecasts(batch, periods=2)
+
+    assert values.shape == (2, 2)
+    assert np.allclose(values[0], [4.0, 5.0])
+    assert np.allclose(values[1], [1.0, -1.0])
+
+
+def test_predict_sales_batch_skips_rows_without_a_series_id():
+    sales = pd.DataFrame({
+        "product_id": ["a", None, "a", np.nan],
+        "date": ["2026-01-01", "2026-01-01", "2026-01-02", "2026-01-02"],
+        "sales": [1.0, 7.0, 3.0, 9.0],
+    })
+    batch = DemandForecaster.predict_sales_batch(sales, periods=1)
+
+    assert list(batch.index) == ["a"]
+    assert batch.loc["a", "n_obs"] == 2 and np.isclose(batch.loc["a", "slope"], 2.0)
+    assert DemandForecaster.predict_sales_batch(sales.iloc[[1]]).empty
+
+
+def test_forecast_store_incremental_updates_match_full_refit():
+    import duckdb
+    from ml.forecast_store import ForecastStore
+
+    sales = pd.read_csv(DEMO_SALES)
+    conn = duckdb.connect()
+    store = ForecastStore(conn)
+    for _, day in sales.groupby("date"):
+        store.update(day)
+
+    # A fresh store on the same database sees the persisted state
+    incremental = ForecastStore(conn).forecast(periods=6)
+    full = DemandForecaster.predict_sales_batch(sales, periods=6)
+    full.index = full.index.astype(str)
+    full = full.reindex(incremental.index)
+
+    assert (incremental["n_obs"] == full["n_obs"]).all()
+    assert np.allclose(incremental["slope"], full["slope"])
+    assert np.allclose(incremental["predicted_mean"], full["predicted_mean"])
+
+
+def test_forecast_store_keys_ids_the_same_with_or_without_nulls():
+    import duckdb
+    from ml.forecast_store import ForecastStore
+
+    conn = duckdb.connect()
+    loaded = conn.execute(
+        "SELECT * FROM (VALUES (1::BIGINT, DATE '2026-01-01', 10.0), (NULL, DATE '2026-01-01', 5.0), "
+        "(1, DATE '2026-01-02', 12.0)) t(product_id, date, sales)"
+    ).df()
+    # Depending on its version, DuckDB returns an integer column holding NULLs as float64 or a nullable integer
+    for first in (loaded, loaded.assign(product_id=loaded["product_id"].astype("float64"))):
+        store = ForecastStore(conn)
+        store.reset()
+        store.update(first)
+        store.update(pd.DataFrame({"product_id": [1], "date": [pd.Timestamp("2026-01-03")], "sales": [14.0]}))
+
+        state = store.load()
+        assert list(state.index) == ["1"] and state.loc["1", "n"] == 3
+        assert list(store.load(ids=[1.0]).index) == ["1"]
+
+
+def test_update_state_holt_recursion():
+    observations = pd.DataFrame({"product_id": [1, 1, 1], "date": [1, 2, 3], "sales": [10.0, 20.0, 30.0]})
+    empty = pd.DataFrame(columns=DemandForecaster.STATE_COLUMNS)
+    state = DemandForecaster.update_state(empty, observations.iloc[:1], alpha=0.5, beta=0.5)
+    state = DemandForecaster.update_state(state, observations.iloc[1:], alpha=0.5, beta=0.5)
+
+    # level: 10 -> 15 -> 23.75; trend: 0 -> 2.5 -> 5.625
+    assert np.isclose(state.loc[1, "level"], 23.75)
+    assert np.isclose(state.loc[1, "ewma_trend"], 5.625)
+    assert state.loc[1, "n"] == 3 and np.isclose(state.loc[1, "sum_xy"], 0 * 10 + 1 * 20 + 2 * 30)
+
+
+def test_update_state_skips_rows_without_a_series_id():
+    observations = pd.DataFrame({"product_id": [1, None, 1], "date": [1, 1, 2], "sales": [10.0, 50.0, 20.0]})
+    empty = pd.DataFrame(columns=DemandForecaster.STATE_COLUMNS)
+    state = DemandForecaster.update_state(empty, observations)
+
+    assert list(state.index) == [1]
+    assert state.loc[1, "n"] == 2 and np.isclose(state.loc[1, "sum_y"], 30.0)
+    assert DemandForecaster.update_state(empty, observations.iloc[[1]]).empty
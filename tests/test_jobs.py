@@ -0,0 +1,276 @@
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core import db
+from backend.core.jobs import SQLiteJobStore, get_job_store
+from backend.main import app
+from backend.worker import JobWorker
+
+
+client = TestClient(app)
+
+
+def _auth_headers():
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin@example.com", "password": "password"},
+    )
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def test_sqlite_job_store_lifecycle(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.submit("a@example.com", "Analyze sales", {"table": "sales"})
+    second = store.submit("a@example.com", "Forecast", None)
+
+    # Jobs are claimed oldest first, each by one worker
+    job = store.claim("w1")
+    assert job["job_id"] == first and job["status"] == "running" and job["context"] == {"table": "sales"}
+    store.update(first, progress=0.5, stage="agent_started")
+    assert store.get(first)["progress"] == 0.5
+
+    assert store.finish(first, "w1", "succeeded", result={"response": "ok"})
+    done = store.get(first)
+    assert done["status"] == "succeeded" and done["progress"] == 1.0 and done["result"] == {"response": "ok"}
+    assert not store.cancel(first)
+
+    # A job whose worker stops sending heartbeats goes back to the queue
+    assert store.claim("w2")["job_id"] == second
+    assert store.claim("w3") is None
+    assert store.requeue_stale(older_than=-1) == 1
+    assert store.claim("w3")["job_id"] == second
+
+    # Running jobs are cancelled cooperatively; queued ones at once
+    assert store.cancel(second) and store.cancel_requested(second)
+    third = store.submit("a@example.com", "Optimize", None)
+    assert store.cancel(third) and store.get(third)["status"] == "cancelled"
+    assert store.claim("w4") is None
+
+
+def test_sqlite_job_store_ignores_outcomes_of_requeued_runs(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.submit("a@example.com", "Analyze sales", None)
+    store.claim("w1")
+    assert store.requeue_stale(older_than=-1) == 1
+    # A requeued job cancelled while queued stays cancelled
+    assert store.cancel(first)
+    assert not store.finish(first, "w1", "succeeded", result={"response": "late"})
+    assert store.get(first)["status"] == "cancelled" and store.get(first)["result"] is None
+
+    # The first worker cannot overwrite the second worker's run or result
+    second = store.submit("a@example.com", "Forecast", None)
+    store.claim("w1")
+    store.requeue_stale(older_than=-1)
+    store.claim("w2")
+    assert not store.finish(second, "w1", "failed", error="stale")
+    assert store.get(second)["status"] == "running"
+    assert store.finish(second, "w2", "succeeded", result={"response": "ok"})
+    assert not store.finish(second, "w1", "failed", error="stale")
+    assert store.get(second)["result"] == {"response": "ok"}
+
+    # A stale run whose cancellation was requested is cancelled, not requeued
+    third = store.submit("a@example.com", "Optimize", None)
+    store.claim("w3")
+    assert store.cancel(third)
+    assert store.requeue_stale(older_than=-1) == 0
+    assert store.get(third)["status"] == "cancelled" and store.claim("w4") is None
+
+
+@pytest.fixture
+def snapshot_catalog(tmp_path, monkeypatch):
+    """A file-backed catalog of its own, publishing snapshots to a temporary directory."""
+    monkeypatch.setattr(db.settings, "DUCKDB_PATH", str(tmp_path / "catalog.duckdb"))
+    monkeypatch.setattr(db.settings, "DUCKDB_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(db.settings, "DUCKDB_SNAPSHOT_KEEP", 2)
+    monkeypatch.setattr(db, "_duckdb_catalog", None)
+    monkeypatch.setattr(db, "_snapshot_conns", {})
+    monkeypatch.setattr(db, "_latest_snapshot", None)
+    monkeypatch.setattr(db, "_published", (None, None, None))
+    writer = db.get_duckdb_catalog()
+    yield writer
+    for conn, _ in db._snapshot_conns.values():
+        conn.close()
+    writer.close()
+
+
+def _write(catalog, statement):
+    catalog.execute(statement)
+    db.catalog_changed()
+
+
+def test_workers_read_a_published_catalog_snapshot(tmp_path, snapshot_catalog):
+    from ml.forecast_store import ForecastStore
+    from pipelines.datasets import DatasetRegistry
+
+    _write(snapshot_catalog, "CREATE TABLE sales AS SELECT range AS units FROM range(5)")
+    ForecastStore(snapshot_catalog)
+
+    first = db.publish_duckdb_snapshot()
+    # Submissions share a snapshot until the catalog is written to
+    assert db.publish_duckdb_snapshot() == first
+    catalog = db.open_duckdb_snapshot(first)
+    _write(snapshot_catalog, "INSERT INTO sales VALUES (5)")
+    second = db.publish_duckdb_snapshot()
+    assert second != first
+    assert db.open_duckdb_snapshot(second).execute("SELECT count(*) FROM sales").fetchone()[0] == 6
+
+    # The superseded snapshot stays open while a job holds it
+    assert catalog.execute("SELECT count(*) FROM sales").fetchone()[0] == 5
+    with pytest.raises(Exception):
+        catalog.execute("INSERT INTO sales VALUES (7)")
+    # Stores open on the read-only snapshot without creating their tables
+    DatasetRegistry(catalog, str(tmp_path / "datasets"))
+    assert ForecastStore(catalog).load().empty
+    db.release_duckdb_snapshot(catalog)
+    assert first not in db._snapshot_conns and second in db._snapshot_conns
+
+    _write(snapshot_catalog, "INSERT INTO sales VALUES (6)")
+    third = db.publish_duckdb_snapshot()
+    db.release_duckdb_snapshot(db.open_duckdb_snapshot(third))
+    assert not os.path.exists(first)
+    # A pruned snapshot falls back to the newest one
+    newest = db.open_duckdb_snapshot(first)
+    assert newest.execute("SELECT count(*) FROM sales").fetchone()[0] == 7
+    db.release_duckdb_snapshot(newest)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_each_read_their_own_snapshot(snapshot_catalog):
+    import asyncio
+    from pipelines.datasets import get_dataset_registry
+
+    _write(snapshot_catalog, "CREATE TABLE version AS SELECT 1 AS v")
+    first = db.publish_duckdb_snapshot()
+    # Snapshots are copied in the background; this one before the update
+    db._published[2].result()
+    _write(snapshot_catalog, "UPDATE version SET v = 2")
+    second = db.publish_duckdb_snapshot()
+    both_started = asyncio.Barrier(2)
+
+    class CatalogOrchestrator:
+        async def stream_query(self, query, context=None, deadline=None, full_metadata=False):
+            registry = get_dataset_registry()
+            await both_started.wait()
+            v = await asyncio.to_thread(lambda: db.get_duckdb_conn().execute("SELECT v FROM version").fetchone()[0])
+            assert get_dataset_registry() is registry
+            yield {"event": "final", "response": f"v={v}"}
+
+    store = get_job_store()
+    jobs = [store.submit("a@example.com", "Analyze", None, catalog) for catalog in (first, second)]
+    worker = JobWorker(store, orchestrator=CatalogOrchestrator(), concurrency=2, use_snapshots=True)
+    await asyncio.gather(*(worker.run_job(store.claim("w")) for _ in jobs))
+
+    assert [store.get(job_id)["result"]["response"] for job_id in jobs] == ["v=1", "v=2"]
+    # Only the newest snapshot stays open once no job holds the older one
+    assert list(db._snapshot_conns) == [second]
+
+
+@pytest.mark.asyncio
+async def test_submitted_job_is_run_by_a_worker_and_polled():
+    from backend.api.agents import orchestrator
+
+    headers = _auth_headers()
+    submitted = client.post("/api/v1/jobs", headers=headers, json={"query": "Forecast next month"})
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+    assert client.get(f"/api/v1/jobs/{job_id}", headers=headers).json()["status"] == "queued"
+    # The job records the catalog snapshot its worker reads, which is copied in the background
+    catalog = get_job_store().get(job_id)["catalog"]
+    assert os.path.dirname(catalog) == db.settings.DUCKDB_SNAPSHOT_DIR
+    # Submissions share it while the catalog is unchanged
+    assert db.publish_duckdb_snapshot() == catalog
+
+    worker = JobWorker(get_job_store(), orchestrator=orchestrator, concurrency=1)
+    assert await worker.run_once()
+
+    job = client.get(f"/api/v1/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "succeeded" and job["progress"] == 1.0
+    assert job["result"]["response"]
+    assert [a["agent"] for a in job["result"]["agents"]] == ["Forecasting Agent"]
+    assert job["finished_at"] >= job["started_at"] >= job["created_at"]
+    assert client.delete(f"/api/v1/jobs/{job_id}", headers=headers).status_code == 409
+    assert client.get("/api/v1/jobs/unknown", headers=headers).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_job_result_keeps_full_agent_metadata():
+    import io
+    import os
+    import pandas as pd
+    from backend.api.agents import orchestrator
+
+    headers = _auth_headers()
+    demo = os.path.join(os.path.dirname(__file__), "..", "data", "demo_sales.csv")
+    parquet = io.BytesIO()
+    pd.read_csv(demo).to_parquet(parquet)
+    dataset_id = client.post("/api/v1/datasets", headers=headers, content=parquet.getvalue()).json()["dataset_id"]
+
+    job_id = client.post(
+        "/api/v1/jobs", headers=headers, json={"query": "Forecast demand", "context": {"dataset_id": dataset_id}}
+    ).json()["job_id"]
+    assert await JobWorker(get_job_store(), orchestrator=orchestrator, concurrency=1).run_once()
+
+    job = client.get(f"/api/v1/jobs/{job_id}", headers=headers).json()
+    metadata = job["result"]["agents"][0]["metadata"]
+    # Every per-SKU forecast is kept, not just the size of the list
+    assert metadata["product_count"] == 10 and len(metadata["forecasts"]) == 10
+    assert {"product_id", "predicted_mean", "trend"} <= set(metadata["forecasts"][0])
+    assert job["stage"] == "verified"
+
+
+@pytest.mark.asyncio
+async def test_running_job_is_cancelled_at_its_heartbeat(monkeypatch):
+    import asyncio
+    from backend.worker import settings
+
+    store = get_job_store()
+    started = asyncio.Event()
+
+    class SlowOrchestrator:
+        async def stream_query(self, query, context=None, deadline=None, full_metadata=False):
+            started.set()
+            await asyncio.sleep(10)
+            yield {"event": "final", "response": "late"}
+
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.05)
+    job_id = store.submit("admin@example.com", "Analyze sales", None)
+    run = asyncio.ensure_future(JobWorker(store, orchestrator=SlowOrchestrator()).run_once())
+    await started.wait()
+    assert store.cancel(job_id)
+
+    begun = time.perf_counter()
+    assert await run
+    assert time.perf_counter() - begun < 1.0
+    assert store.get(job_id)["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_worker_claims_nothing_once_stopped_while_its_slots_are_busy():
+    import asyncio
+
+    store = get_job_store()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    class BlockingOrchestrator:
+        async def stream_query(self, query, context=None, deadline=None, full_metadata=False):
+            started.set()
+            await release.wait()
+            yield {"event": "final", "response": "done"}
+
+    first = store.submit("admin@example.com", "Analyze sales", None)
+    stop = asyncio.Event()
+    run = asyncio.ensure_future(JobWorker(store, orchestrator=BlockingOrchestrator(), concurrency=1).run(stop))
+    await started.wait()
+    second = store.submit("admin@example.com", "Forecast", None)
+    # Shutdown begins while the only slot is busy; the slot frees up afterwards
+    stop.set()
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.wait_for(run, 5)
+
+    assert store.get(first)["status"] == "succeeded"
+    assert store.get(second)["status"] == "queued"
+    assert store.cancel(second)
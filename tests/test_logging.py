@@ -0,0 +1,43 @@
+import logging
+from fastapi.testclient import TestClient
+from backend.main import app
+from monitoring.logging import CorrelationIdFilter, RateLimitFilter, correlation_id, setup_logging
+
+
+def _record(msg="noisy event", level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def test_setup_logging_is_idempotent():
+    setup_logging()
+    root = setup_logging()
+    assert sum(getattr(h, "_omnichain", False) for h in root.handlers) == 1
+
+
+def test_rate_limit_filter_throttles_info_but_not_warnings():
+    limiter = RateLimitFilter(rate_per_second=0.001, burst=2)
+    assert [limiter.filter(_record()) for _ in range(4)] == [True, True, False, False]
+    assert limiter.filter(_record(level=logging.WARNING))
+    assert limiter.filter(_record("other event"))
+
+
+def test_rate_limit_filter_keeps_a_bounded_number_of_templates():
+    limiter = RateLimitFilter(rate_per_second=0.001, burst=1, max_buckets=8)
+    for i in range(100):
+        limiter.filter(_record(f"event {i}"))
+    assert len(limiter._buckets) == 8
+    # Recently seen templates stay throttled
+    assert not limiter.filter(_record("event 99"))
+
+
+def test_request_id_is_echoed_and_stamped_on_records():
+    response = TestClient(app).get("/", headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-request-id"] == "req-123"
+
+    token = correlation_id.set("req-456")
+    try:
+        record = _record()
+        CorrelationIdFilter().filter(record)
+    finally:
+        correlation_id.reset(token)
+    assert record.correlation_id == "req-456"
@@ -0,0 +1,208 @@
+import asyncio
+import pytest
+from backend.core.admission import AdmissionController, AdmissionRejected
+from backend.core.resilience import CircuitBreaker, CircuitOpenError
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_then_sheds_with_retry_after():
+    admission = AdmissionController(initial_limit=1, max_limit=1, per_user_limit=2, max_queue=1, queue_timeout=0.05)
+    release = asyncio.Event()
+
+    async def run(user):
+        async with admission.admit(user):
+            await release.wait()
+        return user
+
+    first = asyncio.create_task(run("a"))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(run("b"))
+    await asyncio.sleep(0)
+
+    # One running, one waiting: the next request finds the queue full
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.acquire("c")
+    assert rejected.value.reason == "queue_full" and rejected.value.retry_after >= 1
+
+    release.set()
+    assert await asyncio.gather(first, queued) == ["a", "b"]
+    assert admission.active == 0 and admission.per_user == {}
+
+    release.clear()
+    holders = [asyncio.create_task(run("a")), asyncio.create_task(run("a"))]
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.acquire("a")
+    assert rejected.value.reason == "user_limit"
+
+    # The queued request gives up after queue_timeout
+    await asyncio.sleep(0.1)
+    assert holders[1].done()
+    with pytest.raises(AdmissionRejected):
+        holders[1].result()
+    release.set()
+    await holders[0]
+    assert admission.active == 0 and admission.per_user == {}
+
+
+@pytest.mark.asyncio
+async def test_admission_limit_adapts_to_latency():
+    admission = AdmissionController(initial_limit=8, min_limit=2, max_limit=10, target_latency=0.01)
+
+    for _ in range(10):
+        admission.release("u", await admission.acquire("u"))
+    assert admission.limit > 8
+
+    started = await admission.acquire("u")
+    await asyncio.sleep(0.02)
+    admission.release("u", started)
+    assert 2 <= admission.limit < 5
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_trips_on_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+    async def fail():
+        raise RuntimeError("down")
+
+    async def ok():
+        return "ok"
+
+    for call in (fail, ok, fail):
+        try:
+            await breaker.call(call)
+        except RuntimeError:
+            pass
+    assert breaker.state == "CLOSED"
+
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+    with pytest.raises(CircuitOpenError) as rejected:
+        await breaker.call(ok)
+    assert 0 < rejected.value.retry_after <= 60
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_when_the_deadline_budget_runs_out():
+    import time
+    from backend.core.resilience import current_deadline, retry
+
+    attempts = []
+
+    @retry(retries=5, delay=0.2, backoff=2.0)
+    async def flaky():
+        attempts.append(time.perf_counter())
+        raise ConnectionError("unavailable")
+
+    token = current_deadline.set(time.time() + 0.5)
+    try:
+        started = time.perf_counter()
+        with pytest.raises(ConnectionError):
+            await flaky()
+    finally:
+        current_deadline.reset(token)
+
+    # 0.2s then 0.4s of backoff would overrun the 0.5s budget, so only two attempts run
+    assert len(attempts) == 2
+    assert time.perf_counter() - started < 0.45
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_returns_the_fastest_attempt():
+    import time
+    from backend.core.resilience import hedged
+
+    calls, cancelled = [], []
+
+    async def lookup():
+        calls.append(len(calls))
+        try:
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return len(calls)
+
+    started = time.perf_counter()
+    assert await hedged(lookup, delay=0.05) == 2
+    assert time.perf_counter() - started < 0.5
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_run_is_bounded_by_its_deadline(monkeypatch):
+    import time
+    from agents.orchestrator import WorkflowOrchestrator
+    from backend.core.cache import InMemoryCache, ResultCache
+    from backend.core.resilience import DeadlineExceeded
+
+    orchestrator = WorkflowOrchestrator(result_cache=ResultCache(InMemoryCache(max_entries=0)))
+
+    async def slow_execute(task, context=None):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(orchestrator.eda_agent, "execute", slow_execute)
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        await orchestrator.process_query("Analyze sales", {"table": "sales"}, deadline=time.time() + 0.2)
+    assert time.perf_counter() - started < 1.0
+    # An expired budget is not held against the agent
+    assert orchestrator.circuit_breakers[orchestrator.eda_agent.name].failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_client_input_errors_do_not_open_the_circuit(monkeypatch):
+    from agents.orchestrator import WorkflowOrchestrator
+    from backend.core.cache import InMemoryCache, ResultCache
+
+    orchestrator = WorkflowOrchestrator(result_cache=ResultCache(InMemoryCache(max_entries=0)))
+    breaker = orchestrator.circuit_breakers[orchestrator.eda_agent.name]
+
+    async def bad_input(task, context=None):
+        raise KeyError("no_such_column")
+
+    monkeypatch.setattr(orchestrator.eda_agent, "execute", bad_input)
+    for _ in range(breaker.failure_threshold + 1):
+        with pytest.raises(KeyError):
+            await orchestrator.process_query("Analyze sales", {"table": "sales"})
+    assert breaker.state == "CLOSED" and breaker.failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_agents_surface_an_expired_deadline_instead_of_a_timeout_answer(monkeypatch):
+    import time
+    from agents.eda_agent import EDAAgent
+    from agents.forecasting_agent import ForecastingAgent
+    from backend.core.resilience import DeadlineExceeded, current_deadline
+    import pandas as pd
+
+    async def out_of_budget(func, *args, **kwargs):
+        raise DeadlineExceeded("Request deadline exceeded")
+
+    async def task_timeout(func, *args, **kwargs):
+        raise asyncio.TimeoutError()
+
+    eda, forecasting = EDAAgent(), ForecastingAgent()
+    df = pd.DataFrame({"sales": [1.0, 2.0, 3.0, 4.0]})
+    for agent, context in ((eda, {"dataframe": df}), (forecasting, {"history": df})):
+        monkeypatch.setattr(agent, "run_cpu_bound", out_of_budget)
+        with pytest.raises(DeadlineExceeded):
+            await agent.execute("Analyze", context)
+        # A task timeout within the budget is still answered by the agent
+        monkeypatch.setattr(agent, "run_cpu_bound", task_timeout)
+        assert (await agent.execute("Analyze", context)).confidence_score == 0.0
+
+    # Pool work cut off by the request deadline is reported as DeadlineExceeded
+    from agents import base
+    monkeypatch.setattr(base.settings, "AGENT_POOL_SIZE", 1)
+    monkeypatch.setattr(base.settings, "AGENT_OFFLOAD_MIN_ROWS", 0)
+    monkeypatch.setattr(base, "_executor", None)
+    token = current_deadline.set(time.time() + 0.3)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            await EDAAgent().run_cpu_bound(time.sleep, 5)
+    finally:
+        current_deadline.reset(token)
+        base.get_agent_executor().shutdown()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from pipelines.etl import ETLPipeline
+from pipelines.synthetic import SyntheticSalesGenerator, generate_sales
+
+
+def test_generator_is_deterministic_and_consistent():
+    first = generate_sales(n_products=50, days=90, seed=7, chunk_products=20)
+    second = generate_sales(n_products=50, days=90, seed=7, chunk_products=20)
+    pd.testing.assert_frame_equal(first, second)
+
+    assert first["id"].is_unique and first["id"].min() == 1
+    assert (first["quantity"] > 0).all()
+    assert first["product_id"].between(1, 50).all()
+    assert first["sale_date"].min() >= pd.Timestamp("2025-01-01")
+    assert first["sale_date"].max() < pd.Timestamp("2025-01-01") + pd.Timedelta(days=90)
+
+
+def test_stockouts_and_seasonality_shape_demand():
+    no_stockouts = generate_sales(n_products=200, days=120, stockout_rate=0.0)
+    stockouts = generate_sales(n_products=200, days=120, stockout_rate=0.05, stockout_days=10)
+    assert len(stockouts) < 0.8 * len(no_stockouts)
+
+    seasonal = SyntheticSalesGenerator(
+        n_products=500, days=365, seasonality_amplitude=0.9, seasonal_period=365.0, trend_scale=0.0,
+        weekly_amplitude=0.0, stockout_rate=0.0,
+    )
+    sales = pd.concat(seasonal.sales_chunks())
+    sales["month"] = sales["sale_date"].dt.month
+    monthly = sales.groupby(["product_id", "month"])["quantity"].sum().unstack()
+    # Peak months carry several times the demand of trough months
+    assert (monthly.max(axis=1) / monthly.min(axis=1).clip(lower=1)).median() > 3
+
+
+def test_load_writes_files_and_bulk_loads_duckdb(tmp_path):
+    generator = SyntheticSalesGenerator(n_products=30, days=60)
+    etl = ETLPipeline()
+    loaded = generator.load("duckdb", str(tmp_path), etl=etl, if_exists="replace")
+
+    expected_sales = sum(len(chunk) for chunk in generator.sales_chunks())
+    assert loaded == {"products": 30, "inventory": 30, "sales": expected_sales}
+    assert (tmp_path / "sales.parquet").exists()
+
+    orphans = etl.get_analytical_results(
+        "SELECT count(*) AS n FROM sales s LEFT JOIN products p ON s.product_id = p.id WHERE p.id IS NULL"
+    )["n"][0]
+    assert orphans == 0
+    inventory = generator.inventory()
+    assert (inventory["stock_level"] >= 0).all()
+    assert np.array_equal(inventory["product_id"], generator.products()["id"])